@@ -0,0 +1,125 @@
+import numpy as np
+
+#  Fixed-point accelerators of the convergence process of the Compiler. The iterate x stacks the output powers (P of the
+#  CERs with volt-watt control, Q of the CERs with volt-var control) written to the circuit, and g(x) the output powers the
+#  CERs respond with at the voltages of the circuit solved at x. The convergence process looks for x = g(x). The voltages can
+#  also be taken from a linear model of the circuit instead of a power flow solution.
+
+
+class AndersonMixer:
+    """
+    Anderson mixing (type II) of the fixed-point iteration x = g(x) over the last `memory` iterates. Without history, the
+    step is the damped fixed-point step x + damping * (g(x) - x).
+    """
+
+    def __init__(self, memory: int = 5, damping: float = 0.5):
+        if memory < 0:
+            raise ValueError("memory must be greater than or equal to 0")
+        if not 0 < damping <= 1:
+            raise ValueError("damping must be in (0, 1]")
+        self._memory = memory
+        self._damping = damping
+        self._x = None
+        self._f = None
+        self._dx = []
+        self._df = []
+
+    @property
+    def memory(self):
+        return self._memory
+
+    @property
+    def damping(self):
+        return self._damping
+
+    def reset(self):
+        """
+        Clear the history, called at the start of each time step.
+        """
+        self._x = None
+        self._f = None
+        self._dx = []
+        self._df = []
+
+    def mix(self, x, g) -> np.ndarray:
+        """
+        :param x: current iterate
+        :param g: fixed-point map evaluated at x
+        :return: next iterate
+        """
+        x = np.asarray(x, dtype=float)
+        f = np.asarray(g, dtype=float) - x
+        if self._x is not None and self._memory > 0:
+            self._dx.append(x - self._x)
+            self._df.append(f - self._f)
+            if len(self._dx) > self._memory:
+                del self._dx[0], self._df[0]
+        self._x, self._f = x, f
+        x_next = x + self._damping * f
+        if self._dx:
+            dx = np.column_stack(self._dx)
+            df = np.column_stack(self._df)
+            gamma = np.linalg.lstsq(df, f, rcond=None)[0]
+            x_next -= (dx + self._damping * df) @ gamma
+        return x_next
+
+
+class LinearVoltageModel:
+    """
+    Linear model of the CER terminal voltages around a solved operating point, V = V_0 + dV/dP (P - P_0) + dV/dQ (Q - Q_0).
+    The operating point is moved to each power flow solution, the sensitivities are kept until the voltages drift from the
+    ones they were computed at by more than refresh_threshold (pu).
+    """
+
+    def __init__(self, refresh_threshold: float = 0.01):
+        self._refresh_threshold = refresh_threshold
+        self._v_0 = None
+        self._p_0 = None
+        self._q_0 = None
+        self._v_refresh = None
+        self._dv_dp = None
+        self._dv_dq = None
+        self.refreshes = 0
+
+    def rebase(self, v, p, q) -> bool:
+        """
+        Move the operating point to a power flow solution.
+        :param v: CER terminal voltages (pu) of the solution
+        :param p: CER active powers (kW) the solution was solved with
+        :param q: CER reactive powers (kvar) the solution was solved with
+        :return: True if the sensitivities have to be refreshed at this operating point
+        """
+        self._v_0 = np.array(v, dtype=float)
+        self._p_0 = np.array(p, dtype=float)
+        self._q_0 = np.array(q, dtype=float)
+        return self._v_refresh is None or np.max(np.abs(self._v_0 - self._v_refresh), initial=0.0) > self._refresh_threshold
+
+    def refresh(self, dv_dp: np.ndarray, dv_dq: np.ndarray):
+        """
+        Set the sensitivities computed at the current operating point.
+        """
+        self._dv_dp, self._dv_dq = dv_dp, dv_dq
+        self._v_refresh = self._v_0
+        self.refreshes += 1
+
+    def voltages(self, p, q) -> np.ndarray:
+        """
+        :return: CER terminal voltages (pu) for the CER powers p (kW) and q (kvar)
+        """
+        return self._v_0 + self._dv_dp @ (np.asarray(p, dtype=float) - self._p_0) + self._dv_dq @ (np.asarray(q, dtype=float) - self._q_0)
+
+
+if __name__ == '__main__':
+    # Linear contraction x = A x + b, the mixer converges in about len(x) + 1 steps
+    rng = np.random.default_rng(0)
+    a = rng.uniform(-1, 1, (6, 6))
+    a *= 0.9 / np.max(np.abs(np.linalg.eigvals(a)))
+    b = rng.uniform(-1, 1, 6)
+    solution = np.linalg.solve(np.eye(6) - a, b)
+    mixer = AndersonMixer(memory=6, damping=1.0)
+    x = np.zeros(6)
+    for i in range(20):
+        x = mixer.mix(x, a @ x + b)
+        if np.max(np.abs(x - solution)) < 1e-10:
+            break
+    print(f'converged in {i + 1} steps, error {np.max(np.abs(x - solution)):.1e}')
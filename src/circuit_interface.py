@@ -1,8 +1,12 @@
 import numpy as np
 import pandas as pd
 import cmath
+from types import MappingProxyType
 from math import sqrt, pi
+from scipy import sparse
 from src.opendss_com import dss_object
+from src.dataset import load_y_matrix
+from src.profiling import DSSCallCounter
 import os
 import csv
 from src.models.load import Load
@@ -12,11 +16,28 @@ from src.utils import remove_sublist
 
 
 #  The dataframe columns header should be lower-cased with underscore name convention
+#  Buses are kept as numpy structured arrays (same field names as the dataframe columns) so that the voltages of all nodes
+#  can be updated with a single bulk read per power flow, and converted to dataframes only when results are collected.
+
+END_BUS_DTYPE = [('name', object), ('kv_base_ll', float), ('phase', object), ('distance', float), ('x', float), ('y', float),
+                 ('v_pu', float), ('angle', float)]
+BUS_DTYPE = [('bus_i', object), ('phase_i', object), ('v_base_ln', float), ('v_pu', float), ('angle', float)]
+
+#  OpenDSS load element prefix and the sign applied to the CER power when it is written to the load element
+CER_LOAD_ELEMENTS = {Load: ('Load', 1.0), PVSystem: ('PV', -1.0), HybridPVSystem: ('HybridPV', -1.0), EVSystem: ('EV', 1.0)}
 
 class CircuitInterface:
-    def __init__(self, opendss_model_path: str = None, label_bus_dict: dict[int: str] = None, models_circuit_labels: dict[str: [int]] = None) -> None:
+    def __init__(self, opendss_model_path: str = None, label_bus_dict: dict[int: str] = None, models_circuit_labels: dict[str: [int]] = None,
+                 engine: str = 'com', y_matrix_cache: str = None) -> None:
+        """
+        :param engine: 'com' uses the OpenDSS COM engine, 'native' the in-process power flow of src.native_engine (no OpenDSS needed).
+        :param y_matrix_cache: directory of the admittance matrix cache, data/.cache if None
+        """
         self._opendss_model_path = opendss_model_path
-        self._dss_object = dss_object()
+        self._engine = engine
+        self._y_matrix_cache = y_matrix_cache
+        self._y_matrix = None
+        self._dss_object = dss_object(engine)
         self._label_bus_dict = label_bus_dict
         self._models_circuit_labels = models_circuit_labels
         self._evs_circuit_labels = None
@@ -24,13 +45,31 @@ class CircuitInterface:
         self._pvsystems_circuit_labels = None
         self._loads_circuit_labels = None
         self._buses = None
+        self._buses_nodes = None
         self._end_buses = None
+        self._end_buses_nodes = None
+        self._end_buses_index = None
         self._lines = None
+        self._lines_elements = None
+        self._line_currents = None
+        self._line_powers = None
+        self._line_losses = None
         self._transformers = None
+        # End buses sorted by distance and {load element: bus} of the PV and EV systems in that order, computed on first use
+        # and cleared when the circuit is recompiled or CER load elements are added
+        self._sorted_end_buses = None
+        self._pv_set = None
+        self._ev_set = None
         self._metrics = None
+        self._setpoint_loads_idx = None
+        self._setpoint_buses_idx = None
+        self._setpoint_signs = None
+        self._setpoint_kw = None
+        self._setpoint_kvar = None
 
         if self._opendss_model_path is not None:
             self.compile()
+            self.initialise_y_matrix()
 
         if self._models_circuit_labels is not None:
             for key, value in self._models_circuit_labels.items():
@@ -60,10 +99,96 @@ class CircuitInterface:
     def hybridpvsystems_circuit_labels(self):
         return self._hybridpvsystems_circuit_labels
 
+    def enable_call_counting(self) -> None:
+        """
+        Count the calls made to the power flow engine from here on (see dss_calls). Every call goes through a counting proxy,
+        which slows them down, so it is only meant for profiling.
+        """
+        if not isinstance(self._dss_object, DSSCallCounter):
+            self._dss_object = DSSCallCounter(self._dss_object)
+
+    @property
+    def dss_calls(self) -> int:
+        """
+        :return: calls made to the power flow engine since enable_call_counting, 0 if not counting
+        """
+        return self._dss_object.calls if isinstance(self._dss_object, DSSCallCounter) else 0
+
     def compile(self):
         self._dss_object.Text.Command = 'clear'
         self._dss_object.Text.Command = 'Compile ' + self._opendss_model_path
         self._dss_object.Text.Command = 'Reset'
+        self._clear_cer_sets()
+
+    def _clear_cer_sets(self):
+        self._sorted_end_buses = None
+        self._pv_set = None
+        self._ev_set = None
+
+    def _initialise_cer_sets(self):
+        """
+        Sort the end buses by distance, and the PV and EV load elements by the position of their bus in that order.
+        """
+        self._sorted_end_buses = tuple(self._end_buses['name'][np.argsort(self._end_buses['distance'], kind='quicksort')])
+        positions = {}
+        for position, bus in enumerate(self._sorted_end_buses):
+            positions.setdefault(bus, position)
+        pv_set = {}
+        ev_set = {}
+        dss_circuit = self._dss_object.ActiveCircuit
+        for element in dss_circuit.Loads.AllNames:
+            if 'pv_' in element.lower():
+                dss_circuit.Loads.Name = element
+                pv_set[element] = dss_circuit.ActiveCktElement.BusNames[0]
+            elif 'ev_' in element.lower():
+                dss_circuit.Loads.Name = element
+                ev_set[element] = dss_circuit.ActiveCktElement.BusNames[0]
+        self._pv_set = MappingProxyType(dict(sorted(pv_set.items(), key=lambda item: positions.get(item[1], len(self._sorted_end_buses)))))
+        self._ev_set = MappingProxyType(dict(sorted(ev_set.items(), key=lambda item: positions.get(item[1], len(self._sorted_end_buses)))))
+
+    def reset(self) -> None:
+        """
+        Bring the circuit back to its state after construction (CER load elements at zero, flat voltages, no line flows) so
+        that it can be reused for another run with the same CER layout. The buses, lines and transformers tables are kept.
+        """
+        self.compile()
+        self.initialise_cers()
+        self.initialise_end_buses()
+        self.initialise_all_buses()
+        self._lines[['i_a', 'i_b', 'i_c', 'losses_active', 'losses_reactive']] = 0.0
+        self._lines[['s_a', 's_b', 's_c']] = 0.0 + 0.0j
+        self._line_currents[:] = 0.0
+        self._line_powers[:] = 0.0
+        self._line_losses[:] = 0.0
+        self.initialise_circuit_metrics()
+        self._setpoint_loads_idx = None
+        self._setpoint_buses_idx = None
+        self._setpoint_signs = None
+        self._setpoint_kw = None
+        self._setpoint_kvar = None
+
+    def initialise_y_matrix(self) -> None:
+        """
+        Load the admittance matrix of the compiled model from the cache, or extract it (before the CER load elements are
+        added) and cache it.
+        """
+        self._y_matrix = load_y_matrix(self._opendss_model_path, self._engine, self.extract_y_matrix,
+                                       cache_path=self._y_matrix_cache)[0]
+
+    def extract_y_matrix(self) -> (sparse.csr_matrix, np.ndarray):
+        """
+        Read the system admittance matrix (SystemY) of the circuit.
+        :return: CSR matrix with rows and columns ordered as nodes_set_raw, and the node names
+        """
+        dss_circuit = self._dss_object.ActiveCircuit
+        # OpenDSS builds the admittance matrix with the first solution
+        self.solve_power_flow()
+        nodes = self.nodes_set_raw
+        y_nodes_index = {node.lower(): idx for idx, node in enumerate(dss_circuit.YNodeOrder)}
+        order = np.array([y_nodes_index[node.lower()] for node in nodes], dtype=int)
+        y = np.asarray(dss_circuit.SystemY, dtype=float)
+        y = (y[0::2] + 1j * y[1::2]).reshape(len(order), len(order))
+        return sparse.csr_matrix(y[np.ix_(order, order)]), nodes
 
     def initialise_circuit_metrics(self):
         metrics = [{
@@ -75,6 +200,7 @@ class CircuitInterface:
         self._metrics = pd.DataFrame(metrics)
 
     def initialise_cers(self):
+        self._clear_cer_sets()
         if self._loads_circuit_labels is not None:
             for label in self._loads_circuit_labels:
                 self._dss_object.Text.Command = f'New Load.Load_{label} phases=1 bus1={self._label_bus_dict[label]} kV=0.23 kW=0 PF=1.0 vminpu=0.6 vmaxpu=2'
@@ -88,11 +214,21 @@ class CircuitInterface:
             for label in self._evs_circuit_labels:
                 self._dss_object.Text.Command = f'New Load.EV_{label} phases=1 bus1={self._label_bus_dict[label]} kV=0.23 kW=0 kvar=0 vminpu=0.6 vmaxpu=2'
 
+    def _nodes_index(self) -> dict:
+        """
+        :return: the position of each node ('bus.phase') in the node ordered arrays of the circuit (AllBusVmagPu, AllBusVolts)
+        """
+        return {node.lower(): idx for idx, node in enumerate(self._dss_object.ActiveCircuit.AllNodeNames)}
+
     def initialise_all_buses(self):
         buses = []
+        nodes = []
+        nodes_index = self._nodes_index()
         dss_circuit = self._dss_object.ActiveCircuit
         buses_names = dss_circuit.AllBusNames
         for bus in buses_names:
+            dss_circuit.SetActiveBus(bus)
+            v_base_ln = 1000 * dss_circuit.ActiveBus.kVBase
             for phase in ['1', '2', '3']:
                 if phase == '1':
                     angle = 0.0
@@ -100,36 +236,28 @@ class CircuitInterface:
                     angle = - 2 * pi / 3
                 else:
                     angle = 2 * pi / 3
-                dss_circuit.SetActiveBus(bus)
-                buses.append({
-                    'bus_i': bus,
-                    'phase_i': phase,
-                    'v_base_ln': 1000 * dss_circuit.ActiveBus.kVBase,
-                    'v_pu': 1.0,
-                    'angle': angle
-                })
-        self._buses = pd.DataFrame(buses)
+                buses.append((bus, phase, v_base_ln, 1.0, angle))
+                nodes.append(nodes_index[f'{bus}.{phase}'.lower()])
+        self._buses = np.array(buses, dtype=BUS_DTYPE)
+        self._buses_nodes = np.array(nodes, dtype=int)
 
     def initialise_end_buses(self):
         end_buses_names = list(self._label_bus_dict.values())
         buses = []
+        nodes = []
+        nodes_index = self._nodes_index()
         dss_circuit = self._dss_object.ActiveCircuit
         for bus in end_buses_names:
             node = bus.split('.')[1]
             main_bus = bus.split('.')[0]
             dss_circuit.SetActiveBus(main_bus)
-            buses.append({
-                'name': bus,
-                'kv_base_ll': dss_circuit.ActiveBus.kVBase,
-                'phase': node,
-                'distance': dss_circuit.ActiveBus.Distance * 1000,
-                'x': dss_circuit.ActiveBus.x,
-                'y': dss_circuit.ActiveBus.y,
-                'v_pu': 1.0,
-                'angle': 0.0
-            })
-        self._end_buses = pd.DataFrame(buses)
-        self._end_buses.set_index('name', inplace=True)
+            buses.append((bus, dss_circuit.ActiveBus.kVBase, node, dss_circuit.ActiveBus.Distance * 1000,
+                          dss_circuit.ActiveBus.x, dss_circuit.ActiveBus.y, 1.0, 0.0))
+            nodes.append(nodes_index[bus.lower()])
+        self._end_buses = np.array(buses, dtype=END_BUS_DTYPE)
+        self._end_buses_nodes = np.array(nodes, dtype=int)
+        self._end_buses_index = {bus: idx for idx, bus in enumerate(end_buses_names)}
+        self._clear_cer_sets()
 
     def initialise_transformer(self):
         dss_circuit = self._dss_object.ActiveCircuit
@@ -176,24 +304,89 @@ class CircuitInterface:
             })
         self._lines = pd.DataFrame(lines)
         self._lines.set_index('name', inplace=True)
+        # Line flows in the order of the lines table: phase current magnitudes (A), phase powers into terminal 1 (kVA) and
+        # losses (kVA)
+        self._lines_elements = [f'Line.{line}' for line in self._lines.index]
+        self._line_currents = np.zeros((len(self._lines), 3))
+        self._line_powers = np.zeros((len(self._lines), 3), dtype=complex)
+        self._line_losses = np.zeros(len(self._lines), dtype=complex)
+
+    def initialise_setpoints(self, cers: [object] = None) -> None:
+        """
+        Fix the CER ordering used by update_cer_setpoints and cache the index of the load element of each CER.
+        :param cers: CER objects, the P and Q arrays of update_cer_setpoints follow this order.
+        """
+        loads_idx = []
+        signs = []
+        dss_loads = self._dss_object.ActiveCircuit.Loads
+        for cer in cers:
+            if type(cer) not in CER_LOAD_ELEMENTS:
+                raise ValueError(f"Invalid CER {cer}. Expected one of {[cer_type.__name__ for cer_type in CER_LOAD_ELEMENTS]}.")
+            prefix, sign = CER_LOAD_ELEMENTS[type(cer)]
+            dss_loads.Name = f'{prefix}_{cer.circuit_label}'
+            loads_idx.append(dss_loads.idx)
+            signs.append(sign)
+        self._setpoint_loads_idx = np.array(loads_idx, dtype=int)
+        self._setpoint_buses_idx = np.array([self._end_buses_index[self._label_bus_dict[cer.circuit_label]] for cer in cers], dtype=int)
+        self._setpoint_signs = np.array(signs)
+        # Unknown values, so the first push writes every element
+        self._setpoint_kw = np.full(len(cers), np.nan)
+        self._setpoint_kvar = np.full(len(cers), np.nan)
+
+    def update_cer_setpoints(self, p: [float], q: [float]) -> int:
+        """
+        Write the CER output powers to their load elements through the Loads interface. Elements whose P and Q did not change
+        since the last push are skipped. kW and kvar are always written together (in this order) as OpenDSS recomputes kvar
+        from the nominal PF when kW alone is edited.
+        :param p: active powers in kW, ordered as the cers given to initialise_setpoints
+        :param q: reactive powers in kvar, ordered as the cers given to initialise_setpoints
+        :return: the number of load elements written
+        """
+        kw = self._setpoint_signs * np.asarray(p, dtype=float)
+        kvar = self._setpoint_signs * np.asarray(q, dtype=float)
+        changed = np.flatnonzero((kw != self._setpoint_kw) | (kvar != self._setpoint_kvar))
+        dss_loads = self._dss_object.ActiveCircuit.Loads
+        for i in changed:
+            dss_loads.idx = int(self._setpoint_loads_idx[i])
+            dss_loads.kW = float(kw[i])
+            dss_loads.kvar = float(kvar[i])
+        self._setpoint_kw[changed] = kw[changed]
+        self._setpoint_kvar[changed] = kvar[changed]
+        return len(changed)
+
+    def _cer_sensitivity_nodes(self):
+        """
+        :return: the native power flow solver and the node of the load element of each CER given to initialise_setpoints
+        """
+        solver = getattr(self._dss_object, 'solver', None)
+        if solver is None:
+            raise NotImplementedError('CER voltage sensitivities are only available with the native engine.')
+        nodes = []
+        for idx in self._setpoint_loads_idx:
+            load_nodes = solver.load_nodes[idx - 1]
+            if len(load_nodes) != 1:
+                raise NotImplementedError('CER voltage sensitivities are only available for single-phase CERs.')
+            nodes.append(load_nodes[0])
+        return solver, nodes
+
+    def check_cer_voltage_sensitivities(self) -> None:
+        """
+        Raise NotImplementedError if get_cer_voltage_sensitivities is not available for the engine or the CERs given to
+        initialise_setpoints.
+        """
+        self._cer_sensitivity_nodes()
 
-    def update_cer_output_powers(self, cer_powers_dict: {object: [float, float]} = None):
-        for cer_obj, [kw, kvar] in cer_powers_dict.items():
-            if type(cer_obj) is Load:
-                self._dss_object.Text.Command = f'Load.Load_{cer_obj.circuit_label}.kw={kw}'
-                self._dss_object.Text.Command = f'Load.Load_{cer_obj.circuit_label}.kvar={kvar}'
-
-            elif type(cer_obj) is PVSystem:
-                self._dss_object.Text.Command = f'Load.PV_{cer_obj.circuit_label}.kw={-kw}'
-                self._dss_object.Text.Command = f'Load.PV_{cer_obj.circuit_label}.kvar={-kvar}'
-
-            elif type(cer_obj) is HybridPVSystem:
-                self._dss_object.Text.Command = f'Load.HybridPV_{cer_obj.circuit_label}.kw={-kw}'
-                self._dss_object.Text.Command = f'Load.HybridPV_{cer_obj.circuit_label}.kvar={-kvar}'
-
-            elif type(cer_obj) is EVSystem:
-                self._dss_object.Text.Command = f'Load.EV_{cer_obj.circuit_label}.kw={kw}'
-                self._dss_object.Text.Command = f'Load.EV_{cer_obj.circuit_label}.kvar={kvar}'  # Check the kvar sign for the ev.
+    def get_cer_voltage_sensitivities(self) -> (np.ndarray, np.ndarray):
+        """
+        Sensitivities of the CER terminal voltages to the CER output powers around the last power flow solution, ordered as
+        the cers given to initialise_setpoints. Only available with the native engine.
+        :return: dV/dP in pu/kW and dV/dQ in pu/kvar, element [i, j] for the voltage of cer i and the output of cer j
+        """
+        solver, nodes = self._cer_sensitivity_nodes()
+        dv_dp, dv_dq = solver.node_sensitivities(nodes)
+        # The CER powers are written with the sign of their load element. V/W to pu/kW: x 1000 W/kW / (1000 * kv_base_lv) V
+        scale = self._setpoint_signs[np.newaxis, :] / solver.kv_base_lv
+        return dv_dp * scale, dv_dq * scale
 
     def solve_power_flow(self) -> None:
         self._dss_object.Text.Command = 'solve'
@@ -204,48 +397,49 @@ class CircuitInterface:
         self._dss_object.Text.Command = 'solve'
         self._dss_object.ActiveCircuit.Solution.Cleanup()
 
-    def update_sys_voltage(self) -> pd.DataFrame:
-        buses_names = self._end_buses.index
-        dss_circuit = self._dss_object.ActiveCircuit
-        for bus in buses_names:
-            node = int(bus.split('.')[1])
-            main_bus = bus.split('.')[0]
-            dss_circuit.SetActiveBus(main_bus)
-
-            self._end_buses.at[bus, 'v_pu'] = dss_circuit.ActiveBus.puVmagAngle[2 * (node - 1)]
-            self._end_buses.at[bus, 'angle'] = dss_circuit.ActiveBus.puVmagAngle[2 * node - 1]
-
-        buses_names = self._buses['bus_i'].values
+    def update_sys_voltage(self) -> np.ndarray:
         dss_circuit = self._dss_object.ActiveCircuit
-        self._buses.set_index(['bus_i', 'phase_i'], inplace=True)
-        for bus in buses_names:
-            for phase in ['1', '2', '3']:
-                dss_circuit.SetActiveBus(bus)
-                self._buses.at[(bus, phase), 'v_pu'] = dss_circuit.ActiveBus.puVmagAngle[2 * (int(phase) - 1)]
-                self._buses.at[(bus, phase), 'angle'] = dss_circuit.ActiveBus.puVmagAngle[2 * int(phase) - 1]
-        self._buses = self._buses.reset_index()
+        v_pu = np.asarray(dss_circuit.AllBusVmagPu, dtype=float)
+        v_volts = np.asarray(dss_circuit.AllBusVolts, dtype=float)
+        angle = np.degrees(np.arctan2(v_volts[1::2], v_volts[0::2]))
+
+        self._end_buses['v_pu'] = v_pu[self._end_buses_nodes]
+        self._end_buses['angle'] = angle[self._end_buses_nodes]
+        self._buses['v_pu'] = v_pu[self._buses_nodes]
+        self._buses['angle'] = angle[self._buses_nodes]
         return self._end_buses
 
     def get_cer_voltage(self, cers: [object] = None) -> dict:
         cers_voltages = {cer: 0 for cer in cers}
         for cer in cers:
             cer_bus = self._label_bus_dict[cer.circuit_label]
-            cers_voltages[cer] = self._end_buses.loc[cer_bus, 'v_pu']
+            cers_voltages[cer] = self._end_buses['v_pu'][self._end_buses_index[cer_bus]]
         return cers_voltages
 
+    def get_cer_voltages(self) -> np.ndarray:
+        """
+        :return: the terminal voltages (pu) of the cers given to initialise_setpoints, in the same order
+        """
+        return self._end_buses['v_pu'][self._setpoint_buses_idx]
+
     def update_line_flow(self) -> pd.DataFrame:
-        lines_names = self._lines.index
+        """
+        Read the currents, powers and losses of each line once (one access per array) into the line flow arrays, and update
+        the flow columns of the lines table from them.
+        """
         dss_circuit = self._dss_object.ActiveCircuit
-        for line in lines_names:
-            dss_circuit.SetActiveElement(f"Line.{line}")
-            self._lines.at[line, 'i_a'] = dss_circuit.ActiveCktElement.CurrentsMagAng[0]
-            self._lines.at[line, 'i_b'] = dss_circuit.ActiveCktElement.CurrentsMagAng[2]
-            self._lines.at[line, 'i_c'] = dss_circuit.ActiveCktElement.CurrentsMagAng[4]
-            self._lines.at[line, 's_a'] = dss_circuit.ActiveCktElement.Powers[0] + 1j * dss_circuit.ActiveCktElement.Powers[1]
-            self._lines.at[line, 's_b'] = dss_circuit.ActiveCktElement.Powers[2] + 1j * dss_circuit.ActiveCktElement.Powers[3]
-            self._lines.at[line, 's_c'] = dss_circuit.ActiveCktElement.Powers[4] + 1j * dss_circuit.ActiveCktElement.Powers[5]
-            self._lines.at[line, 'losses_active'] = dss_circuit.ActiveCktElement.Losses[0] / 1000
-            self._lines.at[line, 'losses_reactive'] = dss_circuit.ActiveCktElement.Losses[1] / 1000
+        dss_element = dss_circuit.ActiveCktElement
+        for i, element in enumerate(self._lines_elements):
+            dss_circuit.SetActiveElement(element)
+            currents = dss_element.CurrentsMagAng
+            powers = dss_element.Powers
+            losses = dss_element.Losses
+            self._line_currents[i] = currents[0], currents[2], currents[4]
+            self._line_powers[i] = complex(powers[0], powers[1]), complex(powers[2], powers[3]), complex(powers[4], powers[5])
+            self._line_losses[i] = complex(losses[0], losses[1]) / 1000
+        self._lines['i_a'], self._lines['i_b'], self._lines['i_c'] = self._line_currents.T
+        self._lines['s_a'], self._lines['s_b'], self._lines['s_c'] = self._line_powers.T
+        self._lines['losses_active'], self._lines['losses_reactive'] = self._line_losses.real, self._line_losses.imag
         return self._lines
 
     def update_circuit_metrics(self) -> pd.DataFrame:
@@ -259,18 +453,21 @@ class CircuitInterface:
         self._metrics = pd.DataFrame(metrics)
         return self._metrics
 
-    def get_buses_results(self):
-        return self._end_buses, self._buses
+    def get_buses_results(self) -> (pd.DataFrame, pd.DataFrame):
+        return pd.DataFrame(self._end_buses).set_index('name'), pd.DataFrame(self._buses)
 
     def get_lines_results(self):
         return self._lines
 
     @property
-    def init_volt_matrix(self):
-        return self._buses
+    def init_volt_matrix(self) -> pd.DataFrame:
+        return pd.DataFrame(self._buses)
 
     @property
-    def y_matrix_raw(self) -> np.ndarray:
+    def y_matrix_raw(self) -> sparse.csr_matrix:
+        """
+        :return: the system admittance matrix (S) of the network model, rows and columns ordered as nodes_set_raw
+        """
         return self._y_matrix
 
     @property
@@ -373,13 +570,13 @@ class CircuitInterface:
         return loads_labels
 
     @property
-    def end_buses(self) -> list:
+    def end_buses(self) -> tuple:
         """
         :return: the sorted end buses according to distance
         """
-        sorted_df = self._end_buses.sort_values(by='distance').copy()
-        buses = list(sorted_df.reset_index()['name'].values)
-        return buses
+        if self._sorted_end_buses is None:
+            self._initialise_cer_sets()
+        return self._sorted_end_buses
 
     @property
     def lines_rating(self) -> dict:
@@ -392,38 +589,22 @@ class CircuitInterface:
         return lines_ratings
 
     @property
-    def pv_set(self) -> dict:
+    def pv_set(self) -> MappingProxyType:
         """
         :return: the names of the pv systems ordered in accordance with their distance from the source. {pv_name: bus}
         """
-        buses = self.end_buses
-        names_of_all_loads = self._dss_object.ActiveCircuit.Loads.AllNames
-        pv_set = {}
-        for element in names_of_all_loads:
-            if 'pv_' in element.lower():
-                self._dss_object.ActiveCircuit.Loads.Name = element
-                pv_set[element] = self._dss_object.ActiveCircuit.ActiveCktElement.BusNames[0]
-
-        # Sort the PV systems based on the order of their buses in the `buses` list
-        sorted_pv_set = {k: v for k, v in sorted(pv_set.items(), key=lambda item: buses.index(item[1]) if item[1] in buses else len(buses))}
-        return sorted_pv_set
+        if self._pv_set is None:
+            self._initialise_cer_sets()
+        return self._pv_set
 
     @property
-    def ev_set(self) -> dict:
+    def ev_set(self) -> MappingProxyType:
         """
-        :return: the names of the pv systems ordered in accordance with their distance from the source. {pv_name: bus}
+        :return: the names of the ev systems ordered in accordance with their distance from the source. {ev_name: bus}
         """
-        buses = self.end_buses
-        names_of_all_loads = self._dss_object.ActiveCircuit.Loads.AllNames
-        ev_set = {}
-        for element in names_of_all_loads:
-            if 'ev_' in element.lower():
-                self._dss_object.ActiveCircuit.Loads.Name = element
-                ev_set[element] = self._dss_object.ActiveCircuit.ActiveCktElement.BusNames[0]
-
-        # Sort the EV systems based on the order of their buses in the `buses` list
-        sorted_ev_set = {k: v for k, v in sorted(ev_set.items(), key=lambda item: buses.index(item[1]) if item[1] in buses else len(buses))}
-        return sorted_ev_set
+        if self._ev_set is None:
+            self._initialise_cer_sets()
+        return self._ev_set
 
     @property
     def models_circuit_labels(self):
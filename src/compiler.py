@@ -1,10 +1,16 @@
+import numpy as np
 from src.circuit_interface import CircuitInterface
 from src.external_input_data import ModelInputData
-from copy import deepcopy
+from time import perf_counter
+from contextlib import nullcontext
 from src.models.load import Load
 from src.models.pv_system import PVSystem, HybridPVSystem
 from src.models.ev import EVSystem
+from src.models.meter import get_energy_flow_results
 from src.results import Results
+from src.population import CERPopulation
+from src.acceleration import AndersonMixer, LinearVoltageModel
+from src.profiling import StepProfiler
 
 
 class Compiler:
@@ -17,11 +23,40 @@ class Compiler:
     Q_TOLERANCE = 0.0006
     P_TOLERANCE = 0.0006
 
-    def __init__(self, circuit: CircuitInterface = None, cers: [object] = None, model_data: ModelInputData = None):
+    def __init__(self, circuit: CircuitInterface = None, cers: [object] = None, model_data: ModelInputData = None, results: Results = None):
         self._circuit = circuit
         self._cers = cers
         self._model_data = model_data
-        self._cers_temp = None
+        # Results store written each time step, the default instance of the class-level API if not given
+        self._results = results if results is not None else Results.default()
+        self._setpoint_writes = 0
+        self._setpoint_write_time = 0.0
+        self._population = None
+        self._iterations = 0
+        # Warm start, converged (p_out, q_out) of the last two time steps
+        self._warm_start = False
+        self._extrapolate = False
+        self._operating_points = []
+        # Active set, CERs whose output depends on their terminal voltage (time steps without any skip the convergence process),
+        # their voltages at their last evaluation, and the number of CERs evaluated in each iteration of the time step
+        self._active_set = False
+        self._voltage_dependent = None
+        self._evaluated_v = None
+        self._active_set_sizes = []
+        # Fixed-point accelerator replacing the delta P/Q steps (None for the delta P/Q steps), indices of the CERs it steps,
+        # and the fixed-point residual (max |g(x) - x|) of each iteration of the time step
+        self._accelerator = None
+        self._p_accelerated = []
+        self._q_accelerated = []
+        self._residuals = []
+        # Linear model of the CER terminal voltages used instead of the power flow in the trial iterations (None to solve
+        # the power flow in each of them), and the power flows solved in the time step
+        self._voltage_model = None
+        self._power_flow_solves = 0
+        # Per time step trace of the phases of the step (None for no instrumentation)
+        self._profiler = None
+        if self._circuit is not None:
+            self._circuit.initialise_setpoints(self._cers)
 
         # P and Q steps for each convergence iteration
         self._delta_q = [0.5 for cer in self._cers]
@@ -46,6 +81,7 @@ class Compiler:
 
         self._p_control_check = [False for cer in self._cers]
         self._q_control_check = [False for cer in self._cers]
+        self._ch_control_check = [False for cer in self._cers]
 
         # --- Parameterized update coefficients for delta-Q ---
         # When voltage change is high (relative to previous change)
@@ -61,9 +97,9 @@ class Compiler:
         self._delta_p_incr_low = 0.10  # add when delta_v < 0.2 * old_delta_v
         self._delta_p_incr_high = 0.05  # add when delta_v < 0.4 * old_delta_v
 
-    def run_cers(self, cers, time_step):
-        # Read CER terminal voltages
-        cer_voltages = self._circuit.get_cer_voltage(cers)
+    def run_cers(self, cers, time_step, voltages=None):
+        # Read CER terminal voltages, unless they are given in the order of cers
+        cer_voltages = self._circuit.get_cer_voltage(cers) if voltages is None else dict(zip(cers, voltages))
         for cer, volt in cer_voltages.items():
             # Update the voltages to CER objects, and Compute CER output power
             if isinstance(cer, Load):
@@ -79,6 +115,133 @@ class Compiler:
             else:
                 cer.step()
 
+    def enable_population_engine(self):
+        """
+        Run the trial iterations of the convergence process on a CERPopulation (vectorized CER models) instead of the CER
+        objects. The final run of each time step is still done by the CER objects, and the results are collected from them.
+        """
+        self._population = CERPopulation(self._cers, self._model_data)
+
+    def enable_warm_start(self, extrapolate: bool = False):
+        """
+        Start the convergence of each time step from the converged CER outputs of the previous one: the first iteration
+        steps from them by delta P/Q like the next ones, instead of taking the CER outputs as they are. With extrapolate,
+        the outputs are extrapolated linearly from the two previous time steps and the circuit is solved at them before the
+        first iteration.
+        Do not expect a speedup: the iterations are set by the damped delta P/Q steps rather than by the starting point. On
+        summer-weekday runs (native engine) it took as many or more iterations than the default start, e.g. 1344 -> 1415
+        (1446 with extrapolate) on load_pv_inv_con; extrapolate saved iterations (7%) on only one of the fleets measured.
+        """
+        self._warm_start = True
+        self._extrapolate = extrapolate
+
+    def enable_active_set(self):
+        """
+        Only re-evaluate the CERs that can change their output in the trial iterations of the convergence process. The CERs
+        without voltage dependent control (volt-var, volt-watt, charging volt-watt) are frozen after the first iteration of
+        each time step, and the other ones are skipped while their terminal voltage stays within V_TOLERANCE of the one
+        they were last evaluated at. Not used by the population engine, which evaluates all the CERs at once.
+        """
+        self._active_set = True
+
+    def enable_anderson_acceleration(self, memory: int = 5, damping: float = 0.5):
+        """
+        Step the outputs of the CERs with volt-watt (P) and volt-var (Q) control with Anderson mixing over the last
+        `memory` iterations instead of the delta P/Q factors, see src.acceleration.
+        """
+        self._accelerator = AndersonMixer(memory, damping)
+
+    def enable_sensitivity_model(self, refresh_threshold: float = 0.01):
+        """
+        Run the trial iterations of the convergence process against a linear model of the CER terminal voltages (dV/dP and
+        dV/dQ sensitivities of the native engine) instead of solving the power flow. When the iterations converge on the
+        model, the power flow is solved and they resume from its solution until the model voltages match it within
+        V_TOLERANCE. The sensitivities are recomputed when the voltages drift by more than refresh_threshold (pu).
+        Raises NotImplementedError on the COM engine or when a CER is not single-phase.
+        """
+        if self._circuit is not None:
+            self._circuit.check_cer_voltage_sensitivities()
+        self._voltage_model = LinearVoltageModel(refresh_threshold)
+
+    def enable_profiling(self, profiler: str = None):
+        """
+        Record the iterations, the time spent in each phase and the power flow engine calls of each time step, see
+        src.profiling. The calls go through a counting proxy from here on, which adds to the time of the circuit phases.
+        :param profiler: None, 'cprofile' or 'pyinstrument' to also profile the time steps
+        """
+        self._profiler = StepProfiler(profiler)
+        self._circuit.enable_call_counting()
+
+    @property
+    def profiler(self) -> StepProfiler:
+        return self._profiler
+
+    def _phase(self, name: str):
+        return self._profiler.phase(name) if self._profiler is not None else nullcontext()
+
+    def _seed_convergence(self):
+        """
+        Seed the convergence process with the operating point of the previous time step(s).
+        """
+        self._p_out, self._q_out = self._operating_points[-1]
+        if self._extrapolate and len(self._operating_points) == 2:
+            (p_0, q_0), (p_1, q_1) = self._operating_points
+            self._p_out = [2 * p - p_previous for p, p_previous in zip(p_1, p_0)]
+            self._q_out = [2 * q - q_previous for q, q_previous in zip(q_1, q_0)]
+            self._solve_power_flow()
+        self._cl_first_iteration = False
+        # The voltages of the seed are not solved with the CER outputs of the time step yet, the first iteration cannot converge
+        self._cl_seeded_iteration = True
+        self._p_previous, self._q_previous = self._p_out, self._q_out
+        self._previous_v = self._circuit.get_cer_voltages().tolist()
+
+    def _run_trial(self, cers_state, time_step, volt=None):
+        """
+        Run the CERs from the state of the time step start.
+        :param volt: CER terminal voltages, read from the circuit if not given
+        :return: CER output active powers, reactive powers, and terminal voltages
+        """
+        if self._population is not None:
+            volt = self._circuit.get_cer_voltages() if volt is None else volt
+            p_inv, q_inv = self._population.step(volt, time_step)
+            self._active_set_sizes.append(len(self._cers))
+            return p_inv.tolist(), q_inv.tolist(), volt.tolist()
+        if self._active_set:
+            return self._run_active_trial(cers_state, time_step, volt)
+        # Roll back the previous trial and run the CER objects
+        self._restore_cers(cers_state)
+        self.run_cers(self._cers, time_step, volt)
+        self._active_set_sizes.append(len(self._cers))
+        p_inv, q_inv = self._cer_powers()
+        return p_inv, q_inv, [cer.volt for cer in self._cers]
+
+    def _run_active_trial(self, cers_state, time_step, volt=None):
+        """
+        Run the CERs of the active set from the state of the time step start, the outputs of the other ones are kept from
+        their last evaluation.
+        :return: CER output active powers, reactive powers, and terminal voltages
+        """
+        volt = self._circuit.get_cer_voltages() if volt is None else np.asarray(volt)
+        if self._evaluated_v is None:
+            active = range(len(self._cers))
+            self._evaluated_v = volt.copy()
+            p_inv, q_inv = [0.0] * len(self._cers), [0.0] * len(self._cers)
+        else:
+            active = np.flatnonzero(self._voltage_dependent & (np.abs(volt - self._evaluated_v) > self.__class__.V_TOLERANCE))
+            self._evaluated_v[active] = volt[active]
+            p_inv, q_inv = list(self._p_inv), list(self._q_inv)
+        cers = [self._cers[i] for i in active]
+        for i, cer in zip(active, cers):
+            cer.restore(cers_state[i])
+        self.run_cers(cers, time_step, volt[active])
+        self._active_set_sizes.append(len(cers))
+        for i, cer in zip(active, cers):
+            if isinstance(cer, PVSystem) or isinstance(cer, HybridPVSystem):
+                p_inv[i], q_inv[i] = cer.p_out, cer.q_out
+            else:
+                p_inv[i], q_inv[i] = cer.p_in, cer.q_in
+        return p_inv, q_inv, volt.tolist()
+
     def _check_q_control(self):
         for i, cer in enumerate(self._cers):
             if isinstance(cer, PVSystem):
@@ -103,36 +266,69 @@ class Compiler:
                 if cer.inverter.vw_enabled:
                     self._p_control_check[i] = True
 
+    def _check_ch_control(self):
+        for i, cer in enumerate(self._cers):
+            if isinstance(cer, HybridPVSystem):
+                if cer.inverter.vw_ch_enabled:
+                    self._ch_control_check[i] = True
+            elif isinstance(cer, EVSystem):
+                if cer.inverter.vw_ch_enabled:
+                    self._ch_control_check[i] = True
+
     def _initialise_convergence(self):
         """
         Initialize the convergence process.
         """
         self._cl_first_iteration = True
+        self._cl_seeded_iteration = False
         self._reset_convergence()
+        self._setpoint_writes = 0
+        self._setpoint_write_time = 0.0
+        self._active_set_sizes = []
+        self._evaluated_v = None
+        self._residuals = []
+        self._power_flow_solves = 0
 
         self._p_control_check = [False for cer_obj in self._cers]
         self._q_control_check = [False for cer_obj in self._cers]
+        self._ch_control_check = [False for cer_obj in self._cers]
         self._check_p_control()
         self._check_q_control()
+        self._check_ch_control()
         self._delta_p = [0.5 if p_check is True else None for p_check in self._p_control_check]
         self._delta_q = [0.5 if q_check is True else None for q_check in self._q_control_check]
-
-    def _convergence_iteration(self):
+        if self._accelerator is not None:
+            self._accelerator.reset()
+            self._p_accelerated = [i for i, p_check in enumerate(self._p_control_check) if p_check]
+            self._q_accelerated = [i for i, q_check in enumerate(self._q_control_check) if q_check]
+        self._voltage_dependent = np.array([p_check or q_check or ch_check for p_check, q_check, ch_check
+                                            in zip(self._p_control_check, self._q_control_check, self._ch_control_check)], dtype=bool)
+
+    def _convergence_iteration(self, p_inv, q_inv, current_v):
         """
         Iteration for convergence process. Repeat the interation until the active power, reactive power, and terminal
         voltage of all the CERs in the circuit keep the same values. Convergence is reached at this point.
         """
         self._reset_convergence()
 
-        self._p_inv = [cer.p_out if isinstance(cer, PVSystem) or isinstance(cer, HybridPVSystem) else cer.p_in for cer in self._cers_temp]
-        self._q_inv = [cer.q_out if isinstance(cer, PVSystem) or isinstance(cer, HybridPVSystem) else cer.q_in for cer in self._cers_temp]
-        self._current_v = [cer.volt for cer in self._cers_temp]
-        self._change_delta_p_factor()
-        self._change_delta_q_factor()
+        self._p_inv = p_inv
+        self._q_inv = q_inv
+        self._current_v = current_v
+        if self._accelerator is None:
+            self._change_delta_p_factor()
+            self._change_delta_q_factor()
         if not self._cl_first_iteration:
-            self._adjust_p_out()
-            self._adjust_q_out()
-            self._check_convergence()
+            self._residuals.append(max(np.max(np.abs(np.subtract(self._p_inv, self._p_previous)), initial=0.0),
+                                       np.max(np.abs(np.subtract(self._q_inv, self._q_previous)), initial=0.0)))
+            if self._accelerator is not None:
+                self._accelerate()
+            else:
+                self._adjust_p_out()
+                self._adjust_q_out()
+            if self._cl_seeded_iteration:
+                self._cl_seeded_iteration = False
+            else:
+                self._check_convergence()
             self._previous_v = self._current_v
             self._p_previous = self._p_out
             self._q_previous = self._q_out
@@ -195,38 +391,140 @@ class Compiler:
             new_p_out.append(new_p)
         self._p_out = new_p_out
 
+    def _accelerate(self):
+        """
+        Step the outputs of the controlled CERs with the fixed-point accelerator, the other CERs output their response.
+        """
+        n_p = len(self._p_accelerated)
+        x = [self._p_previous[i] for i in self._p_accelerated] + [self._q_previous[i] for i in self._q_accelerated]
+        g = [self._p_inv[i] for i in self._p_accelerated] + [self._q_inv[i] for i in self._q_accelerated]
+        x_next = self._accelerator.mix(x, g).tolist()
+        self._p_out = list(self._p_inv)
+        self._q_out = list(self._q_inv)
+        for i, p in zip(self._p_accelerated, x_next[:n_p]):
+            self._p_out[i] = p
+        for i, q in zip(self._q_accelerated, x_next[n_p:]):
+            self._q_out[i] = q
+
     def cer_convergence_process(self, time_step):
         """
         Convergence process. This is done by repetitively running power flow solutions and updating CER outputs,
         until the convergence criteria for P, Q, V are met.
+        Without voltage dependent CER control, the CERs are run and the power flow solved once (see _run_uncontrolled).
         """
-        i = 0
+        if self._profiler is not None:
+            self._profiler.start_step(time_step, self._circuit.dss_calls)
         self._initialise_convergence()
-
-        while not self._converged and i < 300:
-            # Copy temporary CER objects so any calculation does not impact their soc variables if any.
-            self._cers_temp = deepcopy(self._cers)
-            # Run the temporary CER objects and update the outputs to circuit simulation
-            self.run_cers(self._cers_temp, time_step)
-            self._convergence_iteration()
-            self._circuit.update_cer_output_powers({cer: [p_out, q_out] for cer, p_out, q_out in zip(self._cers_temp, self._p_out, self._q_out)})
-            self._circuit.solve_power_flow()
-            self._circuit.update_sys_voltage()
-            i = i + 1
-        # After iteration, the simulation should be converged. Run the actual CER objects and solve power flow.
-        self.run_cers(self._cers, time_step)
-        self._circuit.update_cer_output_powers({cer: [p_out, q_out] for cer, p_out, q_out in zip(self._cers, self._p_out, self._q_out)})
-        self._circuit.solve_power_flow()
-        self._circuit.update_sys_voltage()
-        self._circuit.update_line_flow()
-        self._circuit.update_circuit_metrics()
-        self._collect_results(time_step)
+        if self._voltage_dependent.any():
+            self._converge(time_step)
+        else:
+            self._run_uncontrolled(time_step)
+        with self._phase('update_line_flow'):
+            self._circuit.update_line_flow()
+        with self._phase('update_circuit_metrics'):
+            self._circuit.update_circuit_metrics()
+        with self._phase('collect_results'):
+            self._collect_results(time_step)
+        if self._warm_start:
+            self._operating_points = self._operating_points[-1:] + [(self._p_out, self._q_out)]
+        if self._profiler is not None:
+            self._profiler.end_step(self._iterations, self._power_flow_solves, self._circuit.dss_calls)
 
         if self._converged:
             return self._p_out, self._q_out
         else:
             print('convergence error!')
 
+    def _converge(self, time_step):
+        """
+        Iterate the CER outputs and the power flow until convergence, then run the CER objects and solve the power flow at
+        the converged outputs.
+        """
+        i = 0
+        # State of the CERs at the start of the time step, every trial iteration starts from it so any calculation does not
+        # impact their soc variables if any.
+        cers_state = [cer.snapshot() for cer in self._cers]
+        if self._population is not None:
+            self._population.load_state()
+        if self._warm_start and self._operating_points:
+            self._seed_convergence()
+        volt = self._rebase_voltage_model() if self._voltage_model is not None else None
+
+        while not self._converged and i < 300:
+            # Run the CERs from the time step start and update the outputs to circuit simulation
+            with self._phase('run_cers'):
+                trial = self._run_trial(cers_state, time_step, volt)
+            self._convergence_iteration(*trial)
+            if self._voltage_model is None:
+                self._solve_power_flow()
+            else:
+                volt = self._voltage_model.voltages(self._p_out, self._q_out)
+                if self._converged:
+                    # Correct the model with the power flow solution, the convergence holds if the model was accurate
+                    predicted_v = volt
+                    self._solve_power_flow()
+                    volt = self._rebase_voltage_model()
+                    self._converged = bool(np.max(np.abs(volt - predicted_v), initial=0.0) <= self.__class__.V_TOLERANCE)
+            i = i + 1
+        self._iterations = i
+        # After iteration, the simulation should be converged. Run the actual CER objects and solve power flow.
+        with self._phase('run_cers'):
+            self._restore_cers(cers_state)
+            self.run_cers(self._cers, time_step)
+        self._solve_power_flow()
+
+    def _run_uncontrolled(self, time_step):
+        """
+        Time step without voltage dependent control (volt-var, volt-watt, charging volt-watt) on any CER: their outputs do
+        not depend on the circuit, so the CER objects are run once and the power flow is solved once at their outputs.
+        """
+        with self._phase('run_cers'):
+            self.run_cers(self._cers, time_step)
+        self._active_set_sizes.append(len(self._cers))
+        self._p_out, self._q_out = self._cer_powers()
+        self._solve_power_flow()
+        self._iterations = 1
+        self._converged = True
+
+    def _cer_powers(self) -> ([float], [float]):
+        """
+        :return: the output active and reactive powers of the CER objects
+        """
+        p = [cer.p_out if isinstance(cer, PVSystem) or isinstance(cer, HybridPVSystem) else cer.p_in for cer in self._cers]
+        q = [cer.q_out if isinstance(cer, PVSystem) or isinstance(cer, HybridPVSystem) else cer.q_in for cer in self._cers]
+        return p, q
+
+    def _solve_power_flow(self):
+        """
+        Write the CER outputs to the circuit and solve the power flow.
+        """
+        with self._phase('update_cer_setpoints'):
+            self._update_cer_setpoints()
+        with self._phase('solve_power_flow'):
+            self._circuit.solve_power_flow()
+        with self._phase('update_sys_voltage'):
+            self._circuit.update_sys_voltage()
+        self._power_flow_solves += 1
+
+    def _rebase_voltage_model(self) -> np.ndarray:
+        """
+        Move the linear voltage model to the last power flow solution, refreshing its sensitivities if it drifted.
+        :return: CER terminal voltages of the solution
+        """
+        volt = self._circuit.get_cer_voltages()
+        if self._voltage_model.rebase(volt, self._p_out, self._q_out):
+            self._voltage_model.refresh(*self._circuit.get_cer_voltage_sensitivities())
+        return volt
+
+    def _restore_cers(self, cers_state):
+        for cer, state in zip(self._cers, cers_state):
+            cer.restore(state)
+
+    def _update_cer_setpoints(self):
+        t = perf_counter()
+        self._setpoint_writes += self._circuit.update_cer_setpoints(self._p_out, self._q_out)
+        self._setpoint_write_time += perf_counter() - t
+
     def _change_delta_q_factor(self):
         for i, delta_q in enumerate(self._delta_q):
             if delta_q is not None:
@@ -276,8 +574,8 @@ class Compiler:
         self._delta_p_incr_high = delta_p_incr_high  # add when delta_v < 0.4 * old_delta_v
 
     def _collect_results(self, time_step):
-        Results.update_lines_results(self._circuit.get_lines_results())
-        Results.update_buses_results(self._circuit.get_buses_results()[0])
+        self._results.update_lines_results(self._circuit.get_lines_results())
+        self._results.update_buses_results(self._circuit.get_buses_results()[0])
         pv_set = list(self._circuit.pv_set.keys())
         ev_set = list(self._circuit.ev_set.keys())
         ac_curtailment = {key: 0.0 for key in pv_set}
@@ -290,11 +588,11 @@ class Compiler:
         pv_active_power = {key: 0.0 for key in pv_set}
         ev_reactive_power = {key: 0.0 for key in ev_set}
         ev_active_power = {key: 0.0 for key in ev_set}
-        energy_flow = {}
+        meters = {}
         for cer in self._cers:
             if type(cer) == Load and cer.circuit_label in self._circuit.loads_only_circuit_labels:
                 if cer.meter is not None:
-                    energy_flow[cer.circuit_label] = cer.meter.get_energy_flow_results()
+                    meters[cer.circuit_label] = cer.meter
 
             elif type(cer) == HybridPVSystem:
                 ac_curtailment[f'hybridpv_{cer.circuit_label}'] = cer.ac_curtailment
@@ -305,7 +603,7 @@ class Compiler:
                 pv_active_power[f'hybridpv_{cer.circuit_label}'] = cer.p_out
                 battery_stored_energy[f'hybridpv_{cer.circuit_label}'] = cer.battery.stored_energy
                 if cer.meter is not None:
-                    energy_flow[cer.circuit_label] = cer.meter.get_energy_flow_results()
+                    meters[cer.circuit_label] = cer.meter
 
             elif type(cer) == PVSystem:
                 ac_curtailment[f'pv_{cer.circuit_label}'] = cer.ac_curtailment
@@ -315,21 +613,24 @@ class Compiler:
                 pv_reactive_power[f'pv_{cer.circuit_label}'] = cer.q_out
                 pv_active_power[f'pv_{cer.circuit_label}'] = cer.p_out
                 if cer.meter is not None:
-                    energy_flow[cer.circuit_label] = cer.meter.get_energy_flow_results()
+                    meters[cer.circuit_label] = cer.meter
             elif type(cer) == EVSystem:
                 ev_battery_stored_energy[f'ev_{cer.circuit_label}'] = cer.battery.stored_energy
                 ev_reactive_power[f'ev_{cer.circuit_label}'] = cer.q_in
                 ev_active_power[f'ev_{cer.circuit_label}'] = cer.p_in
-
-        Results.update_inverter_register_results(ac_curtailment, dc_curtailment, dc_generation, ac_potential_output)
-        Results.update_energy_flow_results(energy_flow)
-        Results.update_battery_state_results(battery_stored_energy, ev_battery_stored_energy)
-        Results.update_total_powers(self._circuit.metrics.loc[0, 'active_power'], self._circuit.metrics.loc[0, 'reactive_power'],
-                                    self._circuit.metrics.loc[0, 'active_losses'], self._circuit.metrics.loc[0, 'reactive_losses'])
-
-        Results._update_pv_reactive_power_results(pv_reactive_power)
-        Results._update_pv_active_power_results(pv_active_power)
-        Results._update_ev_reactive_power_results(ev_reactive_power)
-        Results._update_ev_active_power_results(ev_active_power)
-
-        Results.update_initial_voltages_results(self._circuit.get_buses_results()[1], time_stamp=time_step)
+        energy_flow = dict(zip(meters, get_energy_flow_results(list(meters.values()))))
+
+        self._results.update_inverter_register_results(ac_curtailment, dc_curtailment, dc_generation, ac_potential_output)
+        self._results.update_energy_flow_results(energy_flow)
+        self._results.update_battery_state_results(battery_stored_energy, ev_battery_stored_energy)
+        self._results.update_total_powers(self._circuit.metrics.loc[0, 'active_power'], self._circuit.metrics.loc[0, 'reactive_power'],
+                                           self._circuit.metrics.loc[0, 'active_losses'], self._circuit.metrics.loc[0, 'reactive_losses'])
+
+        self._results._update_pv_reactive_power_results(pv_reactive_power)
+        self._results._update_pv_active_power_results(pv_active_power)
+        self._results._update_ev_reactive_power_results(ev_reactive_power)
+        self._results._update_ev_active_power_results(ev_active_power)
+
+        self._results.update_initial_voltages_results(self._circuit.get_buses_results()[1], time_stamp=time_step)
+        self._results.update_setpoint_write_results(self._setpoint_writes, self._setpoint_write_time)
+        self._results.update_iteration_results(self._iterations, self._active_set_sizes, self._residuals, self._power_flow_solves)
@@ -0,0 +1,299 @@
+import os
+import re
+import ast
+import json
+import hashlib
+from dataclasses import dataclass
+from functools import cached_property
+from time import perf_counter
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from src.external_input_data import import_txt_file_as_numpy
+from src.models.schedule import schedule_mask
+
+#  Binary input data cache. compile_day parses the text inputs of a day type once, the load profiles of every circuit label
+#  (load-data/<day>/LoadN.txt), irradiance and temperature (pv-data/<day>/solar.txt, temp.txt) and the EV behaviours
+#  (ev-data/evs_behaviour_<day>.csv), and writes them as .npy arrays in <cache>/<day>. load_day memory-maps the arrays
+#  read-only, so worker processes share the same pages. The manifest records the mtime, size and sha256 of every source,
+#  a source with a new mtime is hashed again and the day is recompiled only when the content of a source has changed.
+#
+#  <cache>/<day>/demand.npy          (labels x steps) load profiles, rows in the order of labels.npy
+#  <cache>/<day>/irradiance.npy, temperature.npy
+#  <cache>/<day>/ev_labels.npy, ev_distance.npy, ev_offsets.npy, ev_intervals.npy
+#                                    driving intervals of ev_labels[i] are ev_intervals[ev_offsets[i]:ev_offsets[i + 1]]
+#
+#  The admittance matrices of the network models are cached too, see load_y_matrix.
+#
+#  <cache>/ybus/<engine>-<sha256 of the model>.npz   CSR arrays (data, indices, indptr, shape) and node names
+
+DATA_PATH = os.path.dirname(os.path.dirname(__file__)) + '/data'
+CACHE_VERSION = 1
+ARRAYS = ['labels', 'demand', 'irradiance', 'temperature', 'ev_labels', 'ev_distance', 'ev_offsets', 'ev_intervals']
+
+
+class EVBehaviourRepository:
+    """
+    Driving behaviour of the EVs of a day type. The [start, end) driving hours of all the EVs are flat arrays, the intervals
+    of labels[i] being starts[offsets[i]:offsets[i + 1]] and ends[offsets[i]:offsets[i + 1]].
+    """
+
+    def __init__(self, labels: np.ndarray, distances: np.ndarray, offsets: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        self._labels = np.asarray(labels, dtype=int)
+        self._distances = np.asarray(distances, dtype=int)
+        self._offsets = np.asarray(offsets, dtype=int)
+        self._starts = np.asarray(starts, dtype=float)
+        self._ends = np.asarray(ends, dtype=float)
+        self._rows = {label: row for row, label in enumerate(self._labels.tolist())}
+        # {(step_size, steps): (labels x steps) at-home masks}
+        self._at_home = {}
+
+    @classmethod
+    def from_csv(cls, path: str):
+        """
+        Parse an evs_behaviour_<day>.csv (Label, Driving Hours, Driving Distance)
+        """
+        ev_behaviour_data = pd.read_csv(path).set_index('Label')
+        intervals = [ast.literal_eval(value) for value in ev_behaviour_data.iloc[:, 0].values]
+        flat_intervals = np.array([interval for driving_intervals in intervals for interval in driving_intervals], dtype=float).reshape(-1, 2)
+        return cls(ev_behaviour_data.index.values, ev_behaviour_data.iloc[:, 1].values,
+                   np.cumsum([0] + [len(driving_intervals) for driving_intervals in intervals]), flat_intervals[:, 0], flat_intervals[:, 1])
+
+    @property
+    def labels(self) -> np.ndarray:
+        return self._labels
+
+    @property
+    def offsets(self) -> np.ndarray:
+        return self._offsets
+
+    @property
+    def starts(self) -> np.ndarray:
+        return self._starts
+
+    @property
+    def ends(self) -> np.ndarray:
+        return self._ends
+
+    def rows(self, labels: [int]) -> np.ndarray:
+        return np.array([self._rows[label] for label in labels], dtype=int)
+
+    def driving_distances(self, labels: [int]) -> np.ndarray:
+        return self._distances[self.rows(labels)]
+
+    def driving_intervals(self, label: int) -> [[float, float]]:
+        row = self._rows[label]
+        return [[start, end] for start, end in zip(self._starts[self._offsets[row]:self._offsets[row + 1]].tolist(),
+                                                    self._ends[self._offsets[row]:self._offsets[row + 1]].tolist())]
+
+    def behaviour(self, label: int) -> dict:
+        """
+        :return: {'driving_distance', 'driving_intervals'} as returned by utils.get_ev_behaviour
+        """
+        return {'driving_distance': int(self._distances[self._rows[label]]), 'driving_intervals': self.driving_intervals(label)}
+
+    def behaviours(self, labels: [int]) -> {int: dict}:
+        return {label: self.behaviour(label) for label in labels}
+
+    def at_home_masks(self, step_size: int, steps: int = None) -> np.ndarray:
+        """
+        :param steps: number of time steps, a day if None
+        :return: read-only (labels x steps) masks, True when the EV is at home at the time step (see Vehicle.check_ev_at_home)
+        """
+        steps = 24 * 60 // step_size if steps is None else steps
+        if (step_size, steps) not in self._at_home:
+            at_home = np.array([schedule_mask(self.driving_intervals(label), step_size, inside=False, steps=steps)
+                                for label in self._labels.tolist()], dtype=bool).reshape(len(self._labels), steps)
+            at_home.flags.writeable = False
+            self._at_home[(step_size, steps)] = at_home
+        return self._at_home[(step_size, steps)]
+
+    def at_home_mask(self, label: int, step_size: int, steps: int = None) -> np.ndarray:
+        return self.at_home_masks(step_size, steps)[self._rows[label]]
+
+
+@dataclass
+class DayData:
+    """
+    Input data of a day type, arrays memory-mapped from the cache
+    """
+    labels: np.ndarray
+    demand: np.ndarray
+    irradiance: np.ndarray
+    temperature: np.ndarray
+    ev_labels: np.ndarray
+    ev_distance: np.ndarray
+    ev_offsets: np.ndarray
+    ev_intervals: np.ndarray
+
+    def demand_power(self, labels: [int]) -> {int: np.ndarray}:
+        rows = {label: row for row, label in enumerate(self.labels.tolist())}
+        return {label: self.demand[rows[label]] for label in labels}
+
+    @cached_property
+    def evs(self) -> EVBehaviourRepository:
+        """
+        :return: the EV behaviours of the day, built once so that its at-home masks are compiled once per step size
+        """
+        return EVBehaviourRepository(self.ev_labels, self.ev_distance, self.ev_offsets, self.ev_intervals[:, 0], self.ev_intervals[:, 1])
+
+    def ev_behaviour(self, labels: [int]) -> {int: dict}:
+        """
+        :return: {label: {'driving_distance', 'driving_intervals'}} as returned by utils.get_ev_behaviour
+        """
+        return self.evs.behaviours(labels)
+
+
+def _load_files(day: str, data_path: str) -> {int: str}:
+    # LoadN.txt, case-insensitive as some day types are named loadN.txt
+    load_path = os.path.join(data_path, 'load-data', day)
+    files = {}
+    for file_name in os.listdir(load_path):
+        match = re.fullmatch(r'load(\d+)\.txt', file_name, flags=re.IGNORECASE)
+        if match:
+            files[int(match.group(1))] = os.path.join(load_path, file_name)
+    return dict(sorted(files.items()))
+
+
+def _sources(day: str, data_path: str) -> [str]:
+    return list(_load_files(day, data_path).values()) + [os.path.join(data_path, 'pv-data', day, 'solar.txt'),
+                                                         os.path.join(data_path, 'pv-data', day, 'temp.txt'),
+                                                         os.path.join(data_path, 'ev-data', f'evs_behaviour_{day}.csv')]
+
+
+def _sha256(path: str) -> str:
+    with open(path, 'rb') as file:
+        return hashlib.sha256(file.read()).hexdigest()
+
+
+def _source_entry(path: str, sha256: str = None) -> dict:
+    stat = os.stat(path)
+    return {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': _sha256(path) if sha256 is None else sha256}
+
+
+def _write(path: str, write, mode: str = 'wb') -> None:
+    # Write next to the target and rename, readers never see a partial file
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    with open(tmp_path, mode) as file:
+        write(file)
+    os.replace(tmp_path, path)
+
+
+def _cache_dir(day: str, data_path: str, cache_path: str = None) -> str:
+    return os.path.join(os.path.join(data_path, '.cache') if cache_path is None else cache_path, day)
+
+
+def is_fresh(day: str, data_path: str = DATA_PATH, cache_path: str = None) -> bool:
+    """
+    :return: True if the cache of the day type matches the content of its sources. Sources whose mtime changed but not
+    their content get their manifest entry refreshed
+    """
+    day_path = _cache_dir(day, data_path, cache_path)
+    try:
+        with open(os.path.join(day_path, 'manifest.json'), 'r') as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return False
+    sources = {os.path.relpath(path, data_path): path for path in _sources(day, data_path)}
+    if manifest.get('version') != CACHE_VERSION or set(manifest.get('sources', {})) != set(sources):
+        return False
+    touched = False
+    for name, path in sources.items():
+        entry = manifest['sources'][name]
+        stat = os.stat(path)
+        if stat.st_mtime_ns == entry['mtime_ns'] and stat.st_size == entry['size']:
+            continue
+        sha256 = _sha256(path)
+        if sha256 != entry['sha256']:
+            return False
+        manifest['sources'][name] = _source_entry(path, sha256)
+        touched = True
+    if touched:
+        _write(os.path.join(day_path, 'manifest.json'), lambda file: json.dump(manifest, file, indent=1), mode='w')
+    return all(os.path.exists(os.path.join(day_path, f'{name}.npy')) for name in ARRAYS)
+
+
+def compile_day(day: str, data_path: str = DATA_PATH, cache_path: str = None) -> str:
+    """
+    Parse the text inputs of a day type and write them to the cache.
+    :return: the cache directory of the day type
+    """
+    load_files = _load_files(day, data_path)
+    demand = np.stack([import_txt_file_as_numpy(path) for path in load_files.values()])
+    irradiance = import_txt_file_as_numpy(os.path.join(data_path, 'pv-data', day, 'solar.txt'))
+    temperature = import_txt_file_as_numpy(os.path.join(data_path, 'pv-data', day, 'temp.txt'))
+
+    evs = EVBehaviourRepository.from_csv(os.path.join(data_path, 'ev-data', f'evs_behaviour_{day}.csv'))
+    arrays = {'labels': np.array(list(load_files.keys()), dtype=int),
+              'demand': demand,
+              'irradiance': irradiance,
+              'temperature': temperature,
+              'ev_labels': evs.labels,
+              'ev_distance': evs.driving_distances(evs.labels),
+              'ev_offsets': evs.offsets,
+              'ev_intervals': np.column_stack([evs.starts, evs.ends])}
+
+    day_path = _cache_dir(day, data_path, cache_path)
+    os.makedirs(day_path, exist_ok=True)
+    for name, array in arrays.items():
+        _write(os.path.join(day_path, f'{name}.npy'), lambda file: np.save(file, array))
+    # The manifest goes last, an interrupted compile leaves the day stale
+    manifest = {'version': CACHE_VERSION,
+                'sources': {os.path.relpath(path, data_path): _source_entry(path) for path in _sources(day, data_path)}}
+    _write(os.path.join(day_path, 'manifest.json'), lambda file: json.dump(manifest, file, indent=1), mode='w')
+    return day_path
+
+
+def load_day(day: str, data_path: str = DATA_PATH, cache_path: str = None) -> DayData:
+    """
+    :return: the input data of a day type from the cache, compiled first if missing or stale
+    """
+    if not is_fresh(day, data_path, cache_path):
+        compile_day(day, data_path, cache_path)
+    day_path = _cache_dir(day, data_path, cache_path)
+    return DayData(**{name: np.load(os.path.join(day_path, f'{name}.npy'), mmap_mode='r') for name in ARRAYS})
+
+
+def load_y_matrix(model_path: str, engine: str, extract, data_path: str = DATA_PATH, cache_path: str = None) -> (sparse.csr_matrix, np.ndarray):
+    """
+    :param model_path: path of the network model (.dss), the cache is keyed by the sha256 of its content
+    :param engine: engine the matrix is extracted with, the engines model the circuit elements differently
+    :param extract: function returning the (CSR matrix, node names) of the model, called when it is not cached
+    :return: the admittance matrix of the network model and the node names of its rows and columns
+    """
+    path = os.path.join(_cache_dir('ybus', data_path, cache_path), f'{engine}-{_sha256(model_path)}.npz')
+    try:
+        with np.load(path, allow_pickle=False) as arrays:
+            if int(arrays['version']) == CACHE_VERSION:
+                return sparse.csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=tuple(arrays['shape'])), arrays['nodes']
+    except (OSError, ValueError, KeyError):
+        pass
+    y_matrix, nodes = extract()
+    y_matrix, nodes = sparse.csr_matrix(y_matrix), np.asarray(nodes, dtype=str)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    _write(path, lambda file: np.savez(file, version=CACHE_VERSION, data=y_matrix.data, indices=y_matrix.indices, indptr=y_matrix.indptr,
+                                       shape=np.array(y_matrix.shape), nodes=nodes))
+    return y_matrix, nodes
+
+
+if __name__ == '__main__':
+    from src.models.vehicle import Vehicle
+    for day in sorted(os.listdir(DATA_PATH + '/load-data')):
+        t = perf_counter()
+        labels = list(_load_files(day, DATA_PATH).keys())
+        demand_power = {label: import_txt_file_as_numpy(path) for label, path in _load_files(day, DATA_PATH).items()}
+        ev_behaviour_data = pd.read_csv(DATA_PATH + f'/ev-data/evs_behaviour_{day}.csv').set_index('Label')
+        ev_behaviour = {label: {'driving_distance': int(ev_behaviour_data.loc[label].values[1]),
+                                'driving_intervals': ast.literal_eval(ev_behaviour_data.loc[label].values[0])} for label in labels}
+        text_time = perf_counter() - t
+        compile_day(day)
+        t = perf_counter()
+        data = load_day(day)
+        cached_demand_power, cached_ev_behaviour = data.demand_power(labels), data.ev_behaviour(labels)
+        cache_time = perf_counter() - t
+        assert all(np.array_equal(demand_power[label], cached_demand_power[label]) for label in labels)
+        assert cached_ev_behaviour == ev_behaviour
+        at_home = data.evs.at_home_masks(30)
+        assert all(at_home[row, step] == Vehicle(label, 50, ev_behaviour[label]['driving_intervals'], step_size=30).check_ev_at_home(step)
+                   for row, label in enumerate(data.ev_labels.tolist()) for step in range(at_home.shape[1]))
+        print(f'{day}: {len(labels)} labels, text {1000 * text_time:.0f} ms, cache {1000 * cache_time:.1f} ms')
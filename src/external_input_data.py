@@ -36,6 +36,7 @@ class ModelInputData:
     step_size: int
     time_range: [float, float]
     ev_behaviour: {int: [[tuple], int, [tuple], [tuple]]}
+    ev_at_home: {int: np.ndarray} = None  # at-home masks of the time steps (EVBehaviourRepository.at_home_mask)
 
 
 if __name__ == '__main__':
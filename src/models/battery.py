@@ -25,6 +25,12 @@ class Battery:
     def stored_energy(self):
         return self._soc * self._capacity
 
+    def snapshot(self):
+        return self._soc, self._battery_state
+
+    def restore(self, state):
+        self._soc, self._battery_state = state
+
     def charge(self, power):
         power = abs(power)
         ch_power = min(power, self.max_charge_power())
@@ -37,6 +37,14 @@ class EVSystem:
     def battery(self):
         return self._battery
 
+    def snapshot(self):
+        return self._volt, self._q_in, self._p_in, self._inverter.snapshot(), self._battery.snapshot()
+
+    def restore(self, state):
+        self._volt, self._q_in, self._p_in, inverter_state, battery_state = state
+        self._inverter.restore(inverter_state)
+        self._battery.restore(battery_state)
+
     def get_energy_per_distance(self):
         return self._battery.capacity / self._vehicle.battery_range
 
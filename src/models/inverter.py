@@ -1,7 +1,12 @@
 import numpy as np
+from bisect import bisect_right
+from functools import lru_cache
 from math import sin, acos, sqrt, hypot, copysign
-from scipy.optimize import root_scalar
 from typing import Tuple
+from src.models.schedule import schedule_mask
+
+# Upper bound of the p_dc bracket of get_pdc_from_efficiency
+PDC_UPPER_BOUND = 7.2  # Change to pmpp
 
 
 class StaticExportLimit:
@@ -47,6 +52,8 @@ class V2GEVCharging:
         self._charging_times = charging_times or [(10, 15)]
         self._discharging_times = discharging_times or [(15, 21)]
         self._step_size = step_size
+        self._charging_mask = schedule_mask(self._charging_times, step_size)
+        self._discharging_mask = schedule_mask(self._discharging_times, step_size)
 
     @property
     def charging_times(self):
@@ -56,6 +63,14 @@ class V2GEVCharging:
     def discharging_times(self):
         return self._discharging_times
 
+    @property
+    def charging_mask(self):
+        return self._charging_mask
+
+    @property
+    def discharging_mask(self):
+        return self._discharging_mask
+
     @property
     def step_size(self):
         return self._step_size
@@ -65,11 +80,16 @@ class ManagedEVCharging:
     def __init__(self, charging_times: list[tuple] = None, step_size=None):
         self._charging_times = charging_times or [(10, 15)]
         self._step_size = step_size
+        self._charging_mask = schedule_mask(self._charging_times, step_size)
 
     @property
     def charging_times(self):
         return self._charging_times
 
+    @property
+    def charging_mask(self):
+        return self._charging_mask
+
     @property
     def step_size(self):
         return self._step_size
@@ -178,6 +198,69 @@ class InverterSettings:
         return False
 
 
+class InverseEfficiency:
+    """
+    Inverse of p -> p * eff(p) for one inverter rating and efficiency curve. The efficiency is piecewise linear in p, so
+    the inverse is piecewise quadratic and solved in closed form. Instances are shared, see get_inverse_efficiency.
+    """
+
+    def __init__(self, rated_kva, eff_curve):
+        knots = np.array(sorted({0.0, 1.0} | {x for x in eff_curve[0] if 0.0 < x < 1.0}))
+        self._rated_kva = rated_kva
+        self._p = knots * rated_kva
+        self._eff = np.interp(knots, eff_curve[0], eff_curve[1])
+        self._f = self._p * self._eff
+        # The efficiency is constant above the rated power
+        self._slope = np.append(np.diff(self._eff) / np.diff(self._p), 0.0)
+        self._segments = list(zip(self._p.tolist(), self._eff.tolist(), self._slope.tolist()))
+        self._p_list = self._p.tolist()
+        self._f_list = self._f.tolist()
+
+    def output(self, p):
+        """
+        :return: p * eff(p), the forward function of the inverse
+        """
+        p_j, eff_j, slope_j = self._segments[max(bisect_right(self._p_list, p) - 1, 0)]
+        return p * (eff_j + slope_j * (p - p_j))
+
+    def __call__(self, y, upper_bound=None):
+        """
+        :param y: array of outputs p * eff(p)
+        :param upper_bound: upper bound of the bracket of p, the rated kVA if None
+        :return: array of p
+        """
+        y = np.asarray(y, dtype=float)
+        invalid = (y < 0) | (y > self.output(self._rated_kva if upper_bound is None else upper_bound))
+        if np.any(invalid):
+            raise ValueError(f"Could not find p_dc for output {y[invalid][0]}")
+        j = np.clip(np.searchsorted(self._f, y, side='right') - 1, 0, len(self._f) - 1)
+        b = self._eff[j] - self._slope[j] * self._p[j]
+        # Root of slope * p^2 + b * p - y = 0, written to stay accurate when the slope is 0
+        return 2 * y / (b + np.sqrt(b ** 2 + 4 * self._slope[j] * y))
+
+    def solve(self, y, upper_bound=None) -> float:
+        """
+        Scalar version of __call__.
+        """
+        if not 0 <= y <= self.output(self._rated_kva if upper_bound is None else upper_bound):
+            raise ValueError(f"Could not find p_dc for output {y}")
+        p_j, eff_j, slope_j = self._segments[max(bisect_right(self._f_list, y) - 1, 0)]
+        b = eff_j - slope_j * p_j
+        return 2 * y / (b + sqrt(b ** 2 + 4 * slope_j * y)) if y else 0.0
+
+
+@lru_cache(maxsize=None)
+def _cached_inverse_efficiency(rated_kva, eff_x, eff_y):
+    return InverseEfficiency(rated_kva, [eff_x, eff_y])
+
+
+def get_inverse_efficiency(rated_kva, eff_curve) -> InverseEfficiency:
+    """
+    :return: the InverseEfficiency of (rated_kva, eff_curve), built once per distinct pair
+    """
+    return _cached_inverse_efficiency(float(rated_kva), tuple(eff_curve[0]), tuple(eff_curve[1]))
+
+
 class Inverter:
     def __init__(self, circuit_label=None, rated_kva=6.0, eff_curve=None, cut_in=0.1, cut_out=0.1, inverter_settings: InverterSettings = None):
         self._circuit_label = circuit_label
@@ -185,6 +268,7 @@ class Inverter:
             eff_curve = [[0.1, 0.2, 0.4, 1.0], [0.86, 0.9, 0.93, 0.97]]
         self._rated_kva = rated_kva
         self._eff_curve = eff_curve
+        self._inverse_efficiency = get_inverse_efficiency(rated_kva, eff_curve)
         self._cut_in = cut_in
         self._cut_out = cut_out
         self._inverter_settings = inverter_settings
@@ -223,6 +307,15 @@ class Inverter:
     def rated_kva(self):
         return self._rated_kva
 
+    def snapshot(self):
+        """
+        :return: the state changed by the inverter calculations, restore(state) rolls the inverter back to it
+        """
+        return self._p_out, self._q_out
+
+    def restore(self, state):
+        self._p_out, self._q_out = state
+
     def get_inverter_eff(self, p_dc):
         pdc_pu = p_dc / self._rated_kva
         if pdc_pu > 1.0:
@@ -328,15 +421,7 @@ class Inverter:
         """
         Returns the input p_dc that gives the desired p_ac.
         """
-
-        def func(p_dc):
-            return p_dc * self.get_inverter_eff(p_dc) - p_ac
-
-        result = root_scalar(func, bracket=[0, 7.2])  # Change to pmpp
-        if result.converged:
-            return result.root
-        else:
-            raise ValueError(f"Could not find p_dc for output {p_ac}")
+        return self._inverse_efficiency.solve(p_ac, PDC_UPPER_BOUND)
 
     @classmethod
     def get_output_power_cls(cls, p_dc: float, rated_kva: float, eff_curve: list = None, cut_in: float = 0.1, cut_out: float = 0.1) -> float:
@@ -511,6 +596,22 @@ class EVInverterSettings(InverterSettings):
         else:
             return None
 
+    @property
+    def charging_mask(self):
+        if self._en_managed_charging:
+            return self._managed_charging.charging_mask
+        elif self._en_v2g_charging:
+            return self._v2g_charging.charging_mask
+        else:
+            return None
+
+    @property
+    def discharging_mask(self):
+        if self._en_v2g_charging:
+            return self._v2g_charging.discharging_mask
+        else:
+            return None
+
     @property
     def step_size(self):
         if self._en_managed_charging:
@@ -538,6 +639,13 @@ class HybridInverter(Inverter):
     def vw_ch_enabled(self):
         return self._hybrid_inverter_settings.en_charging_volt_watt
 
+    def snapshot(self):
+        return super().snapshot(), self._battery_power, self._max_battery_charge_power, self._max_battery_discharge_power
+
+    def restore(self, state):
+        inverter_state, self._battery_power, self._max_battery_charge_power, self._max_battery_discharge_power = state
+        super().restore(inverter_state)
+
     def update_battery_power_limits(self, max_charge: float, max_discharge: float) -> None:
         self._max_battery_charge_power = max_charge
         self._max_battery_discharge_power = max_discharge
@@ -618,15 +726,7 @@ class HybridInverter(Inverter):
         """
         Returns the input p_dc that gives the desired p_ac.
         """
-
-        def func(p_ac):
-            return p_ac * self.get_inverter_eff(p_ac) - p_dc
-
-        result = root_scalar(func, bracket=[0, self._rated_kva])
-        if result.converged:
-            return result.root
-        else:
-            raise ValueError(f"Could not find p_dc for output {p_dc}")
+        return self._inverse_efficiency.solve(p_dc)
 
     def set_battery_power(self, battery_power: float) -> None:
         """
@@ -650,6 +750,13 @@ class EVInverter(Inverter):
     def vw_ch_enabled(self):
         return self._ev_inverter_settings.en_charging_volt_watt
 
+    def snapshot(self):
+        return super().snapshot(), self._battery_power, self._energy_per_distance, self._max_battery_charge_power, self._max_battery_discharge_power
+
+    def restore(self, state):
+        inverter_state, self._battery_power, self._energy_per_distance, self._max_battery_charge_power, self._max_battery_discharge_power = state
+        super().restore(inverter_state)
+
     def update_battery_power_limits(self, energy_per_distance: float, max_charge: float, max_discharge: float) -> None:
         self._energy_per_distance = energy_per_distance
         self._max_battery_charge_power = max_charge
@@ -726,31 +833,18 @@ class EVInverter(Inverter):
         """
         Returns the input p_dc that gives the desired p_ac.
         """
-
-        def func(p_dc):
-            return p_dc * self.get_inverter_eff(p_dc) - p_ac
-
-        result = root_scalar(func, bracket=[0, 7.2])
-        if result.converged:
-            return result.root
-        else:
-            raise ValueError(f"Could not find p_dc for output {p_ac}")
+        return self._inverse_efficiency.solve(p_ac, PDC_UPPER_BOUND)
 
     def get_ac_from_efficiency_for_charging(self, p_dc) -> float:
         """
         Returns the input p_dc that gives the desired p_ac.
         """
-
-        def func(p_ac):
-            return p_ac * self.get_inverter_eff(p_ac) - p_dc
-
-        result = root_scalar(func, bracket=[0, self._rated_kva])
-        if result.converged:
-            return result.root
-        else:
-            raise ValueError(f"Could not find p_dc for output {p_dc}")
+        return self._inverse_efficiency.solve(p_dc)
 
     def check_ev_in_charging_times(self, time_step):
+        mask = self._ev_inverter_settings.charging_mask
+        if mask is not None and time_step < len(mask):
+            return bool(mask[time_step])
         if self._ev_inverter_settings.charging_times is None:
             print("The charging mode has to be either set at managed or v2g charging.")
         if sum([1 if interval[0] <= time_step * (self._ev_inverter_settings.step_size / 60) < interval[1] else 0 for interval in self._ev_inverter_settings.charging_times]) == 0:
@@ -759,6 +853,9 @@ class EVInverter(Inverter):
             return True
 
     def check_ev_in_discharging_times(self, time_step):
+        mask = self._ev_inverter_settings.discharging_mask
+        if mask is not None and time_step < len(mask):
+            return bool(mask[time_step])
         if self._ev_inverter_settings.discharging_times is None:
             print("The discharging mode has to be set at v2g charging.")
         if sum([1 if interval[0] <= time_step * (self._ev_inverter_settings.step_size / 60) < interval[1] else 0 for interval in
@@ -35,6 +35,12 @@ class Load:
         from src.models.meter import Meter
         return self._meter
 
+    def snapshot(self):
+        return self._p_in, self._q_in, self._power_factor, self._volt
+
+    def restore(self, state):
+        self._p_in, self._q_in, self._power_factor, self._volt = state
+
     def set_demand(self, power):
         # It should be the active power, but for the purposes of my project I changed this and assumed the power is an apparent power
         self._p_in = power # * self._power_factor * 0.8
@@ -1,3 +1,4 @@
+import numpy as np
 from src.models.load import Load
 from src.models.inverter import Inverter, HybridInverter
 from src.models.ev import EVSystem
@@ -61,11 +62,19 @@ class Meter:
 
         return self.total_inverter_power - self.total_ev_power - self.total_load_power
 
+    def _energy_flows(self) -> dict:
+        """
+        Read the totals of the members once and derive all the energy flows from them, see energy_flows. Each flow property
+        below calls it, so reading several of them re-sums the members each time: get_energy_flow_results is the single
+        pass over the flows of a step.
+        """
+        return _split_energy_flows(float(self.get_total_load_power()), float(self.get_total_inverter_power()),
+                                   float(self.get_total_ev_power()), min, max)
+
     @property
     def inverter_to_load(self):
         """Power from inverters to loads."""
-        inverter_export = max(self.total_inverter_power, 0)
-        return min(inverter_export, self.total_load_power)
+        return self._energy_flows()['inverter_to_load']
 
     @property
     def battery_power(self) -> float:
@@ -80,63 +89,42 @@ class Meter:
     @property
     def inverter_to_ev(self):
         """Power from inverters to EVs (charging)."""
-        if self.total_ev_power < 0:
-            return 0  # EV is discharging, not charging
-        remaining_inv = max(self.total_inverter_power - self.inverter_to_load, 0)
-        return min(remaining_inv, self.total_ev_power)
+        return self._energy_flows()['inverter_to_ev']
 
     @property
     def inverter_to_grid(self):
         """Excess inverter power exported to the grid."""
-        remaining_inv = max(self.total_inverter_power - self.inverter_to_load - self.inverter_to_ev, 0)
-        return remaining_inv if self.get_grid_power() > 0 else 0
+        return self._energy_flows()['inverter_to_grid']
 
     @property
     def ev_to_load(self):
         """Power from discharging EVs to loads."""
-        ev_discharge = max(-self.total_ev_power, 0)
-        unmet_load = max(self.total_load_power - self.inverter_to_load, 0)
-        return min(ev_discharge, unmet_load)
+        return self._energy_flows()['ev_to_load']
 
     @property
     def ev_to_inverter(self):
         """Power from discharging EVs to inverters (if inverters are importing)."""
-        if self.total_inverter_power >= 0:
-            return 0  # Inverters are not importing
-        ev_discharge_remaining = max(-self.total_ev_power - self.ev_to_load, 0)
-        inverter_import = abs(self.total_inverter_power)
-        return min(ev_discharge_remaining, inverter_import)
+        return self._energy_flows()['ev_to_inverter']
 
     @property
     def ev_to_grid(self):
         """Excess EV discharge power exported to the grid."""
-        ev_discharge_remaining = max(
-            -self.total_ev_power - self.ev_to_load - self.ev_to_inverter, 0
-        )
-        return ev_discharge_remaining if self.get_grid_power() > 0 else 0
+        return self._energy_flows()['ev_to_grid']
 
     @property
     def grid_to_load(self):
         """Power from the grid to loads."""
-        unmet_load = max(
-            self.total_load_power - self.inverter_to_load - self.ev_to_load, 0
-        )
-        return unmet_load if self.get_grid_power() < 0 else 0
+        return self._energy_flows()['grid_to_load']
 
     @property
     def grid_to_ev(self):
         """Power from the grid to EVs (charging)."""
-        if self.total_ev_power < 0:
-            return 0  # EV is discharging, not charging
-        unmet_ev = max(self.total_ev_power - self.inverter_to_ev, 0)
-        return unmet_ev if self.get_grid_power() < 0 else 0
+        return self._energy_flows()['grid_to_ev']
 
     @property
     def grid_to_inverter(self):
         """Power from the grid to inverters (if inverters are importing)."""
-        if self.total_inverter_power >= 0:
-            return 0  # Inverters are exporting
-        return abs(self.total_inverter_power) if self.get_grid_power() < 0 else 0
+        return self._energy_flows()['grid_to_inverter']
 
     def initialise_energy_flow_results(self) -> dict:
         summary_data = {
@@ -195,40 +183,87 @@ class Meter:
 
         return summary_data
 
-    def get_energy_flow_results(self) -> dict:
-        summary = {}
-
+    def energy_flow_result_keys(self) -> [(str, str)]:
+        """
+        :return: (result name, energy_flows key) of the energy flow results of the meter, depending on its members
+        """
+        keys = []
         if self._inverters:
-            summary["Inverter Power (kW)"] = self.total_inverter_power
+            keys.append(("Inverter Power (kW)", 'inverter'))
             # Add inverter-to-battery only if HybridInverters exist
             if any(isinstance(inv, HybridInverter) for inv in self._inverters):
-                summary["Battery Power (kW)"] = self.battery_power
-
+                keys.append(("Battery Power (kW)", 'battery'))
         if self._loads:
-            summary["Load Power (kW)"] = self.total_load_power
-
+            keys.append(("Load Power (kW)", 'load'))
         if self._inverters and self._loads:
-            summary["Inverter to Load (kW)"] = self.inverter_to_load
-
+            keys.append(("Inverter to Load (kW)", 'inverter_to_load'))
         if self._inverters:
-            summary["Inverter to Grid (kW)"] = self.inverter_to_grid
-
+            keys.append(("Inverter to Grid (kW)", 'inverter_to_grid'))
         if self._inverters and self._evs:
-            summary["Inverter to EV (kW)"] = self.inverter_to_ev
-
+            keys.append(("Inverter to EV (kW)", 'inverter_to_ev'))
         if self._loads:
-            summary["Grid to Load (kW)"] = self.grid_to_load
-
+            keys.append(("Grid to Load (kW)", 'grid_to_load'))
         if self._evs:
-            summary["Grid to EV (kW)"] = self.grid_to_ev
-
+            keys.append(("Grid to EV (kW)", 'grid_to_ev'))
         if self._evs and self._loads:
-            summary["EV to Load (kW)"] = self.ev_to_load
-
-        if self._evs:
-            summary["EV to Grid (kW)"] = self.ev_to_grid
-
+            keys.append(("EV to Load (kW)", 'ev_to_load'))
         if self._evs:
-            summary["EV Power (kW)"] = self.total_ev_power
+            keys.append(("EV to Grid (kW)", 'ev_to_grid'))
+            keys.append(("EV Power (kW)", 'ev'))
+        return keys
 
-        return summary
+    def get_energy_flow_results(self) -> dict:
+        flows = self._energy_flows()
+        keys = self.energy_flow_result_keys()
+        if any(key == 'battery' for _, key in keys):
+            flows['battery'] = self.battery_power
+        return {name: flows[key] for name, key in keys}
+
+
+def _split_energy_flows(load, inverter, ev, minimum, maximum) -> dict:
+    """
+    Split of the meter powers between the loads, inverters, EVs and grid, shared by the scalar (min, max) and the array
+    (np.minimum, np.maximum) versions. A flow that only exists under a condition is multiplied by it, the flows being positive.
+    """
+    grid = inverter - ev - load
+    inverter_to_load = minimum(maximum(inverter, 0), load)
+    inverter_to_ev = minimum(maximum(inverter - inverter_to_load, 0), maximum(ev, 0))
+    ev_to_load = minimum(maximum(-ev, 0), maximum(load - inverter_to_load, 0))
+    ev_to_inverter = minimum(maximum(-ev - ev_to_load, 0), abs(inverter)) * (inverter < 0)
+    return {'load': load, 'inverter': inverter, 'ev': ev, 'grid': grid,
+            'inverter_to_load': inverter_to_load,
+            'inverter_to_ev': inverter_to_ev,
+            'inverter_to_grid': maximum(inverter - inverter_to_load - inverter_to_ev, 0) * (grid > 0),
+            'ev_to_load': ev_to_load,
+            'ev_to_inverter': ev_to_inverter,
+            'ev_to_grid': maximum(-ev - ev_to_load - ev_to_inverter, 0) * (grid > 0),
+            'grid_to_load': maximum(load - inverter_to_load - ev_to_load, 0) * (grid < 0),
+            'grid_to_ev': maximum(ev - inverter_to_ev, 0) * ((ev >= 0) & (grid < 0)),
+            'grid_to_inverter': abs(inverter) * ((inverter < 0) & (grid < 0))}
+
+
+def energy_flows(load_power, inverter_power, ev_power) -> dict:
+    """
+    Energy flows of Meter.get_energy_flow_results for arrays of meter totals (one element per meter).
+    :param load_power: total load power of each meter (kW)
+    :param inverter_power: total inverter output power of each meter, exported (+) or imported (-) (kW)
+    :param ev_power: total EV power of each meter, charging (+) or discharging (-) (kW)
+    :return: {energy_flows key: array}
+    """
+    return _split_energy_flows(np.asarray(load_power, dtype=float), np.asarray(inverter_power, dtype=float),
+                               np.asarray(ev_power, dtype=float), np.minimum, np.maximum)
+
+
+def get_energy_flow_results(meters: [Meter]) -> [dict]:
+    """
+    Meter.get_energy_flow_results of all the meters, with the energy flows computed on arrays of their totals.
+    :return: the energy flow results of each meter, in the order of meters
+    """
+    flows = energy_flows([meter.get_total_load_power() for meter in meters], [meter.get_total_inverter_power() for meter in meters],
+                         [meter.get_total_ev_power() for meter in meters])
+    flows = {key: values.tolist() for key, values in flows.items()}
+    results = []
+    for i, meter in enumerate(meters):
+        keys = meter.energy_flow_result_keys()
+        results.append({name: meter.battery_power if key == 'battery' else flows[key][i] for name, key in keys})
+    return results
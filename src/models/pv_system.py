@@ -60,6 +60,15 @@ class PVSystem:
     def dc_curtailment(self):
         return self._dc_curtailment
 
+    def snapshot(self):
+        return (self._irrad, self._temp, self._volt, self._q_out, self._p_out, self._dc_generation, self._dc_curtailment,
+                self._ac_potential_output, self._ac_curtailment, self._inverter.snapshot())
+
+    def restore(self, state):
+        self._irrad, self._temp, self._volt, self._q_out, self._p_out, self._dc_generation, self._dc_curtailment, \
+            self._ac_potential_output, self._ac_curtailment, inverter_state = state
+        self._inverter.restore(inverter_state)
+
     def get_potential_pv_inverter_generation(self, p_pv):
         if self._inverter.status(p_pv):
             if p_pv * self._inverter.get_inverter_eff(p_pv) > self.inverter.rated_kva:
@@ -105,6 +114,14 @@ class HybridPVSystem(PVSystem):
     def battery(self):
         return self._battery
 
+    def snapshot(self):
+        return super().snapshot(), self._battery.snapshot()
+
+    def restore(self, state):
+        pv_state, battery_state = state
+        super().restore(pv_state)
+        self._battery.restore(battery_state)
+
     def update(self, irrad, temp, volt):
         self._irrad = irrad
         self._temp = temp
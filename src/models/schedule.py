@@ -0,0 +1,30 @@
+import numpy as np
+from functools import lru_cache
+
+#  Daily schedules, [start, end) hour intervals (driving, charging and discharging times), compiled once per step size into
+#  read-only boolean masks of the time steps of a day. The masks are cached on the intervals, elements with the same
+#  schedule share one array. This is the only compiler of the masks, EVBehaviourRepository.at_home_masks stacks them.
+
+
+@lru_cache(maxsize=None)
+def _schedule_mask(intervals: tuple, step_size, inside: bool, steps: int) -> np.ndarray:
+    hours = np.arange(steps) * (step_size / 60)
+    mask = np.zeros(len(hours), dtype=bool)
+    for start, end in intervals:
+        mask |= (start <= hours) & (hours < end)
+    if not inside:
+        mask = ~mask
+    mask.flags.writeable = False
+    return mask
+
+
+def schedule_mask(intervals: [tuple], step_size, inside: bool = True, steps: int = None) -> np.ndarray:
+    """
+    :param inside: True for the time steps within the intervals, False for the time steps out of them
+    :param steps: number of time steps, a day if None
+    :return: mask of the time steps, None if the intervals or the step size are not set
+    """
+    if intervals is None or not step_size:
+        return None
+    steps = int(24 * 60 // step_size) if steps is None else steps
+    return _schedule_mask(tuple((interval[0], interval[1]) for interval in intervals), step_size, inside, steps)
@@ -1,8 +1,16 @@
+import numpy as np
+from src.models.schedule import schedule_mask
+
+
 class Vehicle:
-    def __init__(self, circuit_label, daily_driving_distance: float = 30.0, driving_times: [tuple] = None, battery_range: float = 350.0, step_size: int = None):
+    def __init__(self, circuit_label, daily_driving_distance: float = 30.0, driving_times: [tuple] = None, battery_range: float = 350.0, step_size: int = None,
+                 at_home: np.ndarray = None):
         self._circuit_label = circuit_label
         self._daily_driving_distance = daily_driving_distance
         self._driving_times = driving_times
+        # At-home mask of the time steps (EVBehaviourRepository.at_home_mask, else compiled from driving_times), driving_times
+        # are checked past it
+        self._at_home = at_home if at_home is not None else schedule_mask(driving_times, step_size, inside=False)
         self._battery_range = battery_range
         self._step_size = step_size
         self._distance = 0.0
@@ -16,12 +24,16 @@ class Vehicle:
     def distance(self):
         return self._distance
 
+    @property
+    def at_home(self):
+        return self._at_home
+
     @property
     def battery_range(self):
         return self._battery_range
 
     def get_distance(self):
-        return self._step_size * self._daily_driving_distance / self.get_total_driving_time_in_minutes()
+        return self._distance
 
     def set_driving_distance_per_time_step(self):
         self._distance = self._step_size * self._daily_driving_distance / self.get_total_driving_time_in_minutes()
@@ -33,6 +45,8 @@ class Vehicle:
         return total_time
 
     def check_ev_at_home(self, time_step):
+        if self._at_home is not None and time_step < len(self._at_home):
+            return bool(self._at_home[time_step])
         if sum([1 if interval[0] <= time_step * (self._step_size / 60) < interval[1] else 0 for interval in self._driving_times]) == 0:
             return True
         else:
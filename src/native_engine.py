@@ -0,0 +1,483 @@
+import os
+import numpy as np
+from src.power_flow import NetworkModel, PowerFlowSolver, split_dss_tokens, parse_dss_properties, split_bus_name
+
+
+#  In-process replacement for the OpenDSS COM object (win32com.client.Dispatch('OpenDSSEngine.DSS')).
+#  Only the part of the COM interface used by CircuitInterface is implemented, with the same names so that
+#  CircuitInterface does not need to know which engine it is talking to.
+
+class NativeDSS:
+    def __init__(self):
+        self.AllowForms = False
+        self._model = NetworkModel()
+        self._solver = None
+        self.Text = _Text(self)
+        self.ActiveCircuit = _Circuit(self)
+
+    def Start(self, code=0):
+        return True
+
+    @property
+    def model(self) -> NetworkModel:
+        return self._model
+
+    @property
+    def solver(self) -> PowerFlowSolver:
+        if self._solver is None or self._solver.model is not self._model:
+            self._solver = PowerFlowSolver(self._model)
+        return self._solver
+
+    def clear(self):
+        self._model = NetworkModel()
+        self._solver = None
+        self.ActiveCircuit = _Circuit(self)
+
+    def compile(self, path):
+        path = path.strip().strip('"\'')
+        with open(path, 'r') as dss_file:
+            lines = dss_file.readlines()
+        folder = os.path.dirname(os.path.abspath(path))
+        for line in lines:
+            self.execute(line, folder)
+
+    def execute(self, command, folder=None):
+        command = command.split('!')[0].split('//')[0].strip()
+        if not command:
+            return
+        tokens = split_dss_tokens(command)
+        verb = tokens[0].lower()
+        if verb == 'clear' or verb == 'clearall':
+            self.clear()
+        elif verb in ['compile', 'redirect']:
+            path = command.split(None, 1)[1].strip().strip('"\'')
+            if folder is not None and not os.path.isabs(path):
+                path = os.path.join(folder, path)
+            self.compile(path)
+        elif verb == 'new':
+            element, properties = self._element_and_properties(tokens[1:])
+            element_class, name = element.split('.', 1)
+            self._model.new_element(element_class, name, properties)
+            self.ActiveCircuit.set_active_element(element_class, name)
+        elif verb == 'edit':
+            element, properties = self._element_and_properties(tokens[1:])
+            element_class, name = element.split('.', 1)
+            self._model.edit_element(element_class, name, properties)
+        elif verb == 'set':
+            for key, value in parse_dss_properties(tokens[1:]):
+                if key == 'voltagebases':
+                    self._model.voltage_bases = [float(base) for base in value]
+                elif key is not None:
+                    try:
+                        self._model.options[key] = float(value)
+                    except (TypeError, ValueError):
+                        self._model.options[key] = value.lower() if isinstance(value, str) else value
+        elif verb == 'calcvoltagebases':
+            self._solver = None
+        elif verb == 'reset':
+            pass
+        elif verb == 'solve':
+            self.ActiveCircuit.Solution.Solve()
+        elif '=' in tokens[0] and tokens[0].split('=', 1)[0].count('.') >= 2:
+            # Load.Load_1.kw=5 like property assignments
+            for token in tokens:
+                target, value = token.split('=', 1)
+                element_class, element = target.split('.', 1)
+                name, key = element.rsplit('.', 1)
+                self._model.edit_element(element_class, name, parse_dss_properties([f'{key}={value}']))
+        elif '=' in tokens[0]:
+            # Property continuation of the active element (e.g. the line after 'New circuit.x')
+            element_class, name = self.ActiveCircuit.active_element
+            self._model.edit_element(element_class, name, parse_dss_properties(tokens))
+        elif verb.startswith('~') or verb == 'more':
+            element_class, name = self.ActiveCircuit.active_element
+            self._model.edit_element(element_class, name, parse_dss_properties(tokens[1:]))
+
+    @staticmethod
+    def _element_and_properties(tokens):
+        # Both 'New Line.x ...' and 'New object=Line.x ...' are accepted
+        properties = parse_dss_properties(tokens)
+        return properties[0][1], properties[1:]
+
+
+class _Text:
+    def __init__(self, dss: NativeDSS):
+        self._dss = dss
+        self._result = ''
+
+    @property
+    def Command(self):
+        return ''
+
+    @Command.setter
+    def Command(self, command):
+        self._dss.execute(command)
+
+    @property
+    def Result(self):
+        return self._result
+
+
+class _Solution:
+    def __init__(self, dss: NativeDSS):
+        self._dss = dss
+        self.dblHour = 0.0
+
+    def Solve(self):
+        self._dss.solver.solve()
+
+    def Cleanup(self):
+        pass
+
+    @property
+    def Converged(self):
+        return self._dss.solver.converged
+
+    @property
+    def Iterations(self):
+        return self._dss.solver.iterations
+
+
+class _Bus:
+    def __init__(self, circuit):
+        self._circuit = circuit
+        self.Name = None
+
+    @property
+    def _solver(self):
+        return self._circuit.dss.solver
+
+    @property
+    def kVBase(self):
+        return self._solver.bus_kv_base(self.Name)
+
+    @property
+    def VMagAngle(self):
+        v = self._solver.bus_voltages(self.Name)
+        return tuple(np.column_stack([np.abs(v), np.degrees(np.angle(v))]).reshape(-1))
+
+    @property
+    def puVmagAngle(self):
+        v = self._solver.bus_voltages(self.Name) / (1000 * self.kVBase)
+        return tuple(np.column_stack([np.abs(v), np.degrees(np.angle(v))]).reshape(-1))
+
+    @property
+    def Nodes(self):
+        return (1, 2, 3)
+
+    @property
+    def Distance(self):
+        return self._solver.bus_distance(self.Name)
+
+    @property
+    def x(self):
+        return 0.0
+
+    @property
+    def y(self):
+        return 0.0
+
+
+class _CktElement:
+    def __init__(self, circuit):
+        self._circuit = circuit
+        self.element_class = None
+        self.name = None
+
+    @property
+    def _solver(self):
+        return self._circuit.dss.solver
+
+    @property
+    def Name(self):
+        return f'{self.element_class}.{self.name}'
+
+    @property
+    def BusNames(self):
+        model = self._circuit.dss.model
+        if self.element_class == 'load':
+            return (model.load_buses[model.load_index[self.name]],)
+        elif self.element_class == 'line':
+            return (model.lines[self.name]['bus1'], model.lines[self.name]['bus2'])
+        elif self.element_class == 'transformer':
+            return tuple(model.transformers[self.name]['buses'])
+        return ()
+
+    @property
+    def Currents(self):
+        return tuple(np.column_stack([self._currents().real, self._currents().imag]).reshape(-1))
+
+    @property
+    def CurrentsMagAng(self):
+        currents = self._currents()
+        return tuple(np.column_stack([np.abs(currents), np.degrees(np.angle(currents))]).reshape(-1))
+
+    @property
+    def Powers(self):
+        """
+        :return: kW, kvar flowing into each conductor of each terminal
+        """
+        if self.element_class != 'line':
+            raise NotImplementedError('Powers is only available for lines in the native engine.')
+        powers = (self._solver.line_terminal_voltages(self.name) * np.conj(self._solver.line_terminal_currents(self.name))).reshape(-1) / 1000
+        return tuple(np.column_stack([powers.real, powers.imag]).reshape(-1))
+
+    @property
+    def Losses(self):
+        """
+        :return: W, var
+        """
+        if self.element_class != 'line':
+            raise NotImplementedError('Losses is only available for lines in the native engine.')
+        losses = self._solver.line_losses[self._solver.branch_index[self.name]]
+        return losses.real, losses.imag
+
+    def _currents(self):
+        if self.element_class != 'line':
+            raise NotImplementedError('Currents are only available for lines in the native engine.')
+        return self._solver.line_terminal_currents(self.name).reshape(-1)
+
+
+class _Lines:
+    def __init__(self, circuit):
+        self._circuit = circuit
+        self._name = None
+
+    @property
+    def AllNames(self):
+        return tuple(self._circuit.dss.model.lines.keys())
+
+    @property
+    def Name(self):
+        return self._name
+
+    @Name.setter
+    def Name(self, name):
+        self._name = name.lower()
+        self._circuit.set_active_element('line', self._name)
+
+    @property
+    def _line(self):
+        return self._circuit.dss.model.lines[self._name]
+
+    @property
+    def Bus1(self):
+        return self._line['bus1']
+
+    @property
+    def Bus2(self):
+        return self._line['bus2']
+
+    @property
+    def LineCode(self):
+        return self._line['linecode']
+
+    @property
+    def Length(self):
+        return self._line['length']
+
+    @property
+    def Phases(self):
+        return int(self._line['phases'])
+
+
+class _LineCodes:
+    def __init__(self, circuit):
+        self._circuit = circuit
+        self._name = None
+
+    @property
+    def AllNames(self):
+        return tuple(self._circuit.dss.model.linecodes.keys())
+
+    @property
+    def Name(self):
+        return self._name
+
+    @Name.setter
+    def Name(self, name):
+        self._name = name.lower()
+
+    @property
+    def EmergAmps(self):
+        return self._circuit.dss.model.linecodes[self._name]['emergamps']
+
+    @property
+    def NormAmps(self):
+        return self._circuit.dss.model.linecodes[self._name]['normamps']
+
+
+class _Transformers:
+    def __init__(self, circuit):
+        self._circuit = circuit
+        self._name = None
+
+    @property
+    def AllNames(self):
+        return tuple(self._circuit.dss.model.transformers.keys())
+
+    @property
+    def Name(self):
+        return self._name
+
+    @Name.setter
+    def Name(self, name):
+        self._name = name.lower()
+        self._circuit.set_active_element('transformer', self._name)
+
+    @property
+    def kva(self):
+        return self._circuit.dss.model.transformers[self._name]['kvas'][0]
+
+
+class _Loads:
+    def __init__(self, circuit):
+        self._circuit = circuit
+        self._idx = 0
+
+    @property
+    def _model(self):
+        return self._circuit.dss.model
+
+    @property
+    def AllNames(self):
+        return tuple(self._model.load_names)
+
+    @property
+    def Count(self):
+        return len(self._model.load_names)
+
+    @property
+    def Name(self):
+        return self._model.load_names[self._idx]
+
+    @Name.setter
+    def Name(self, name):
+        self._idx = self._model.load_index[name.lower()]
+        self._circuit.set_active_element('load', name.lower())
+
+    @property
+    def idx(self):
+        return self._idx + 1
+
+    @idx.setter
+    def idx(self, idx):
+        self._idx = idx - 1
+        self._circuit.set_active_element('load', self._model.load_names[self._idx])
+
+    @property
+    def kV(self):
+        return self._model.load_kv[self._idx]
+
+    @property
+    def kW(self):
+        return self._model.load_kw[self._idx]
+
+    @kW.setter
+    def kW(self, kw):
+        self._model.set_load_kw(self._idx, kw)
+
+    @property
+    def kvar(self):
+        return self._model.load_kvar[self._idx]
+
+    @kvar.setter
+    def kvar(self, kvar):
+        self._model.set_load_kvar(self._idx, kvar)
+
+
+class _Circuit:
+    def __init__(self, dss: NativeDSS):
+        self.dss = dss
+        self.active_element = ('vsource', 'source')
+        self.Solution = _Solution(dss)
+        self.ActiveBus = _Bus(self)
+        self.ActiveCktElement = _CktElement(self)
+        self.Lines = _Lines(self)
+        self.LineCodes = _LineCodes(self)
+        self.Transformers = _Transformers(self)
+        self.Loads = _Loads(self)
+
+    def set_active_element(self, element_class, name):
+        element_class = element_class.lower()
+        if element_class == 'circuit':
+            element_class = 'vsource'
+        self.active_element = (element_class, name.lower())
+        self.ActiveCktElement.element_class = element_class
+        self.ActiveCktElement.name = name.lower()
+
+    @property
+    def Name(self):
+        return self.dss.model.name
+
+    @property
+    def AllBusNames(self):
+        return tuple(self.dss.solver.bus_names)
+
+    @property
+    def AllNodeNames(self):
+        return tuple(self.dss.solver.node_names)
+
+    @property
+    def AllBusVolts(self):
+        v = self.dss.solver.node_voltages
+        return tuple(np.column_stack([v.real, v.imag]).reshape(-1))
+
+    @property
+    def AllBusVmag(self):
+        return tuple(np.abs(self.dss.solver.node_voltages))
+
+    @property
+    def AllBusVmagPu(self):
+        solver = self.dss.solver
+        return tuple(np.abs(solver.node_voltages) / (1000 * solver.node_kv_base))
+
+    @property
+    def SystemY(self):
+        """
+        :return: the admittance matrix (S) ordered as YNodeOrder, flattened by rows as real, imaginary pairs
+        """
+        y = self.dss.solver.y_matrix().toarray()
+        return tuple(np.column_stack([y.real.reshape(-1), y.imag.reshape(-1)]).reshape(-1))
+
+    @property
+    def YNodeOrder(self):
+        return tuple(name.upper() for name in self.dss.solver.node_names)
+
+    def SetActiveBus(self, bus):
+        bus = split_bus_name(bus)[0]
+        if bus not in self.AllBusNames:
+            return -1
+        self.ActiveBus.Name = bus
+        return self.AllBusNames.index(bus)
+
+    def SetActiveElement(self, element):
+        element_class, name = element.split('.', 1)
+        self.set_active_element(element_class, name)
+        return 0
+
+    @property
+    def TotalPower(self):
+        """
+        :return: kW, kvar delivered by the source (negative when supplying the circuit, as OpenDSS)
+        """
+        solver = self.dss.solver
+        total = solver.load_powers + np.sum(solver.line_losses) + solver.transformer_losses
+        return -total.real / 1000, -total.imag / 1000
+
+    @property
+    def Losses(self):
+        """
+        :return: W, var
+        """
+        solver = self.dss.solver
+        losses = np.sum(solver.line_losses) + solver.transformer_losses
+        return losses.real, losses.imag
+
+    @property
+    def LineLosses(self):
+        """
+        :return: kW, kvar
+        """
+        losses = np.sum(self.dss.solver.line_losses)
+        return losses.real / 1000, losses.imag / 1000
@@ -1,12 +1,22 @@
 import sys
-import win32com.client
 
 
 def main():
     DSS = dss_object()
 
 
-def dss_object():
+def dss_object(engine: str = 'com'):
+    """
+    :param engine: 'com' for the OpenDSS COM engine (Windows only), 'native' for the in-process NumPy power flow.
+    """
+    if engine.lower() == 'native':
+        from src.native_engine import NativeDSS
+        print('Native power flow engine has been instantiated...')
+        return NativeDSS()
+    elif engine.lower() != 'com':
+        raise ValueError(f"Invalid engine {engine}. Expected 'com' or 'native'.")
+
+    import win32com.client
     # instantiate an OpenDSS object named as DSS
     # win32com.client.Dispatch('ProgID') to instantiate the interface of a certain program
     DSS = win32com.client.Dispatch('OpenDSSEngine.DSS')
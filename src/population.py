@@ -0,0 +1,589 @@
+import os
+import sys
+import numpy as np
+from math import tan, acos, sin
+from src.external_input_data import ModelInputData
+from src.models.load import Load
+from src.models.pv_system import PVSystem, HybridPVSystem
+from src.models.ev import EVSystem
+from src.models.inverter import Inverter, PDC_UPPER_BOUND, get_inverse_efficiency
+from src.models.battery import Battery
+
+
+#  Struct-of-arrays version of the CER models in src.models. The CERs of a scenario are held as numpy arrays grouped by
+#  type (loads, PV systems, hybrid PV systems, EV systems), and the output powers of all of them are computed with a few
+#  vectorized operations per group. The object models remain the reference implementation, see validate_population.
+
+class _Curves:
+    """
+    Piecewise linear curves (volt-watt, volt-var, efficiency, temperature factor) of a group of elements, evaluated with
+    one np.interp per distinct curve. Elements without a curve evaluate to 0.
+    """
+
+    def __init__(self, curves: list):
+        keys = [None if curve is None else (tuple(curve[0]), tuple(curve[1])) for curve in curves]
+        self._curves = list(dict.fromkeys(key for key in keys if key is not None))
+        self._masks = [np.array([key == curve for key in keys], dtype=bool) for curve in self._curves]
+        self._size = len(keys)
+
+    def __call__(self, x):
+        x = np.broadcast_to(x, (self._size,))
+        y = np.zeros(self._size)
+        for (xp, fp), mask in zip(self._curves, self._masks):
+            y[mask] = np.interp(x[mask], xp, fp, left=fp[0], right=fp[-1])
+        return y
+
+
+class _InverterArrays:
+    """
+    Inverter (and HybridInverter/EVInverter charging) calculations of Inverter for a group of inverters.
+    """
+
+    def __init__(self, inverters: [Inverter]):
+        settings = [inverter._inverter_settings for inverter in inverters]
+        self.rated_kva = np.array([inverter.rated_kva for inverter in inverters], dtype=float)
+        self._cut_in = np.array([inverter._cut_in for inverter in inverters], dtype=float)
+        if np.any(self._cut_in < np.array([inverter._cut_out for inverter in inverters], dtype=float)):
+            raise ValueError("cut-in value must be greater than or equal to cut-out value")
+        self._vw = np.array([s.en_volt_watt for s in settings], dtype=bool)
+        self._vv = np.array([s.en_volt_var for s in settings], dtype=bool)
+        self._el = np.array([s.en_export_limit for s in settings], dtype=bool)
+        self._pf = np.array([s.en_power_factor for s in settings], dtype=bool)
+        self._night = np.array([s.en_night_mode for s in settings], dtype=bool)
+        self._priority = np.array([s.output_priority for s in settings], dtype=int)
+        self._export_limit = np.array([s.static_export_limit for s in settings], dtype=float)
+        self._power_factor = np.array([s.power_factor if s.en_power_factor else np.nan for s in settings], dtype=float)
+        self._sin_acos_pf = np.array([sin(acos(s.power_factor)) if s.en_power_factor else np.nan for s in settings], dtype=float)
+        self._vw_curves = _Curves([s._volt_watt_settings._volt_watt_curve if s.en_volt_watt else None for s in settings])
+        self._vv_curves = _Curves([s._volt_var_settings._volt_var_curve if s.en_volt_var else None for s in settings])
+        self._vw_ch = np.array([getattr(s, 'en_charging_volt_watt', False) for s in settings], dtype=bool)
+        self._vw_ch_curves = _Curves([s._charging_volt_watt_settings._volt_watt_curve if getattr(s, 'en_charging_volt_watt', False) else None
+                                      for s in settings])
+        self._eff_curves = _Curves([inverter._eff_curve for inverter in inverters])
+        inverses = {}
+        for idx, inverter in enumerate(inverters):
+            inverses.setdefault(get_inverse_efficiency(inverter.rated_kva, inverter._eff_curve), []).append(idx)
+        self._inverses = []
+        for inverse, idx in inverses.items():
+            mask = np.zeros(len(inverters), dtype=bool)
+            mask[idx] = True
+            self._inverses.append((mask, inverse))
+
+    def efficiency(self, p_dc):
+        return self._eff_curves(np.minimum(p_dc / self.rated_kva, 1.0))
+
+    def status(self, p_dc):
+        return p_dc >= self._cut_in * self.rated_kva / 100
+
+    def p_lim_min(self, volt):
+        p_vw = self.rated_kva * self._vw_curves(volt)
+        p_el = self.rated_kva * self._export_limit
+        return np.select([self._vw & self._el, self._vw, self._el, self._pf],
+                         [np.minimum(p_el, p_vw), p_vw, p_el, self.rated_kva * self._power_factor], self.rated_kva)
+
+    def p_ch_lim_min(self, volt):
+        return np.where(self._vw_ch, self.rated_kva * self._vw_ch_curves(volt), self.rated_kva)
+
+    def potential_output(self, p_dc):
+        p_ac = p_dc * self.efficiency(p_dc)
+        return np.where(self.status(p_dc), np.where(p_ac > self.rated_kva, self.rated_kva, p_ac), 0.0)
+
+    def get_output_power(self, p_dc, volt):
+        """
+        :return: active and reactive powers of Inverter.get_output_power
+        """
+        rated = self.rated_kva
+        status = self.status(p_dc)
+        p_ac = p_dc * self.efficiency(p_dc)
+        p_lim = self.p_lim_min(volt)
+        p_desired = np.where(status, np.where(p_ac >= p_lim, p_lim, p_ac), 0.0)
+        q_desired = np.select([self._pf, self._vv], [rated * self._sin_acos_pf, rated * self._vv_curves(volt)], 0.0)
+        q_desired = np.where(~status & ~self._night, 0.0, q_desired)
+
+        s_desired = np.hypot(p_desired, q_desired)
+        mandatory_p = self._vw | self._el
+        mandatory_q = self._vv | self._pf
+        with np.errstate(divide='ignore', invalid='ignore'):
+            scale_factor = rated / s_desired
+            # P first: P within the rating, Q within the remaining capacity
+            p_watt = np.clip(p_desired, -rated, rated)
+            q_watt = np.clip(q_desired, -np.sqrt(rated ** 2 - p_watt ** 2), np.sqrt(rated ** 2 - p_watt ** 2))
+            # Q first: Q within the rating, P within the remaining capacity
+            q_var = np.clip(q_desired, -rated, rated)
+            p_var = np.clip(p_desired, -np.sqrt(rated ** 2 - q_var ** 2), np.sqrt(rated ** 2 - q_var ** 2))
+            # Mandatory P (Q) kept as desired and the other one limited
+            q_mandatory_p = np.clip(q_desired, -np.sqrt(rated ** 2 - p_desired ** 2), np.sqrt(rated ** 2 - p_desired ** 2))
+            p_mandatory_q = np.clip(p_desired, -np.sqrt(rated ** 2 - q_desired ** 2), np.sqrt(rated ** 2 - q_desired ** 2))
+
+            over = s_desired > rated
+            conditions = [~over, mandatory_p & mandatory_q, mandatory_p, mandatory_q, self._priority == 1, self._priority == 2]
+            active_power = np.select(conditions, [p_desired, p_desired * scale_factor, p_desired, p_mandatory_q, p_var,
+                                                  rated * self._power_factor], p_watt)
+            reactive_power = np.select(conditions, [q_desired, q_desired * scale_factor, q_mandatory_p, q_desired, q_var,
+                                                    rated * self._sin_acos_pf], q_watt)
+        return active_power, reactive_power
+
+    def _inverse_efficiency(self, y, upper_bound, where):
+        x = np.zeros(len(self.rated_kva))
+        for mask, inverse in self._inverses:
+            mask = mask & where
+            x[mask] = inverse(y[mask], upper_bound)
+        return x
+
+    def get_pdc_from_efficiency(self, p_ac, where=True):
+        """
+        :return: the input p_dc that gives the desired p_ac, as Inverter.get_pdc_from_efficiency (0 where not computed)
+        """
+        where = np.broadcast_to(where, self.rated_kva.shape)
+        return self._inverse_efficiency(np.broadcast_to(p_ac, self.rated_kva.shape), PDC_UPPER_BOUND, where)
+
+    def get_ac_from_efficiency_for_charging(self, p_dc, where=True):
+        """
+        :return: the ac input that gives the p_dc charging power, as HybridInverter.get_ac_from_efficiency_for_charging
+        """
+        where = np.broadcast_to(where, self.rated_kva.shape)
+        return self._inverse_efficiency(np.broadcast_to(p_dc, self.rated_kva.shape), None, where)
+
+
+class _BatteryArrays:
+    def __init__(self, batteries: [Battery]):
+        self._batteries = batteries
+        self.capacity = np.array([battery._capacity for battery in batteries], dtype=float)
+        self._min_soc = np.array([battery._min_soc for battery in batteries], dtype=float)
+        self._charger_eff = np.array([battery._charger_eff for battery in batteries], dtype=float)
+        self._charger_power = np.array([battery._charger_power for battery in batteries], dtype=float)
+        self._step_size = np.array([np.nan if battery._step_size is None else battery._step_size for battery in batteries], dtype=float)
+        self.soc = None
+        self._soc_start = None
+        self.load_state()
+
+    def load_state(self):
+        self._soc_start = np.array([battery.soc for battery in self._batteries], dtype=float)
+        self.soc = self._soc_start
+
+    def reset(self):
+        self.soc = self._soc_start
+
+    def max_charge_power(self):
+        available_power = (1.0 - self.soc) * self.capacity / (self._step_size / 60) / self._charger_eff
+        return np.minimum(self._charger_power, available_power)
+
+    def max_discharge_power(self):
+        available_power = self._charger_eff * (self.soc - self._min_soc) * self.capacity / (self._step_size / 60)
+        return np.minimum(self._charger_power, available_power)
+
+    def charge_discharge(self, power):
+        """
+        :param power: charging (+), discharging (-)
+        """
+        ch_power = np.minimum(np.abs(power), self.max_charge_power())
+        disch_power = np.minimum(np.abs(power), self.max_discharge_power())
+        self.soc = np.where(power >= 0, self.soc + ch_power * self._charger_eff * (self._step_size / 60) / self.capacity,
+                            self.soc - disch_power * (self._step_size / 60) / self.capacity / self._charger_eff)
+
+
+class _Intervals:
+    """
+    [start, end) hour intervals of a group of elements, e.g. the driving times of the vehicles.
+    """
+
+    def __init__(self, intervals: [[tuple]]):
+        self._size = len(intervals)
+        self._owner = np.array([idx for idx, element_intervals in enumerate(intervals) for _ in element_intervals or []], dtype=int)
+        self._start = np.array([interval[0] for element_intervals in intervals for interval in element_intervals or []], dtype=float)
+        self._end = np.array([interval[1] for element_intervals in intervals for interval in element_intervals or []], dtype=float)
+
+    def contains(self, hour):
+        hour = np.broadcast_to(hour, (self._size,))[self._owner]
+        inside = (self._start <= hour) & (hour < self._end)
+        return np.bincount(self._owner, weights=inside, minlength=self._size) > 0
+
+
+class _MeterPower:
+    """
+    Sum of the powers (p_in) of the loads or EVs of the meters of a group of CERs, as Meter.get_total_load_power. The members
+    listed before the CER in the population are read from the current step, the others from the state at the step start.
+    """
+
+    def __init__(self, owners_members: [[object]], owners_position: [int], members_index: dict, members_position: dict):
+        self._size = len(owners_members)
+        self._owner = []
+        self._member = []
+        self._current = []
+        self._objects = []
+        for owner, (members, position) in enumerate(zip(owners_members, owners_position)):
+            for member in members:
+                self._owner.append(owner)
+                self._objects.append(member)
+                current = id(member) in members_index and members_position[id(member)] < position
+                self._current.append(current)
+                self._member.append(members_index[id(member)] if current else 0)
+        self._owner = np.array(self._owner, dtype=int)
+        self._member = np.array(self._member, dtype=int)
+        self._current = np.array(self._current, dtype=bool)
+        self._stale = None
+        self.load_state()
+
+    def load_state(self):
+        self._stale = np.array([np.nan if member.p_in is None else member.p_in for member in self._objects], dtype=float)
+
+    def total(self, members_power):
+        power = self._stale.copy()
+        power[self._current] = members_power[self._member[self._current]]
+        return np.bincount(self._owner, weights=power, minlength=self._size)
+
+
+class CERPopulation:
+    """
+    Vectorized evaluation of the CERs (Load, PVSystem, HybridPVSystem, EVSystem) of a scenario. The population reads the
+    settings of the CER objects once, and the state (battery soc, meter readings) with load_state(). step() then gives the
+    output powers of all the CERs for a voltage vector without touching the CER objects, so it can be called for every
+    trial iteration of the convergence process.
+    """
+
+    def __init__(self, cers: [object], model_data: ModelInputData):
+        self._cers = list(cers)
+        self._model_data = model_data
+        self._loads_idx = [i for i, cer in enumerate(self._cers) if type(cer) is Load]
+        self._pvs_idx = [i for i, cer in enumerate(self._cers) if type(cer) is PVSystem]
+        self._hybrids_idx = [i for i, cer in enumerate(self._cers) if type(cer) is HybridPVSystem]
+        self._evs_idx = [i for i, cer in enumerate(self._cers) if type(cer) is EVSystem]
+        if len(self._loads_idx) + len(self._pvs_idx) + len(self._hybrids_idx) + len(self._evs_idx) != len(self._cers):
+            raise ValueError("Invalid CERs. Expected Load, PVSystem, HybridPVSystem or EVSystem objects.")
+        loads = [self._cers[i] for i in self._loads_idx]
+        pvs = [self._cers[i] for i in self._pvs_idx]
+        hybrids = [self._cers[i] for i in self._hybrids_idx]
+        evs = [self._cers[i] for i in self._evs_idx]
+
+        # Loads
+        self._loads_label = [load.circuit_label for load in loads]
+        self._loads_q_factor = tan(acos(0.95))
+
+        # PV systems
+        self._pvs_label = [pv.circuit_label for pv in pvs]
+        self._pvs_pmpp = np.array([pv._pvpanels._pmpp for pv in pvs], dtype=float)
+        self._pvs_temp_factor = _Curves([pv._pvpanels._temp_factor for pv in pvs])
+        self._pvs_inverter = _InverterArrays([pv.inverter for pv in pvs])
+        self._pvs_max_dc_input = self._pvs_inverter.get_pdc_from_efficiency(self._pvs_inverter.rated_kva)
+
+        # Hybrid PV systems
+        hybrids_settings = [hybrid.inverter._hybrid_inverter_settings for hybrid in hybrids]
+        if any(not settings.en_maximise_self_consumption and not settings.en_time_of_use for settings in hybrids_settings):
+            raise ValueError("The hybrid inverters have to be set at either maximise self consumption or time of use.")
+        self._hybrids_pmpp = np.array([hybrid._pvpanels._pmpp for hybrid in hybrids], dtype=float)
+        self._hybrids_temp_factor = _Curves([hybrid._pvpanels._temp_factor for hybrid in hybrids])
+        self._hybrids_inverter = _InverterArrays([hybrid.inverter for hybrid in hybrids])
+        self._hybrids_battery = _BatteryArrays([hybrid.battery for hybrid in hybrids])
+        self._hybrids_msc = np.array([settings.en_maximise_self_consumption for settings in hybrids_settings], dtype=bool)
+        self._hybrids_tou_step = np.array([settings.step_size if settings.en_time_of_use and settings.step_size is not None else np.nan
+                                           for settings in hybrids_settings], dtype=float)
+        self._hybrids_charging = _Intervals([[settings.charging_times] if settings.en_time_of_use else [] for settings in hybrids_settings])
+        self._hybrids_discharging = _Intervals([[settings.discharging_times] if settings.en_time_of_use else [] for settings in hybrids_settings])
+        self._hybrids_max_dc_input = self._hybrids_inverter.get_pdc_from_efficiency(self._hybrids_inverter.rated_kva)
+        position = {id(cer): i for i, cer in enumerate(self._cers)}
+        loads_index = {id(load): i for i, load in enumerate(loads)}
+        evs_index = {id(ev): i for i, ev in enumerate(evs)}
+        meters = [hybrid.meter for hybrid in hybrids]
+        if any(meter is None for meter in meters):
+            raise ValueError("The hybrid PV systems need a meter to read the load.")
+        self._hybrids_load = _MeterPower([meter._loads for meter in meters], self._hybrids_idx, loads_index, position)
+        self._hybrids_ev = _MeterPower([meter._evs for meter in meters], self._hybrids_idx, evs_index, position)
+
+        # EV systems
+        evs_settings = [ev.inverter._ev_inverter_settings for ev in evs]
+        if any(not (settings.en_unmanaged_charging or settings.en_managed_charging or settings.en_v2g_charging) for settings in evs_settings):
+            raise ValueError("The EV inverters have to be set at unmanaged, managed or v2g charging.")
+        self._evs_inverter = _InverterArrays([ev.inverter for ev in evs])
+        self._evs_battery = _BatteryArrays([ev.battery for ev in evs])
+        self._evs_unmanaged = np.array([settings.en_unmanaged_charging for settings in evs_settings], dtype=bool)
+        self._evs_managed = np.array([not settings.en_unmanaged_charging and settings.en_managed_charging for settings in evs_settings], dtype=bool)
+        self._evs_v2g = ~self._evs_unmanaged & ~self._evs_managed
+        self._evs_step = np.array([np.nan if settings.step_size is None else settings.step_size for settings in evs_settings], dtype=float)
+        self._evs_charging = _Intervals([settings.charging_times for settings in evs_settings])
+        self._evs_discharging = _Intervals([settings.discharging_times for settings in evs_settings])
+        self._evs_driving = _Intervals([ev._vehicle._driving_times for ev in evs])
+        # (steps x evs) at-home masks when all the vehicles have one (Vehicle.at_home), else the driving intervals are checked
+        masks = [ev._vehicle.at_home for ev in evs]
+        self._evs_at_home = np.stack(masks, axis=1) if masks and all(mask is not None and len(mask) == len(masks[0]) for mask in masks) else None
+        self._evs_vehicle_step = np.array([np.nan if ev._vehicle._step_size is None else ev._vehicle._step_size for ev in evs], dtype=float)
+        self._evs_distance = np.array([ev._vehicle.get_distance() for ev in evs], dtype=float)
+        self._evs_energy_per_distance = np.array([ev.get_energy_per_distance() for ev in evs], dtype=float)
+
+        # Outputs of the last step
+        self._p = np.zeros(len(self._cers))
+        self._q = np.zeros(len(self._cers))
+        self._loads_p = np.zeros(len(loads))
+        self._evs_p = np.zeros(len(evs))
+
+    @property
+    def cers(self):
+        return self._cers
+
+    @property
+    def hybrids_soc(self):
+        """
+        :return: battery soc of the hybrid PV systems after the last step
+        """
+        return self._hybrids_battery.soc
+
+    @property
+    def evs_soc(self):
+        """
+        :return: battery soc of the EV systems after the last step
+        """
+        return self._evs_battery.soc
+
+    def load_state(self):
+        """
+        Read the state of the CER objects (battery soc and meter readings), to be called at the start of each time step.
+        """
+        self._hybrids_battery.load_state()
+        self._evs_battery.load_state()
+        self._hybrids_load.load_state()
+        self._hybrids_ev.load_state()
+
+    def step(self, volt: np.ndarray, time_step: int) -> (np.ndarray, np.ndarray):
+        """
+        Output powers of all the CERs starting from the state read by load_state(). Calling it again for the same time step
+        repeats the calculation from the same state, as the trial iterations of the convergence process.
+        :param volt: terminal voltages (pu) of the CERs, in the order of the cers
+        :return: active and reactive powers (kW, kVAr) in the order of the cers, p_out/q_out for the PV systems and
+        p_in/q_in for the loads and EVs as in Compiler.
+        """
+        volt = np.asarray(volt, dtype=float)
+        self._hybrids_battery.reset()
+        self._evs_battery.reset()
+        self._step_loads(time_step)
+        self._step_evs(volt[self._evs_idx], time_step)
+        self._step_pvs(volt[self._pvs_idx], time_step)
+        self._step_hybrids(volt[self._hybrids_idx], time_step)
+        return self._p.copy(), self._q.copy()
+
+    def _step_loads(self, time_step):
+        p = np.array([self._model_data.demand_power[label][time_step] for label in self._loads_label], dtype=float)
+        self._loads_p = p
+        self._p[self._loads_idx] = p
+        self._q[self._loads_idx] = p * self._loads_q_factor
+
+    def _step_pvs(self, volt, time_step):
+        inverter = self._pvs_inverter
+        p_dc = self._pvs_pmpp * self._model_data.irradiance[time_step] * self._pvs_temp_factor(self._model_data.temperature[time_step])
+        p, q = inverter.get_output_power(p_dc, volt)
+        self.pvs_dc_generation = p_dc
+        self.pvs_dc_curtailment = np.maximum(p_dc - self._pvs_max_dc_input, 0)
+        self.pvs_ac_potential_output = inverter.potential_output(p_dc)
+        self.pvs_ac_curtailment = self.pvs_ac_potential_output - p
+        self._p[self._pvs_idx] = p
+        self._q[self._pvs_idx] = q
+
+    def _step_hybrids(self, volt, time_step):
+        inverter = self._hybrids_inverter
+        battery = self._hybrids_battery
+        p_pv = self._hybrids_pmpp * self._model_data.irradiance[time_step] * self._hybrids_temp_factor(self._model_data.temperature[time_step])
+        max_charge = battery.max_charge_power()
+        max_discharge = battery.max_discharge_power()
+        load = self._hybrids_load.total(self._loads_p) + np.maximum(0, self._hybrids_ev.total(self._evs_p))
+        msc = self._hybrids_msc
+        tou = ~msc
+
+        # Maximise self consumption: dc power needed to meet the load
+        p_max_output = inverter.get_output_power(self._hybrids_max_dc_input, volt)[0]
+        p_ac_load = np.where(load >= p_max_output, inverter.get_output_power(p_pv, volt)[0], load)
+        p_dc_required = inverter.get_pdc_from_efficiency(p_ac_load, where=msc)
+        # Time of use
+        hour = time_step * (self._hybrids_tou_step / 60)
+        charging = tou & self._hybrids_charging.contains(hour)
+        discharging = tou & self._hybrids_discharging.contains(hour)
+        p_dc_max_output = inverter.get_pdc_from_efficiency(p_max_output, where=discharging)
+        pv_to_battery_tou = np.where(charging, np.minimum(p_pv, max_charge), 0.0)
+        p_ch_lim = inverter.p_ch_lim_min(volt)
+        room = max_charge - pv_to_battery_tou
+
+        battery_to_inverter = np.select([msc, discharging], [np.minimum(np.maximum(0.0, p_dc_required - p_pv), max_discharge),
+                                                             np.minimum(np.maximum(0, p_dc_max_output - p_pv), max_discharge)], 0.0)
+        pv_to_battery = np.where(msc, np.minimum(np.maximum(0.0, p_pv - p_dc_required), max_charge), pv_to_battery_tou)
+        inverter_to_battery = np.where(charging & (room > 0.0), np.minimum(p_ch_lim * inverter.efficiency(p_ch_lim), room), 0.0)
+        p_batt = - battery_to_inverter + pv_to_battery + inverter_to_battery
+        battery.charge_discharge(p_batt)
+
+        p_inv_dc = p_pv - p_batt
+        p, q = inverter.get_output_power(p_inv_dc, volt)
+        charging_from_grid = p_inv_dc < 0.0
+        p = np.where(charging_from_grid, - inverter.get_ac_from_efficiency_for_charging(np.abs(p_inv_dc), where=charging_from_grid), p)
+        q = np.where(charging_from_grid, 0.0, q)
+
+        self.hybrids_dc_generation = p_pv
+        self.hybrids_dc_curtailment = np.maximum(p_inv_dc - self._hybrids_max_dc_input, 0)
+        potential_charging = inverter.potential_output(np.maximum(0, p_pv - p_batt))
+        potential_discharging = inverter.potential_output(p_pv + np.abs(p_batt))
+        potential_night = inverter.potential_output(np.abs(p_batt))
+        self.hybrids_ac_potential_output = np.select([(p_pv > 0) & (p_batt > 0), p_pv > 0, p_batt > 0],
+                                                     [potential_charging, potential_discharging, 0.0], potential_night)
+        self.hybrids_ac_curtailment = np.select([(p_pv > 0) & (p_batt > 0), p_pv > 0],
+                                                [np.where(potential_charging > 0, potential_charging - p, 0.0), potential_discharging - p], 0.0)
+        self.hybrids_battery_power = p_batt
+        self._p[self._hybrids_idx] = p
+        self._q[self._hybrids_idx] = q
+
+    def _step_evs(self, volt, time_step):
+        inverter = self._evs_inverter
+        battery = self._evs_battery
+        max_charge = battery.max_charge_power()
+        max_discharge = battery.max_discharge_power()
+        if self._evs_at_home is not None and time_step < len(self._evs_at_home):
+            is_at_home = self._evs_at_home[time_step]
+        else:
+            is_at_home = ~self._evs_driving.contains(time_step * (self._evs_vehicle_step / 60))
+        hour = time_step * (self._evs_step / 60)
+        charging = is_at_home & (self._evs_unmanaged | ((self._evs_managed | self._evs_v2g) & self._evs_charging.contains(hour)))
+        discharging = is_at_home & self._evs_v2g & self._evs_discharging.contains(hour)
+
+        p_v2g = inverter.get_output_power(max_discharge, volt)[0]
+        battery_to_inverter = np.where(discharging, np.minimum(inverter.get_pdc_from_efficiency(p_v2g, where=discharging), max_discharge), 0.0)
+        battery_to_wheel = np.where(~is_at_home, np.minimum(self._evs_distance * self._evs_energy_per_distance / (self._evs_step / 60),
+                                                            max_discharge), 0.0)
+        p_ch_lim = inverter.p_ch_lim_min(volt)
+        inverter_to_battery = np.where(charging, np.minimum(p_ch_lim * inverter.efficiency(p_ch_lim), max_charge), 0.0)
+        p_batt = - battery_to_inverter - battery_to_wheel + inverter_to_battery
+        battery.charge_discharge(p_batt)
+
+        p_inv_dc = np.where((p_batt >= 0) | is_at_home, p_batt, 0.0)
+        p_discharging, q_discharging = inverter.get_output_power(np.abs(p_inv_dc), volt)
+        p_charging = inverter.get_ac_from_efficiency_for_charging(p_inv_dc, where=p_inv_dc >= 0)
+        p = np.where(p_inv_dc >= 0, p_charging, -p_discharging)
+        q = np.where(p_inv_dc >= 0, 0.0, -q_discharging)
+        self._evs_p = p
+        self._p[self._evs_idx] = p
+        self._q[self._evs_idx] = q
+
+
+def _run_cers(cers, model_data, volt, time_step):
+    """
+    Object version of CERPopulation.step (as Compiler.run_cers), returns the output powers as Compiler reads them.
+    """
+    for cer, v in zip(cers, volt):
+        if isinstance(cer, Load):
+            cer.update(model_data.demand_power[cer.circuit_label][time_step], v)
+        elif isinstance(cer, EVSystem):
+            cer.update(v)
+        else:
+            cer.update(model_data.irradiance[time_step], model_data.temperature[time_step], v)
+        if isinstance(cer, HybridPVSystem) or isinstance(cer, EVSystem):
+            cer.step(time_step)
+        else:
+            cer.step()
+    p = [cer.p_out if isinstance(cer, PVSystem) else cer.p_in for cer in cers]
+    q = [cer.q_out if isinstance(cer, PVSystem) else cer.q_in for cer in cers]
+    return np.array(p, dtype=float), np.array(q, dtype=float)
+
+
+#  Maximum deviation of the population from the CER objects (kW, kVAr, soc) accepted by validate_population checks
+VALIDATION_TOLERANCE = 1e-9
+
+
+def validate_population(cers: [object], model_data: ModelInputData, time_steps: [int], trials: int = 3, seed: int = 0) -> float:
+    """
+    Compare CERPopulation with the CER objects. For each time step, a few trial voltage vectors are evaluated from the same
+    state by both, then the last one is committed on the objects, as the convergence process does.
+    :return: the maximum absolute deviation of the output powers (kW, kVAr) and battery soc
+    """
+    rng = np.random.default_rng(seed)
+    population = CERPopulation(cers, model_data)
+    hybrids = [cer for cer in cers if type(cer) is HybridPVSystem]
+    evs = [cer for cer in cers if type(cer) is EVSystem]
+    deviation = 0.0
+    for time_step in time_steps:
+        population.load_state()
+        cers_state = [cer.snapshot() for cer in cers]
+        for _ in range(trials):
+            volt = rng.uniform(0.9, 1.12, len(cers))
+            for cer, state in zip(cers, cers_state):
+                cer.restore(state)
+            p, q = _run_cers(cers, model_data, volt, time_step)
+            population_p, population_q = population.step(volt, time_step)
+            soc = np.array([cer.battery.soc for cer in hybrids + evs])
+            population_soc = np.concatenate([population.hybrids_soc, population.evs_soc])
+            deviation = max(deviation, np.max(np.abs(p - population_p)), np.max(np.abs(q - population_q)),
+                            np.max(np.abs(soc - population_soc), initial=0.0))
+        # The last trial is kept as the committed state of the objects
+    return deviation
+
+
+def validation_fleet(day: str = 'summer-weekday', step_size: int = 30) -> ([object], ModelInputData):
+    """
+    Mixed fleet of the 165 circuit labels used to validate the population against the CER objects, with one of each
+    operating mode: PV systems with volt-var/volt-watt or export limit, hybrid systems in self consumption or time of use,
+    and unmanaged, managed or v2g EVs.
+    :return: the CERs and the input data of the day
+    """
+    from src.external_input_data import import_txt_file_as_numpy
+    from src.models.pv_panel import PVPanels
+    from src.models.inverter import InverterSettings, HybridInverterSettings, EVInverterSettings, VoltVar, VoltWatt, \
+        StaticExportLimit, MaximiseSelfConsumptionSettings, TimeOfUseSettings, ManagedEVCharging, UnmanagedEVCharging, \
+        V2GEVCharging, HybridInverter, EVInverter
+    from src.models.meter import Meter
+    from src.models.vehicle import Vehicle
+    from src.utils import get_ev_behaviour
+
+    data_path = os.path.dirname(os.path.dirname(__file__)) + '/data'
+    labels = list(range(1, 166))
+    demand_power = {label: import_txt_file_as_numpy(f'{data_path}/load-data/{day}/Load{label}.txt') for label in labels}
+    ev_behaviour = {label: get_ev_behaviour(label, f'{data_path}/ev-data/evs_behaviour_{day}.csv') for label in labels}
+    model_data = ModelInputData(demand_power, import_txt_file_as_numpy(f'{data_path}/pv-data/{day}/solar.txt'),
+                                import_txt_file_as_numpy(f'{data_path}/pv-data/{day}/temp.txt'), step_size, [0, 23.5], ev_behaviour)
+
+    loads = {label: Load(label) for label in labels}
+    pv_settings = InverterSettings()
+    pv_settings.enable_volt_var(VoltVar())
+    pv_settings.enable_volt_watt(VoltWatt())
+    el_settings = InverterSettings()
+    el_settings.enable_static_export_limit(StaticExportLimit(5 / 6))
+    msc_settings = HybridInverterSettings()
+    msc_settings.enable_volt_var(VoltVar())
+    msc_settings.enable_volt_watt(VoltWatt())
+    msc_settings.enable_maximise_self_consumption_settings(MaximiseSelfConsumptionSettings())
+    tou_settings = HybridInverterSettings()
+    tou_settings.enable_volt_var(VoltVar())
+    tou_settings.enable_charging_volt_watt_settings(VoltWatt([[0.9, 0.94, 1.1], [0.2, 1, 1]]))
+    tou_settings.enable_time_of_use_settings(TimeOfUseSettings(step_size=step_size))
+    ev_settings = []
+    for charging in [UnmanagedEVCharging(step_size=step_size), ManagedEVCharging(step_size=step_size), V2GEVCharging(step_size=step_size)]:
+        settings = EVInverterSettings()
+        settings.enable_volt_var(VoltVar())
+        settings.enable_volt_watt(VoltWatt())
+        if isinstance(charging, UnmanagedEVCharging):
+            settings.enable_unmanaged_charging(charging)
+        elif isinstance(charging, ManagedEVCharging):
+            settings.enable_managed_charging(charging)
+        else:
+            settings.enable_charging_volt_watt_settings(VoltWatt([[0.9, 0.94, 1.1], [0.2, 1, 1]]))
+            settings.enable_v2g_charging(charging)
+        ev_settings.append(settings)
+
+    cers = list(loads.values())
+    pvs, hybrids, evs = [], [], []
+    for label in labels:
+        meter = Meter(label, loads=[loads[label]])
+        if label % 3 == 0:
+            inverter = HybridInverter(circuit_label=label, hybrid_inverter_settings=msc_settings if label % 2 else tou_settings)
+            hybrids.append(HybridPVSystem(label, PVPanels(label), Battery(label, step_size=step_size), inverter, meter))
+        else:
+            inverter = Inverter(circuit_label=label, inverter_settings=pv_settings if label % 2 else el_settings)
+            pvs.append(PVSystem(label, PVPanels(label), inverter, meter))
+        meter.add_inverter(inverter)
+        if label % 4 == 0:
+            vehicle = Vehicle(label, ev_behaviour[label]['driving_distance'], ev_behaviour[label]['driving_intervals'], battery_range=350,
+                              step_size=step_size)
+            ev = EVSystem(label, vehicle, Battery(label, capacity=62, soc=0.5, min_soc=0.2, step_size=step_size),
+                          EVInverter(circuit_label=label, ev_inverter_settings=ev_settings[label % 3]))
+            meter.add_ev(ev)
+            evs.append(ev)
+    cers = cers + pvs + hybrids + evs
+    return cers, model_data
+
+
+if __name__ == '__main__':
+    deviation = validate_population(*validation_fleet(), list(range(48)))
+    print(f'Maximum deviation from the CER objects: {deviation:.2e}')
+    if deviation > VALIDATION_TOLERANCE:
+        sys.exit(f'The population deviates from the CER objects by more than {VALIDATION_TOLERANCE:.0e}')
@@ -0,0 +1,773 @@
+import os
+import csv
+import sys
+import numpy as np
+from math import sqrt, pi
+from scipy import sparse
+
+
+#  Native three-phase power flow for radial LV feeders described with a subset of the OpenDSS language
+#  (circuit/Vsource, LineCode, Line, Transformer and Load). It is used by src.native_engine.NativeDSS as a drop-in
+#  for the OpenDSS COM engine.
+
+LENGTH_UNITS_IN_METERS = {'none': None, 'km': 1000.0, 'm': 1.0, 'cm': 0.01, 'mm': 0.001, 'ft': 0.3048, 'kft': 304.8, 'mi': 1609.344, 'in': 0.0254}
+
+
+def split_dss_tokens(text: str) -> list:
+    """
+    Splits a DSS command into tokens, keeping bracketed ([], (), {}) and quoted values together.
+    """
+    tokens = []
+    current = ''
+    depth = 0
+    quote = None
+    for char in text:
+        if quote is not None:
+            current += char
+            if char == quote:
+                quote = None
+        elif char in '\'"':
+            quote = char
+            current += char
+        elif char in '[({':
+            depth += 1
+            current += char
+        elif char in '])}':
+            depth -= 1
+            current += char
+        elif (char.isspace() or char == ',') and depth == 0:
+            if current:
+                tokens.append(current)
+            current = ''
+        else:
+            current += char
+    if current:
+        tokens.append(current)
+    return tokens
+
+
+def parse_dss_value(value: str):
+    """
+    Strips quotes and brackets from a DSS value, returns a list for array values (e.g. buses=[sourcebus, 1, ]).
+    """
+    value = value.strip()
+    if len(value) >= 2 and value[0] in '\'"' and value[-1] == value[0]:
+        value = value[1:-1].strip()
+    if len(value) >= 2 and value[0] in '[({' and value[-1] in '])}':
+        inner = value[1:-1].replace('|', ' ')
+        return [parse_dss_value(item) for item in split_dss_tokens(inner)]
+    return value
+
+
+def parse_dss_properties(tokens: list) -> list:
+    """
+    :return: ordered list of (property, value) pairs, the order matters for properties such as 'wdg'.
+    """
+    properties = []
+    for token in tokens:
+        if '=' in token:
+            key, value = token.split('=', 1)
+            properties.append((key.strip().lower(), parse_dss_value(value)))
+        else:
+            properties.append((None, parse_dss_value(token)))
+    return properties
+
+
+def split_bus_name(bus: str) -> (str, list):
+    """
+    '34.1' -> ('34', [1]), '25' -> ('25', [])
+    """
+    parts = bus.lower().split('.')
+    return parts[0], [int(node) for node in parts[1:] if node != '']
+
+
+def sequence_to_phase(z0, z1, z2=None):
+    """
+    Converts sequence impedances of a transposed element to the 3x3 phase impedance matrix.
+    """
+    if z2 is None:
+        z2 = z1
+    a = np.exp(2j * pi / 3)
+    A = np.array([[1, 1, 1], [1, a ** 2, a], [1, a, a ** 2]])
+    return A @ np.diag([z0, z1, z2]) @ np.linalg.inv(A)
+
+
+class NetworkModel:
+    """
+    Container of the circuit elements defined through DSS commands. Topology elements are kept as dictionaries,
+    loads are kept in NumPy arrays so that their set-points can be updated without rebuilding the solver.
+    """
+
+    def __init__(self, name='circuit'):
+        self.name = name
+        self.vsource = {'bus1': 'sourcebus', 'basekv': 115.0, 'pu': 1.0, 'angle': 0.0, 'mvasc3': 2000.0, 'mvasc1': 2100.0, 'x1r1': 4.0, 'x0r0': 3.0,
+                        'phases': 3}
+        self.linecodes = {}
+        self.lines = {}
+        self.transformers = {}
+        self.energymeters = {}
+        self.voltage_bases = []
+        self.options = {'number': 1, 'mode': 'snapshot', 'tolerance': 1e-9, 'maxiterations': 100}
+        self.bus_order = []
+        self.load_names = []
+        self.load_index = {}
+        self.load_buses = []
+        self.load_phases = np.zeros(0, dtype=int)
+        self.load_kv = np.zeros(0)
+        self.load_kw = np.zeros(0)
+        self.load_kvar = np.zeros(0)
+        self.load_pf = np.zeros(0)
+        self.load_pf_spec = np.zeros(0, dtype=bool)
+        self.load_vminpu = np.zeros(0)
+        self.load_vmaxpu = np.zeros(0)
+        self.load_enabled = np.zeros(0, dtype=bool)
+        self.topology_version = 0
+        self.add_bus(self.vsource['bus1'])
+
+    def add_bus(self, bus):
+        name = split_bus_name(bus)[0]
+        if name not in self.bus_order:
+            self.bus_order.append(name)
+            self.topology_version += 1
+
+    def new_element(self, element_class, name, properties):
+        element_class = element_class.lower()
+        name = name.lower()
+        if element_class in ['circuit', 'vsource']:
+            self.name = name
+            self.edit_element('vsource', name, properties)
+        elif element_class == 'linecode':
+            self.linecodes[name] = {'nphases': 3, 'r1': 0.058, 'x1': 0.1206, 'r0': 0.1784, 'x0': 0.4047, 'units': 'none', 'normamps': 400.0, 'emergamps': 600.0}
+            self.edit_element(element_class, name, properties)
+        elif element_class == 'line':
+            self.lines[name] = {'bus1': None, 'bus2': None, 'phases': 3, 'length': 1.0, 'units': 'none', 'linecode': None, 'normamps': 400.0, 'emergamps': 600.0,
+                                'enabled': True}
+            self.edit_element(element_class, name, properties)
+        elif element_class == 'transformer':
+            self.transformers[name] = {'phases': 3, 'windings': 2, 'buses': [None, None], 'conns': ['wye', 'wye'], 'kvs': [12.47, 12.47], 'kvas': [1000.0, 1000.0],
+                                       'taps': [1.0, 1.0], '%rs': [0.2, 0.2], 'xhl': 7.0, 'wdg': 0}
+            self.edit_element(element_class, name, properties)
+        elif element_class == 'load':
+            self.new_load(name, properties)
+        elif element_class == 'energymeter':
+            self.energymeters[name] = {}
+            self.edit_element(element_class, name, properties)
+        else:
+            # Monitors, LoadShapes ... etc are accepted but not used by the power flow.
+            pass
+
+    def edit_element(self, element_class, name, properties):
+        element_class = element_class.lower()
+        name = name.lower()
+        if element_class in ['circuit', 'vsource']:
+            element = self.vsource
+        elif element_class == 'linecode':
+            element = self.linecodes[name]
+        elif element_class == 'line':
+            element = self.lines[name]
+        elif element_class == 'transformer':
+            element = self.transformers[name]
+        elif element_class == 'load':
+            self.edit_load(self.load_index[name], properties)
+            return
+        elif element_class == 'energymeter':
+            element = self.energymeters[name]
+        else:
+            return
+
+        for key, value in properties:
+            if key is None:
+                continue
+            if element_class == 'transformer':
+                self._edit_transformer_property(element, key, value)
+            elif key in ['bus1', 'bus2', 'linecode', 'units', 'element', 'conn']:
+                element[key] = value.lower() if isinstance(value, str) else value
+            elif key == 'enabled':
+                element[key] = str(value).lower() in ['yes', 'true', 'y', 't']
+            else:
+                try:
+                    element[key] = float(value)
+                except (TypeError, ValueError):
+                    element[key] = value
+            if key in ['bus1', 'bus2'] and element_class in ['line', 'vsource']:
+                self.add_bus(element[key])
+        self.topology_version += 1
+
+    def _edit_transformer_property(self, transformer, key, value):
+        if key == 'wdg':
+            transformer['wdg'] = int(float(value)) - 1
+        elif key == 'buses':
+            transformer['buses'] = [str(bus).lower() for bus in value]
+            for bus in transformer['buses']:
+                self.add_bus(bus)
+        elif key == 'conns':
+            transformer['conns'] = [str(conn).lower() for conn in value]
+        elif key in ['kvs', 'kvas', 'taps', '%rs']:
+            transformer[key] = [float(item) for item in value]
+        elif key in ['bus', 'conn', 'kv', 'kva', 'tap', '%r']:
+            list_key = {'bus': 'buses', 'conn': 'conns', 'kv': 'kvs', 'kva': 'kvas', 'tap': 'taps', '%r': '%rs'}[key]
+            if key in ['bus', 'conn']:
+                transformer[list_key][transformer['wdg']] = str(value).lower()
+                if key == 'bus':
+                    self.add_bus(str(value))
+            else:
+                transformer[list_key][transformer['wdg']] = float(value)
+        elif key in ['xhl', 'x12', 'phases', 'windings']:
+            transformer['xhl' if key == 'x12' else key] = float(value)
+        else:
+            transformer[key] = value
+
+    def new_load(self, name, properties):
+        if name in self.load_index:
+            self.edit_load(self.load_index[name], properties)
+            return
+        self.load_index[name] = len(self.load_names)
+        self.load_names.append(name)
+        self.load_buses.append(None)
+        self.load_phases = np.append(self.load_phases, 3)
+        self.load_kv = np.append(self.load_kv, 12.47)
+        self.load_kw = np.append(self.load_kw, 10.0)
+        self.load_kvar = np.append(self.load_kvar, 0.0)
+        self.load_pf = np.append(self.load_pf, 0.88)
+        self.load_pf_spec = np.append(self.load_pf_spec, True)
+        self.load_vminpu = np.append(self.load_vminpu, 0.95)
+        self.load_vmaxpu = np.append(self.load_vmaxpu, 1.05)
+        self.load_enabled = np.append(self.load_enabled, True)
+        self.edit_load(self.load_index[name], properties)
+        self.topology_version += 1
+
+    def edit_load(self, idx, properties):
+        for key, value in properties:
+            if key is None:
+                continue
+            if key == 'bus1':
+                self.load_buses[idx] = value.lower()
+                self.topology_version += 1
+            elif key == 'phases':
+                self.load_phases[idx] = int(float(value))
+                self.topology_version += 1
+            elif key == 'kv':
+                self.load_kv[idx] = float(value)
+            elif key == 'kw':
+                self.set_load_kw(idx, float(value))
+            elif key == 'kvar':
+                self.set_load_kvar(idx, float(value))
+            elif key == 'pf':
+                self.load_pf[idx] = float(value)
+                self.load_pf_spec[idx] = True
+                self.load_kvar[idx] = self._kvar_from_pf(self.load_kw[idx], self.load_pf[idx])
+            elif key == 'vminpu':
+                self.load_vminpu[idx] = float(value)
+            elif key == 'vmaxpu':
+                self.load_vmaxpu[idx] = float(value)
+            elif key == 'enabled':
+                self.load_enabled[idx] = str(value).lower() in ['yes', 'true', 'y', 't']
+            elif key == 'model' and int(float(value)) != 1:
+                raise NotImplementedError(f"Only constant PQ loads (model=1) are supported by the native engine, got model={value}.")
+
+    def set_load_kw(self, idx, kw):
+        self.load_kw[idx] = kw
+        if self.load_pf_spec[idx]:
+            self.load_kvar[idx] = self._kvar_from_pf(kw, self.load_pf[idx])
+
+    def set_load_kvar(self, idx, kvar):
+        self.load_kvar[idx] = kvar
+        self.load_pf_spec[idx] = False
+        # As OpenDSS, keep the nominal PF up to date so that a later kW edit keeps the kW/kvar ratio
+        s = sqrt(self.load_kw[idx] ** 2 + kvar ** 2)
+        if s > 0:
+            self.load_pf[idx] = abs(self.load_kw[idx]) / s if kvar >= 0 else -abs(self.load_kw[idx]) / s
+
+    @staticmethod
+    def _kvar_from_pf(kw, pf):
+        if pf == 0:
+            return 0.0
+        kvar = kw * sqrt(1 / pf ** 2 - 1)
+        return kvar if pf > 0 else -kvar
+
+    def line_phase_impedance(self, line) -> np.ndarray:
+        """
+        :return: 3x3 phase impedance of the line in ohms (Kron-reduced, transposed, from the sequence data of its LineCode).
+        """
+        linecode = self.linecodes[line['linecode']]
+        z1 = linecode['r1'] + 1j * linecode['x1']
+        z0 = linecode['r0'] + 1j * linecode['x0']
+        line_units = LENGTH_UNITS_IN_METERS[line['units']]
+        code_units = LENGTH_UNITS_IN_METERS[linecode['units']]
+        length = line['length']
+        if line_units is not None and code_units is not None:
+            length = length * line_units / code_units
+        return sequence_to_phase(z0, z1) * length
+
+
+class PowerFlowSolver:
+    """
+    Vectorized backward/forward sweep (branch-injection to branch-current formulation) for a radial, three-phase
+    feeder supplied through a two-winding transformer from a Thevenin source.
+
+    All the sweeps are sparse matrix products:
+        I_branch = BIBC @ I_bus
+        V_bus = V_root - BIBC.T @ (Z_branch * I_branch)
+    """
+
+    def __init__(self, model: NetworkModel):
+        self._model = model
+        self._topology_version = None
+        self.build()
+
+    @property
+    def model(self):
+        return self._model
+
+    def build(self):
+        model = self._model
+        if len(model.transformers) != 1:
+            raise NotImplementedError("The native engine supports a single source transformer feeding a radial network.")
+        transformer = list(model.transformers.values())[0]
+        hv_bus = split_bus_name(transformer['buses'][0])[0]
+        lv_bus = split_bus_name(transformer['buses'][1])[0]
+        if hv_bus != split_bus_name(model.vsource['bus1'])[0]:
+            raise NotImplementedError("The transformer primary has to be connected to the source bus.")
+        self.hv_bus = hv_bus
+        self.root_bus = lv_bus
+
+        # Radial tree of the LV network
+        adjacency = {}
+        for name, line in model.lines.items():
+            if not line['enabled']:
+                continue
+            if int(line['phases']) != 3:
+                raise NotImplementedError(f"Line.{name}: only three-phase lines are supported by the native engine.")
+            bus1 = split_bus_name(line['bus1'])[0]
+            bus2 = split_bus_name(line['bus2'])[0]
+            adjacency.setdefault(bus1, []).append((bus2, name))
+            adjacency.setdefault(bus2, []).append((bus1, name))
+        self.buses = [lv_bus]
+        parent = {lv_bus: None}
+        parent_line = {lv_bus: None}
+        queue = [lv_bus]
+        while queue:
+            bus = queue.pop(0)
+            for neighbour, line_name in adjacency.get(bus, []):
+                if neighbour in parent:
+                    if parent_line[bus] != line_name:
+                        raise NotImplementedError(f"Line.{line_name} closes a loop, only radial networks are supported.")
+                    continue
+                parent[neighbour] = bus
+                parent_line[neighbour] = line_name
+                self.buses.append(neighbour)
+                queue.append(neighbour)
+        self.bus_index = {bus: i for i, bus in enumerate(self.buses)}
+        n_buses = len(self.buses)
+        # Reported bus order follows the definition order, as OpenDSS does
+        self.bus_names = [bus for bus in model.bus_order if bus == hv_bus or bus in self.bus_index]
+        self._report_order = np.array([3 * self.bus_index[bus] + phase for bus in self.bus_names if bus != hv_bus for phase in range(3)], dtype=int)
+
+        # Branches ordered by their receiving bus (breadth first), branch b feeds bus b + 1
+        self.branch_lines = [parent_line[bus] for bus in self.buses[1:]]
+        self.branch_index = {line: b for b, line in enumerate(self.branch_lines)}
+        self.branch_from = np.array([self.bus_index[parent[bus]] for bus in self.buses[1:]], dtype=int)
+        self.branch_to = np.arange(1, n_buses, dtype=int)
+        # +1 if the line terminal 1 is the upstream bus, -1 otherwise
+        self.branch_direction = np.array([1.0 if split_bus_name(model.lines[line]['bus1'])[0] == parent[bus] else -1.0
+                                          for bus, line in zip(self.buses[1:], self.branch_lines)])
+        self.branch_z = np.array([model.line_phase_impedance(model.lines[line]) for line in self.branch_lines]).reshape(-1, 3, 3)
+
+        # Branch-injection to branch-current matrix, row b holds all the buses downstream of branch b
+        rows, cols = [], []
+        for bus_i in range(1, n_buses):
+            bus = self.buses[bus_i]
+            while parent[bus] is not None:
+                rows.append(self.bus_index[bus] - 1)
+                cols.append(bus_i)
+                bus = parent[bus]
+        self.bibc = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(n_buses - 1, n_buses))
+        self.bibc_t = self.bibc.T.tocsr()
+
+        # Distances from the energy meter (km), if any
+        self.distance = np.zeros(n_buses)
+        meter_bus = self._energy_meter_bus()
+        if meter_bus is not None and meter_bus in self.bus_index:
+            lengths_km = np.array([self._line_length_km(model.lines[line]) for line in self.branch_lines])
+            below_meter = self._subtree_mask(meter_bus)
+            for bus_i in range(1, n_buses):
+                if below_meter[bus_i]:
+                    self.distance[bus_i] = self.distance[self.branch_from[bus_i - 1]] + lengths_km[bus_i - 1]
+
+        self._build_source(transformer)
+        self._build_loads()
+        self._topology_version = model.topology_version
+        self.v = np.tile(self.e_root, (n_buses, 1))
+        self.v_hv = self.e_hv.copy()
+        self.i_branch = np.zeros((n_buses - 1, 3), dtype=complex)
+        self.i_root = np.zeros(3, dtype=complex)
+        self.iterations = 0
+        self.converged = False
+        # Computed on first use after each solution
+        self._line_losses = None
+
+    def _energy_meter_bus(self):
+        for meter in self._model.energymeters.values():
+            element = str(meter.get('element', '')).lower()
+            if element.startswith('line.'):
+                line = self._model.lines.get(element.split('.', 1)[1])
+                if line is None:
+                    continue
+                terminal = int(float(meter.get('terminal', 1)))
+                return split_bus_name(line['bus1'] if terminal == 1 else line['bus2'])[0]
+        return None
+
+    def _subtree_mask(self, bus):
+        mask = np.zeros(len(self.buses), dtype=bool)
+        start = self.bus_index[bus]
+        mask[start] = True
+        for bus_i in range(start + 1, len(self.buses)):
+            mask[bus_i] = mask[self.branch_from[bus_i - 1]]
+        return mask
+
+    def _line_length_km(self, line):
+        units = LENGTH_UNITS_IN_METERS[line['units']]
+        if units is None:
+            units = LENGTH_UNITS_IN_METERS.get(self._model.linecodes[line['linecode']]['units']) or 1000.0
+        return line['length'] * units / 1000.0
+
+    def _build_source(self, transformer):
+        model = self._model
+        vsource = model.vsource
+        kv_hv, kv_lv = transformer['kvs'][0], transformer['kvs'][1]
+        kva = transformer['kvas'][0]
+        conns = tuple(transformer['conns'][:2])
+        if conns not in [('delta', 'wye'), ('wye', 'wye')]:
+            raise NotImplementedError(f"Transformer connection {conns} is not supported by the native engine.")
+
+        # Source positive sequence impedance referred to the LV side (delta winding blocks the zero sequence)
+        z1_source = vsource['basekv'] ** 2 / vsource['mvasc3']
+        r1 = z1_source / sqrt(1 + vsource['x1r1'] ** 2)
+        z1_hv = r1 + 1j * r1 * vsource['x1r1']
+        z1_source = z1_hv * (kv_lv / kv_hv) ** 2
+        z_base_lv = kv_lv ** 2 / (kva / 1000)
+        z_transformer = (sum(transformer['%rs'][:2]) + 1j * transformer['xhl']) / 100 * z_base_lv
+        z0 = z_transformer if conns[0] == 'delta' else z_transformer + 3 * z1_source
+        self.z_source = z1_source
+        self.z_transformer = z_transformer
+        self.z_thevenin = sequence_to_phase(z0, z_transformer + z1_source)
+        # Phase impedance of the source on the primary side, the zero sequence from the single-phase short circuit level
+        # (|Z0 + 2 Z1| = basekv^2 / MVAsc1 with the X0/R0 ratio of the source)
+        a, b = 1 + vsource['x0r0'] ** 2, 4 * (z1_hv.real + z1_hv.imag * vsource['x0r0'])
+        c = 4 * abs(z1_hv) ** 2 - (vsource['basekv'] ** 2 / vsource['mvasc1']) ** 2
+        r0 = (-b + sqrt(b ** 2 - 4 * a * c)) / (2 * a) if b ** 2 - 4 * a * c >= 0 else z1_hv.real
+        self.z_source_hv = sequence_to_phase(r0 * (1 + 1j * vsource['x0r0']) if r0 > 0 else z1_hv, z1_hv)
+        # Ideal transformer, secondary (line to neutral) voltages = ratio @ primary (line to neutral) voltages
+        if conns[0] == 'delta':
+            self.transformer_ratio = kv_lv / (sqrt(3) * kv_hv) * np.array([[1.0, 0.0, -1.0], [-1.0, 1.0, 0.0], [0.0, -1.0, 1.0]])
+        else:
+            self.transformer_ratio = kv_lv / kv_hv * np.eye(3)
+
+        self.kv_base_hv = vsource['basekv'] / sqrt(3)
+        self.kv_base_lv = kv_lv / sqrt(3)
+        if model.voltage_bases:
+            self.kv_base_hv = min(model.voltage_bases, key=lambda base: abs(base - vsource['basekv'])) / sqrt(3)
+            self.kv_base_lv = min(model.voltage_bases, key=lambda base: abs(base - kv_lv)) / sqrt(3)
+        # ANSI convention: the delta-wye secondary lags the primary by 30 degrees
+        self.phase_shift = -pi / 6 if conns[0] == 'delta' else 0.0
+        a = np.exp(-2j * pi / 3)
+        rotation = np.array([1, a, a ** 2])
+        angle = vsource['angle'] * pi / 180
+        self.e_hv = vsource['pu'] * self.kv_base_hv * 1000 * np.exp(1j * angle) * rotation
+        self.e_root = vsource['pu'] * kv_lv / sqrt(3) * 1000 * np.exp(1j * (angle + self.phase_shift)) * rotation
+
+    def _build_loads(self):
+        model = self._model
+        rows, cols, weights = [], [], []
+        self.load_nodes = []
+        for idx, bus in enumerate(model.load_buses):
+            bus_name, nodes = split_bus_name(bus)
+            if bus_name not in self.bus_index:
+                raise NotImplementedError(f"Load.{model.load_names[idx]} is not connected to the LV network supplied by the transformer.")
+            if not nodes:
+                nodes = [1, 2, 3][:model.load_phases[idx]]
+            for node in nodes:
+                rows.append(3 * self.bus_index[bus_name] + node - 1)
+                cols.append(idx)
+                weights.append(1.0 / len(nodes))
+            self.load_nodes.append(np.array([3 * self.bus_index[bus_name] + node - 1 for node in nodes]))
+        n_loads = len(model.load_names)
+        n_nodes = 3 * len(self.buses)
+        # Maps the per-load powers (kW) to the node powers (W) and the node voltages back to the loads
+        self.load_to_node = sparse.csr_matrix((np.array(weights), (rows, cols)), shape=(n_nodes, n_loads))
+        self.load_node_index = np.array(rows, dtype=int)
+        self.load_entry_owner = np.array(cols, dtype=int)
+        self.load_entry_weight = np.array(weights)
+        phases = np.maximum(model.load_phases, 1)
+        self.load_v_base = np.where(phases == 1, model.load_kv, model.load_kv / sqrt(3)) * 1000 if n_loads else np.zeros(0)
+
+    def solve(self):
+        """
+        Solves the power flow with the current load set-points. Returns True if converged.
+        """
+        model = self._model
+        if self._topology_version != model.topology_version:
+            self.build()
+        n_nodes = 3 * len(self.buses)
+        tolerance = model.options['tolerance'] * 1000 * self.kv_base_lv
+        v = self.v.copy()
+        self.converged = False
+        for iteration in range(int(model.options['maxiterations'])):
+            i_entry = self.load_entry_currents(v.reshape(-1)[self.load_node_index])
+            i_bus = np.bincount(self.load_node_index, weights=i_entry.real, minlength=n_nodes) + \
+                1j * np.bincount(self.load_node_index, weights=i_entry.imag, minlength=n_nodes)
+            i_bus = i_bus.reshape(-1, 3)
+            i_branch = self.bibc @ i_bus
+            dv_branch = np.einsum('bij,bj->bi', self.branch_z, i_branch)
+            i_root = i_bus.sum(axis=0)
+            v_root = self.e_root - self.z_thevenin @ i_root
+            v_new = v_root[np.newaxis, :] - self.bibc_t @ dv_branch
+            v_new[0] = v_root
+            delta = np.max(np.abs(v_new - v))
+            v = v_new
+            if delta <= tolerance:
+                self.converged = True
+                break
+        self.iterations = iteration + 1
+        self.v = v
+        self._line_losses = None
+        self.i_branch = i_branch
+        self.i_root = i_root
+        self._update_hv_voltages()
+        return self.converged
+
+    def path_impedances(self, nodes) -> np.ndarray:
+        """
+        :param nodes: node indices (3 * bus index + phase index) in the LV network
+        :return: impedance (ohm) of the path shared by each pair of nodes to the source, Thevenin impedance included
+        """
+        nodes = np.asarray(nodes, dtype=int)
+        buses, phases = nodes // 3, nodes % 3
+        paths = self.bibc[:, buses]
+        z = self.z_thevenin[phases[:, np.newaxis], phases[np.newaxis, :]].astype(complex)
+        for p in range(3):
+            rows = phases == p
+            for q in range(3):
+                cols = phases == q
+                if rows.any() and cols.any():
+                    z[np.ix_(rows, cols)] += (paths[:, rows].T @ sparse.diags(self.branch_z[:, p, q]) @ paths[:, cols]).toarray()
+        return z
+
+    def node_sensitivities(self, nodes) -> (np.ndarray, np.ndarray):
+        """
+        Sensitivities of the voltage magnitudes of the given load nodes to the powers consumed at the same nodes, linearised
+        around the last solution. A current drawn at node j changes the voltage of node i by -Z_ij dI_j (see
+        path_impedances), and the constant power loads respond to the voltage changes with dI_k = -conj(S_k) conj(dV_k) /
+        conj(V_k)^2, so the voltage changes of all the load nodes are solved together (real and imaginary parts).
+        :param nodes: node indices (3 * bus index + phase index) of loads
+        :return: d|V_i|/dP_j in V/W and d|V_i|/dQ_j in V/var
+        """
+        model = self._model
+        load_nodes = np.unique(self.load_node_index)
+        n = len(load_nodes)
+        idx = np.searchsorted(load_nodes, nodes)
+        if np.any(load_nodes[np.minimum(idx, n - 1)] != nodes):
+            raise ValueError("Voltage sensitivities are only computed for nodes with loads.")
+        z = self.path_impedances(load_nodes)
+        v = self.v.reshape(-1)[load_nodes]
+        s_entry = 1000 * (model.load_kw + 1j * model.load_kvar)[self.load_entry_owner] * self.load_entry_weight * model.load_enabled[self.load_entry_owner]
+        s = np.bincount(np.searchsorted(load_nodes, self.load_node_index), weights=s_entry.real, minlength=n) + \
+            1j * np.bincount(np.searchsorted(load_nodes, self.load_node_index), weights=s_entry.imag, minlength=n)
+        # dV = m conj(dV) + b, with b the voltage changes of the currents drawn by 1 W (1 var) at the given nodes
+        m = z * (np.conj(s) / np.conj(v) ** 2)[np.newaxis, :]
+        system = np.eye(2 * n) - np.block([[m.real, m.imag], [m.imag, -m.real]])
+        b = -z[:, idx] / np.conj(v[idx])[np.newaxis, :]
+        b = np.hstack([b, -1j * b])
+        dv = np.linalg.solve(system, np.vstack([b.real, b.imag]))
+        dv = dv[:n] + 1j * dv[n:]
+        # d|V| is the projection of dV on the direction of V
+        dv_abs = ((np.conj(v[idx]) / np.abs(v[idx]))[:, np.newaxis] * dv[idx]).real
+        return dv_abs[:, :len(idx)], dv_abs[:, len(idx):]
+
+    def y_matrix(self) -> sparse.csr_matrix:
+        """
+        System admittance matrix (S) of the lines, the transformer and the source impedance, the loads are not included.
+        :return: complex matrix with rows and columns ordered as node_names
+        """
+        n_buses = len(self.buses)
+        rows, cols, values = [], [], []
+
+        def add(row_nodes, col_nodes, y):
+            rows.append(np.repeat(row_nodes, len(col_nodes)))
+            cols.append(np.tile(col_nodes, len(row_nodes)))
+            values.append(np.asarray(y).reshape(-1))
+
+        # Internal order, primary nodes first then the LV nodes 3 * bus index + phase index
+        hv, root = np.arange(3), 3 + np.arange(3)
+        y_lines = np.linalg.inv(self.branch_z)
+        for b, y in enumerate(y_lines):
+            from_nodes, to_nodes = 3 + 3 * self.branch_from[b] + np.arange(3), 3 + 3 * self.branch_to[b] + np.arange(3)
+            add(from_nodes, from_nodes, y)
+            add(to_nodes, to_nodes, y)
+            add(from_nodes, to_nodes, -y)
+            add(to_nodes, from_nodes, -y)
+        # Leakage impedance on the secondary side of the ideal transformer
+        y_transformer = 1 / self.z_transformer
+        ratio = self.transformer_ratio
+        add(hv, hv, y_transformer * ratio.T @ ratio + np.linalg.inv(self.z_source_hv))
+        add(hv, root, -y_transformer * ratio.T)
+        add(root, hv, -y_transformer * ratio)
+        add(root, root, y_transformer * np.eye(3))
+        n = 3 + 3 * n_buses
+        y = sparse.csr_matrix((np.concatenate(values), (np.concatenate(rows), np.concatenate(cols))), shape=(n, n))
+        order = np.concatenate([hv, 3 + self._report_order])
+        return y[order][:, order].tocsr()
+
+    def _update_hv_voltages(self):
+        """
+        Primary (source bus) voltages from the sequence currents drawn through the source impedance.
+        """
+        a = np.exp(2j * pi / 3)
+        i0, i1, i2 = np.array([[1, 1, 1], [1, a, a ** 2], [1, a ** 2, a]]) @ self.i_root / 3
+        ratio = self.kv_base_hv / self.kv_base_lv
+        shift = np.exp(-1j * self.phase_shift)
+        v1 = self.e_hv[0] - self.z_source * i1 * shift * ratio
+        v2 = - self.z_source * i2 * np.conj(shift) * ratio
+        self.v_hv = np.array([v1 + v2, a ** 2 * v1 + a * v2, a * v1 + a ** 2 * v2])
+
+    def bus_voltages(self, bus) -> np.ndarray:
+        bus = bus.lower()
+        if bus == self.hv_bus:
+            return self.v_hv
+        return self.v[self.bus_index[bus]]
+
+    def bus_kv_base(self, bus):
+        return self.kv_base_hv if bus.lower() == self.hv_bus else self.kv_base_lv
+
+    def bus_distance(self, bus):
+        bus = bus.lower()
+        if bus == self.hv_bus:
+            return 0.0
+        return self.distance[self.bus_index[bus]]
+
+    @property
+    def node_names(self) -> list:
+        return [f'{bus}.{phase}' for bus in self.bus_names for phase in [1, 2, 3]]
+
+    @property
+    def node_voltages(self) -> np.ndarray:
+        """
+        :return: complex node voltages (V) ordered as node_names
+        """
+        return np.concatenate([self.v_hv, self.v.reshape(-1)[self._report_order]])
+
+    @property
+    def node_kv_base(self) -> np.ndarray:
+        return np.concatenate([np.full(3, self.kv_base_hv), np.full(3 * len(self.buses), self.kv_base_lv)])
+
+    def line_terminal_currents(self, line) -> np.ndarray:
+        """
+        :return: currents (A) flowing into terminal 1 and terminal 2 of the line, shape (2, 3)
+        """
+        b = self.branch_index[line.lower()]
+        i1 = self.branch_direction[b] * self.i_branch[b]
+        return np.array([i1, -i1])
+
+    def line_terminal_voltages(self, line) -> np.ndarray:
+        b = self.branch_index[line.lower()]
+        v_from, v_to = self.v[self.branch_from[b]], self.v[self.branch_to[b]]
+        if self.branch_direction[b] > 0:
+            return np.array([v_from, v_to])
+        return np.array([v_to, v_from])
+
+    @property
+    def line_losses(self) -> np.ndarray:
+        """
+        :return: complex losses (VA) of each branch, ordered as branch_lines
+        """
+        if self._line_losses is None:
+            v_drop = self.v[self.branch_from] - self.v[self.branch_to]
+            self._line_losses = np.sum(v_drop * np.conj(self.i_branch), axis=1)
+        return self._line_losses
+
+    @property
+    def transformer_losses(self) -> complex:
+        # The transformer impedance is the same in all sequences
+        return self.z_transformer * np.sum(np.abs(self.i_root) ** 2)
+
+    @property
+    def load_powers(self) -> complex:
+        """
+        :return: total complex power (VA) consumed by the loads
+        """
+        v_entry = self.v.reshape(-1)[self.load_node_index]
+        return np.sum(v_entry * np.conj(self.load_entry_currents(v_entry)))
+
+    def load_entry_currents(self, v_entry) -> np.ndarray:
+        """
+        Load currents (A) for each load entry (one entry per connected node). The loads are constant power between
+        vminpu and vmaxpu and constant impedance outside that band, as OpenDSS load model 1.
+        """
+        model = self._model
+        enabled = model.load_enabled[self.load_entry_owner]
+        s_entry = 1000 * (model.load_kw + 1j * model.load_kvar)[self.load_entry_owner] * self.load_entry_weight * enabled
+        v_min = (model.load_vminpu * self.load_v_base)[self.load_entry_owner]
+        v_max = (model.load_vmaxpu * self.load_v_base)[self.load_entry_owner]
+        v_limited = np.clip(np.abs(v_entry), v_min, v_max)
+        return np.conj(s_entry / v_limited ** 2) * v_entry
+
+
+#  Maximum voltage magnitude deviation (pu) of the native engine from the stored OpenDSS voltages
+VALIDATION_TOLERANCE = 1e-6
+
+
+def validate_native_engine(dss_path: str, reference_path: str, label_bus_dict: dict, demand_power: dict, power_factor: float = 0.95) -> float:
+    """
+    Compares the native power flow against voltages stored from an OpenDSS run of the same load case.
+    The reference csv holds the columns: step, node, v_pu, angle.
+    :return: the maximum absolute voltage magnitude deviation in pu
+    """
+    from src.native_engine import NativeDSS
+    reference = {}
+    with open(reference_path, 'r') as csvfile:
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            reference.setdefault(int(row['step']), {})[row['node']] = float(row['v_pu'])
+
+    dss = NativeDSS()
+    dss.Text.Command = 'Compile ' + dss_path
+    for label, bus in label_bus_dict.items():
+        dss.Text.Command = f'New Load.Load_{label} phases=1 bus1={bus} kV=0.23 kW=0 PF=1.0 vminpu=0.6 vmaxpu=2'
+    max_deviation = 0.0
+    matched = 0
+    q_factor = sqrt(1 / power_factor ** 2 - 1)
+    for step, voltages in reference.items():
+        for label in label_bus_dict.keys():
+            kw = demand_power[label][step]
+            dss.Text.Command = f'Load.Load_{label}.kw={kw}'
+            dss.Text.Command = f'Load.Load_{label}.kvar={kw * q_factor}'
+        dss.Text.Command = 'solve'
+        names = dss.ActiveCircuit.AllNodeNames
+        magnitudes = dss.ActiveCircuit.AllBusVmagPu
+        for node, v_pu in zip(names, magnitudes):
+            if node in voltages:
+                max_deviation = max(max_deviation, abs(v_pu - voltages[node]))
+                matched += 1
+    if matched == 0:
+        raise ValueError(f'No node of {reference_path} found in the circuit of {dss_path}.')
+    return max_deviation
+
+
+def validation_case(day: str = 'summer-weekday') -> (str, str, dict, dict):
+    """
+    :return: the arguments of validate_native_engine for the network model and the stored OpenDSS voltages of the day
+    """
+    from src.external_input_data import import_txt_file_as_numpy
+    root = os.path.dirname(os.path.dirname(__file__))
+    with open(root + "/data/network-model/label_bus_dict.csv", 'r') as csvfile:
+        reader = csv.reader(csvfile)
+        label_bus_dict = {int(row[0]): row[1] for row in reader}
+    demand_power = {label: import_txt_file_as_numpy(root + f'/data/load-data/{day}/Load{label}.txt') for label in label_bus_dict.keys()}
+    return root + "/data/network-model/model.dss", root + "/data/network-model/opendss_reference_voltages.csv", label_bus_dict, demand_power
+
+
+if __name__ == '__main__':
+    deviation = validate_native_engine(*validation_case())
+    print(f'Maximum voltage deviation from OpenDSS: {deviation:.2e} pu')
+    if deviation > VALIDATION_TOLERANCE:
+        sys.exit(f'The native engine deviates from OpenDSS by more than {VALIDATION_TOLERANCE:.0e} pu')
@@ -0,0 +1,173 @@
+import os
+import json
+import cProfile
+import numpy as np
+import pandas as pd
+from time import perf_counter
+
+#  Instrumentation of the simulation loop. StepProfiler records, for each time step of the Compiler, the number of
+#  convergence iterations, the time spent in each phase of the step and the number of calls made to the power flow engine
+#  (counted by DSSCallCounter), and exports them as a CSV or JSON trace. It can also run cProfile or pyinstrument over the
+#  time steps. Nothing is recorded unless Compiler.enable_profiling is called.
+
+PHASES = ('run_cers', 'update_cer_setpoints', 'solve_power_flow', 'update_sys_voltage', 'update_line_flow', 'update_circuit_metrics',
+          'collect_results')
+PROFILERS = ('cprofile', 'pyinstrument')
+
+#  Values returned as they are by DSSCallCounter, any other object returned by the engine is wrapped to count its calls too
+_PLAIN_TYPES = (str, bytes, bool, int, float, complex, tuple, list, dict, np.ndarray, np.generic, type(None))
+
+
+class DSSCallCounter:
+    """
+    Proxy of the OpenDSS object counting the calls made through it: every property read or write and every method call, on
+    the object and on the interfaces reached from it (ActiveCircuit, Text, Loads, ...). With the COM engine, each of them is
+    a COM call.
+    """
+
+    def __init__(self, target, counts: list = None):
+        object.__setattr__(self, '_target', target)
+        object.__setattr__(self, '_counts', [0] if counts is None else counts)
+
+    @property
+    def calls(self) -> int:
+        return self._counts[0]
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if isinstance(value, _PLAIN_TYPES):
+            self._counts[0] += 1
+            return value
+        if callable(value) and hasattr(value, '__self__'):
+            return _CountedMethod(value, self._counts)
+        self._counts[0] += 1
+        return DSSCallCounter(value, self._counts)
+
+    def __setattr__(self, name, value):
+        self._counts[0] += 1
+        setattr(self._target, name, value)
+
+
+class _CountedMethod:
+    def __init__(self, method, counts: list):
+        self._method = method
+        self._counts = counts
+
+    def __call__(self, *args, **kwargs):
+        self._counts[0] += 1
+        value = self._method(*args, **kwargs)
+        return value if isinstance(value, _PLAIN_TYPES) else DSSCallCounter(value, self._counts)
+
+
+class _Phase:
+    """
+    Context manager adding the time spent in it to one phase of the current time step.
+    """
+    __slots__ = ('_times', '_name', '_start')
+
+    def __init__(self, times: dict, name: str):
+        self._times = times
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self):
+        self._start = perf_counter()
+
+    def __exit__(self, *exc_info):
+        self._times[self._name] += perf_counter() - self._start
+
+
+class StepProfiler:
+    """
+    Per time step trace of the simulation loop, one row per step: time step, iterations, power flow solves, total step time,
+    time of each phase of PHASES (s) and calls to the power flow engine. The time of the step out of the phases (convergence
+    bookkeeping, sensitivities) is the difference between the step time and the sum of the phases.
+    """
+
+    def __init__(self, profiler: str = None):
+        """
+        :param profiler: None, 'cprofile' or 'pyinstrument' (needs the pyinstrument package) to also profile the time steps
+        """
+        if profiler is not None and profiler not in PROFILERS:
+            raise ValueError(f"Invalid profiler {profiler}. Expected one of {PROFILERS}.")
+        self._profiler_name = profiler
+        self._profiler = None
+        if profiler == 'cprofile':
+            self._profiler = cProfile.Profile()
+        elif profiler == 'pyinstrument':
+            from pyinstrument import Profiler  # pyinstrument is only needed for this profiler
+            self._profiler = Profiler()
+        self._times = {phase: 0.0 for phase in PHASES}
+        self._phases = {phase: _Phase(self._times, phase) for phase in PHASES}
+        self._time_step = None
+        self._step_start = 0.0
+        self._calls_start = 0
+        self._trace = []
+
+    @property
+    def trace(self) -> [dict]:
+        return self._trace
+
+    def phase(self, name: str) -> _Phase:
+        return self._phases[name]
+
+    def start_step(self, time_step, calls: int = 0):
+        """
+        :param calls: calls to the power flow engine so far
+        """
+        for phase in PHASES:
+            self._times[phase] = 0.0
+        self._time_step = time_step
+        self._calls_start = calls
+        if self._profiler_name == 'pyinstrument':
+            self._profiler.start()
+        elif self._profiler_name == 'cprofile':
+            self._profiler.enable()
+        self._step_start = perf_counter()
+
+    def end_step(self, iterations: int, power_flow_solves: int, calls: int = 0):
+        """
+        :param calls: calls to the power flow engine so far
+        """
+        step_time = perf_counter() - self._step_start
+        if self._profiler_name == 'pyinstrument':
+            self._profiler.stop()
+        elif self._profiler_name == 'cprofile':
+            self._profiler.disable()
+        self._trace.append({'time_step': self._time_step, 'iterations': iterations, 'power_flow_solves': power_flow_solves,
+                            'step_time': step_time} | self._times | {'dss_calls': calls - self._calls_start})
+
+    def to_dataframe(self) -> pd.DataFrame:
+        return pd.DataFrame(self._trace, columns=['time_step', 'iterations', 'power_flow_solves', 'step_time', *PHASES, 'dss_calls'])
+
+    def summary(self) -> dict:
+        """
+        :return: total time of each phase and of the steps (s), total iterations and power flow engine calls
+        """
+        trace = self.to_dataframe()
+        return {column: trace[column].sum().item() for column in trace.columns if column != 'time_step'}
+
+    def export_trace(self, path: str = os.path.dirname(__file__), file_name: str = 'trace', file_format: str = 'csv') -> None:
+        """
+        :param file_format: 'csv' or 'json'
+        """
+        trace = self.to_dataframe()
+        if file_format == 'csv':
+            trace.to_csv(path + f'/{file_name}.csv', index=False)
+        elif file_format == 'json':
+            with open(path + f'/{file_name}.json', 'w') as file:
+                json.dump(trace.to_dict(orient='records'), file, indent=1)
+        else:
+            raise ValueError(f"Invalid format {file_format}. Expected 'csv' or 'json'.")
+
+    def export_profile(self, path: str = os.path.dirname(__file__), file_name: str = 'profile') -> None:
+        """
+        Write the profile of the time steps, {file_name}.prof (pstats) for cProfile, {file_name}.html for pyinstrument.
+        """
+        if self._profiler is None:
+            raise ValueError('No profiler, expected StepProfiler(profiler=...).')
+        if self._profiler_name == 'cprofile':
+            self._profiler.dump_stats(path + f'/{file_name}.prof')
+        else:
+            with open(path + f'/{file_name}.html', 'w') as file:
+                file.write(self._profiler.output_html())
@@ -27,6 +27,26 @@ def symmetrical_components(magnitudes, angles):
     return abs(V_0), abs(V_1), abs(V_2)
 
 
+def batch_symmetrical_components(magnitudes: np.ndarray, angles: np.ndarray):
+    """
+    Symmetrical components of n three-phase buses at once
+    :param magnitudes: (n x 3) voltage magnitudes, columns in phase order
+    :param angles: (n x 3) voltage angles in degrees
+    :return: V_0, V_1, V_2 magnitudes and the voltage unbalance factor 100 * V_2 / V_1 (%), each of length n
+    """
+    V = magnitudes * np.exp(1j * np.radians(angles))
+
+    # Rotation operator
+    a = np.exp(1j * 2 * np.pi / 3)  # e^(j120°)
+    a2 = a ** 2  # e^(j240°)
+
+    V_0 = np.abs((V[:, 0] + V[:, 1] + V[:, 2]) / 3)
+    V_1 = np.abs((V[:, 0] + a * V[:, 1] + a2 * V[:, 2]) / 3)
+    V_2 = np.abs((V[:, 0] + a2 * V[:, 1] + a * V[:, 2]) / 3)
+
+    return V_0, V_1, V_2, 100 * (V_2 / V_1)
+
+
 def create_time_series(start_time, end_time, step):
     series = []
     while not start_time == end_time:
@@ -36,255 +56,409 @@ def create_time_series(start_time, end_time, step):
     return series
 
 
-class classproperty:
+class defaultmethod:
+    """
+    Bind the method to the instance it is called on, or to the default instance when it is called on the class
+    """
+    def __init__(self, f):
+        self.f = f
+
+    def __get__(self, obj, cls):
+        return self.f.__get__(cls.default() if obj is None else obj, cls)
+
+
+class defaultproperty:
     def __init__(self, f):
         self.f = f
 
     def __get__(self, obj, cls):
-        # ignore 'obj', always call with the class
-        return self.f(cls)
-
-
-class Results:
-    VOLTAGE_UNBALANCE_HISTORY, TOTAL_LOSSES, TOTAL_POWER = None, None, None
-    VOLTAGE_HISTORY_A, VOLTAGE_HISTORY_B, VOLTAGE_HISTORY_C = None, None, None
-    INITIAL_VOLTAGES = None
-    POWER_HISTORY_A, POWER_HISTORY_B, POWER_HISTORY_C = None, None, None
-    RE_POWER_HISTORY_A, RE_POWER_HISTORY_B, RE_POWER_HISTORY_C = None, None, None
-    LINE_CURRENT_A, LINE_CURRENT_B, LINE_CURRENT_C, LINE_RATINGS_A, LINE_RATINGS_B, LINE_RATINGS_C = None, None, None, None, None, None
-    AC_CURTAILMENT_A, AC_CURTAILMENT_B, AC_CURTAILMENT_C, DC_CURTAILMENT_A, DC_CURTAILMENT_B, DC_CURTAILMENT_C = None, None, None, None, None, None
-    ENERGY_FLOWS = None
-    PV_DC_GENERATION, PV_INVERTER_POTENTIAL_OUTPUT, BATTERY_STORED_ENERGY, EV_STORED_ENERGY = None, None, None, None
-    PV_INVERTER_REACTIVE_POWER, PV_INVERTER_ACTIVE_POWER = None, None
-    EV_INVERTER_REACTIVE_POWER, EV_INVERTER_ACTIVE_POWER = None, None
-    METRICS = None
-    SIMULATION_TIME = None
-    STEP_SIZE = None
+        return self.f(cls.default() if obj is None else obj)
+
+
+class ColumnBuffer:
+    """
+    History of a set of elements preallocated as a (steps x elements) array, written one row per time step
+    """
+    def __init__(self, keys, steps: int):
+        self.keys = list(keys)
+        self.data = np.zeros((max(steps, 1), len(self.keys)))
+        self.steps = 0
+        self._view = None
+
+    def append(self, row) -> None:
+        if self.steps == self.data.shape[0]:
+            self.data = np.concatenate([self.data, np.zeros_like(self.data)])
+        self.data[self.steps] = row
+        self.steps += 1
+        self._view = None
+
+    @property
+    def rows(self) -> np.ndarray:
+        return self.data[:self.steps]
+
+    def as_dict(self) -> dict:
+        """
+        :return: {element: history} view of the written rows, the histories share memory with the buffer
+        """
+        if self._view is None:
+            self._view = {key: self.data[:self.steps, idx] for idx, key in enumerate(self.keys)}
+        return self._view
+
+
+class history:
+    """
+    Lazy {element: history} view of the ColumnBuffer with the same name, None before Results.initialise
+    """
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, cls):
+        obj = cls.default() if obj is None else obj
+        buffer = obj._buffers.get(self.name)
+        return None if buffer is None else buffer.as_dict()
+
+
+class _ResultsType(type):
+    # Class-level access to the histories (Results.VOLTAGE_HISTORY_A, ...) goes to the default instance
+    def __getattr__(cls, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(cls.default(), name)
+
+    def __setattr__(cls, name, value):
+        if name.isupper():
+            setattr(cls.default(), name, value)
+        else:
+            super().__setattr__(name, value)
+
+
+class Results(metaclass=_ResultsType):
+    """
+    Result histories of one simulation. Each Compiler writes to the instance it is given. The class-level API
+    (Results.initialise(...), Results.VOLTAGE_HISTORY_A, ...) is kept as a facade over a default instance.
+    """
+    _default = None
+
+    VOLTAGE_HISTORY_A, VOLTAGE_HISTORY_B, VOLTAGE_HISTORY_C = history(), history(), history()
+    VOLTAGE_UNBALANCE_HISTORY = history()
+    LINE_CURRENT_A, LINE_CURRENT_B, LINE_CURRENT_C = history(), history(), history()
+    AC_CURTAILMENT_A, AC_CURTAILMENT_B, AC_CURTAILMENT_C = history(), history(), history()
+    DC_CURTAILMENT_A, DC_CURTAILMENT_B, DC_CURTAILMENT_C = history(), history(), history()
+    PV_DC_GENERATION, PV_INVERTER_POTENTIAL_OUTPUT, BATTERY_STORED_ENERGY, EV_STORED_ENERGY = history(), history(), history(), history()
+    PV_INVERTER_REACTIVE_POWER, PV_INVERTER_ACTIVE_POWER = history(), history()
+    EV_INVERTER_REACTIVE_POWER, EV_INVERTER_ACTIVE_POWER = history(), history()
+
+    def __init__(self):
+        self.TIME_SERIES = None
+        self.TOTAL_LOSSES, self.TOTAL_POWER = None, None
+        self.POWER_HISTORY_A, self.POWER_HISTORY_B, self.POWER_HISTORY_C = None, None, None
+        self.RE_POWER_HISTORY_A, self.RE_POWER_HISTORY_B, self.RE_POWER_HISTORY_C = None, None, None
+        self.LINE_RATINGS_A, self.LINE_RATINGS_B, self.LINE_RATINGS_C = None, None, None
+        self.ENERGY_FLOWS = None
+        self.METRICS = None
+        self.SIMULATION_TIME = None
+        self.SETPOINT_WRITES, self.SETPOINT_WRITE_TIME = None, None
+        self.ITERATIONS = None
+        self.ACTIVE_SET_SIZES = None
+        self.RESIDUALS = None
+        self.POWER_FLOW_SOLVES = None
+        self.STEP_SIZE = None
+        self._line_ratings = None
+        self._vuf_nodes = None
+        # {history name: ColumnBuffer}, and the positions of the buffer elements in the circuit results (set on the first write)
+        self._buffers = {}
+        self._positions = {}
+        # Initial voltages, v_pu and v_angle buffered per time step, the node columns are set on the first write
+        self._initial_voltages = None
+        self._initial_voltages_nodes = None
+        self._initial_voltages_time = None
+
+    @classmethod
+    def default(cls):
+        """
+        :return: the instance the class-level API reads and writes, created on first use
+        """
+        if cls._default is None:
+            cls._default = cls()
+        return cls._default
 
     @classmethod
-    def initialise(cls, time_interval: [time, time, int], end_buses, lines_rating, pv_set, meters: {Meter}, ev_set=None, step_size=None):
+    def set_default(cls, results):
+        cls._default = results
+
+    @defaultmethod
+    def initialise(self, time_interval: [time, time, int], end_buses, lines_rating, pv_set, meters: {Meter}, ev_set=None, step_size=None):
         if ev_set is None:
             ev_set = {}
         if pv_set is None:
             pv_set = {}
         if meters is None:
             meters = {}
-        """Initialize class-level attributes based on `load_buses` and `lines_rating`."""
+        """Initialize the histories based on `load_buses` and `lines_rating`."""
         # Time Series
-        cls.TIME_SERIES = create_time_series(time_interval[0], time_interval[1], time_interval[2])
-        cls.SIMULATION_TIME = []
-        # Voltage histories
-        cls.VOLTAGE_HISTORY_A = {key: [] for key in end_buses if '.1' in key}
-        cls.VOLTAGE_HISTORY_B = {key: [] for key in end_buses if '.2' in key}
-        cls.VOLTAGE_HISTORY_C = {key: [] for key in end_buses if '.3' in key}
-        # Voltage unbalance history
-        cls.VOLTAGE_UNBALANCE_HISTORY = {bus.split('.')[0]: [] for bus in cls.VOLTAGE_HISTORY_A.keys()}
-        # Line currents
-        cls.LINE_RATINGS_A = {f"{line}.1": rating for line, rating in lines_rating.items()}
-        cls.LINE_RATINGS_B = {f"{line}.2": rating for line, rating in lines_rating.items()}
-        cls.LINE_RATINGS_C = {f"{line}.3": rating for line, rating in lines_rating.items()}
-        cls.LINE_CURRENT_A = {f"{line}.1": [] for line, rating in lines_rating.items()}
-        cls.LINE_CURRENT_B = {f"{line}.2": [] for line, rating in lines_rating.items()}
-        cls.LINE_CURRENT_C = {f"{line}.3": [] for line, rating in lines_rating.items()}
+        self.TIME_SERIES = create_time_series(time_interval[0], time_interval[1], time_interval[2])
+        self.SIMULATION_TIME = []
+        # CER setpoint writes to the circuit (number of load elements written and time spent, per time step)
+        self.SETPOINT_WRITES = []
+        self.SETPOINT_WRITE_TIME = []
+        # Convergence iterations per time step
+        self.ITERATIONS = []
+        # Number of CERs evaluated in each convergence iteration, per time step
+        self.ACTIVE_SET_SIZES = []
+        # Fixed-point residual (max |P/Q response - P/Q output| in kW/kvar) of each convergence iteration, per time step
+        self.RESIDUALS = []
+        # Power flows solved per time step
+        self.POWER_FLOW_SOLVES = []
+        steps = len(self.TIME_SERIES)
+        phases = {key: bus.split('.', 1)[1] for key, bus in pv_set.items() if '.' in bus}
+        histories = {
+            # Voltage histories
+            'VOLTAGE_HISTORY_A': list(dict.fromkeys(key for key in end_buses if '.1' in key)),
+            'VOLTAGE_HISTORY_B': list(dict.fromkeys(key for key in end_buses if '.2' in key)),
+            'VOLTAGE_HISTORY_C': list(dict.fromkeys(key for key in end_buses if '.3' in key)),
+            # Voltage unbalance history
+            'VOLTAGE_UNBALANCE_HISTORY': list(dict.fromkeys(key.split('.')[0] for key in end_buses if '.1' in key)),
+            # Line currents
+            'LINE_CURRENT_A': [f"{line}.1" for line in lines_rating.keys()],
+            'LINE_CURRENT_B': [f"{line}.2" for line in lines_rating.keys()],
+            'LINE_CURRENT_C': [f"{line}.3" for line in lines_rating.keys()],
+            # AC and DC Curtailment in kWh
+            'AC_CURTAILMENT_A': [key for key, phase in phases.items() if phase == '1'],
+            'AC_CURTAILMENT_B': [key for key, phase in phases.items() if phase == '2'],
+            'AC_CURTAILMENT_C': [key for key, phase in phases.items() if phase == '3'],
+            'DC_CURTAILMENT_A': [key for key, phase in phases.items() if phase == '1'],
+            'DC_CURTAILMENT_B': [key for key, phase in phases.items() if phase == '2'],
+            'DC_CURTAILMENT_C': [key for key, phase in phases.items() if phase == '3'],
+            'PV_DC_GENERATION': list(pv_set.keys()),
+            'PV_INVERTER_POTENTIAL_OUTPUT': list(pv_set.keys()),
+            'PV_INVERTER_REACTIVE_POWER': list(pv_set.keys()),
+            'PV_INVERTER_ACTIVE_POWER': list(pv_set.keys()),
+            'BATTERY_STORED_ENERGY': [key for key in pv_set.keys() if "hybridpv_" in key],
+            'EV_INVERTER_REACTIVE_POWER': list(ev_set.keys()),
+            'EV_INVERTER_ACTIVE_POWER': list(ev_set.keys()),
+            'EV_STORED_ENERGY': list(ev_set.keys())}
+        self._buffers = {name: ColumnBuffer(keys, steps) for name, keys in histories.items()}
+        self._positions = {}
+        # Phase nodes of the voltage unbalance buses, (buses x 3) in phase order
+        self._vuf_nodes = np.array([[f'{bus}.{phase}' for phase in ['1', '2', '3']] for bus in histories['VOLTAGE_UNBALANCE_HISTORY']],
+                                   dtype=object).reshape(-1, 3)
+        # Line ratings
+        self._line_ratings = dict(lines_rating)
+        self.LINE_RATINGS_A = {f"{line}.1": rating for line, rating in lines_rating.items()}
+        self.LINE_RATINGS_B = {f"{line}.2": rating for line, rating in lines_rating.items()}
+        self.LINE_RATINGS_C = {f"{line}.3": rating for line, rating in lines_rating.items()}
         # Total powers
-        cls.TOTAL_POWER = {'Active': [], 'Reactive': []}
-        cls.TOTAL_LOSSES = {'Active': [], 'Reactive': []}
-        # AC and DC Curtailment in kWh
-        cls.AC_CURTAILMENT_A = {key: [] for key, bus in pv_set.items() if '.' in bus and bus.split('.', 1)[1] == '1'}
-        cls.AC_CURTAILMENT_B = {key: [] for key, bus in pv_set.items() if '.' in bus and bus.split('.', 1)[1] == '2'}
-        cls.AC_CURTAILMENT_C = {key: [] for key, bus in pv_set.items() if '.' in bus and bus.split('.', 1)[1] == '3'}
-        cls.DC_CURTAILMENT_A = {key: [] for key, bus in pv_set.items() if '.' in bus and bus.split('.', 1)[1] == '1'}
-        cls.DC_CURTAILMENT_B = {key: [] for key, bus in pv_set.items() if '.' in bus and bus.split('.', 1)[1] == '2'}
-        cls.DC_CURTAILMENT_C = {key: [] for key, bus in pv_set.items() if '.' in bus and bus.split('.', 1)[1] == '3'}
+        self.TOTAL_POWER = {'Active': [], 'Reactive': []}
+        self.TOTAL_LOSSES = {'Active': [], 'Reactive': []}
         # Energy flows
-        cls.ENERGY_FLOWS = {label: meters[label].initialise_energy_flow_results() for label in meters.keys()}
-        # AC and DC Curtailment in kWh
-        cls.PV_DC_GENERATION = {key: [] for key in pv_set.keys()}
-        cls.PV_INVERTER_POTENTIAL_OUTPUT = {key: [] for key in pv_set.keys()}
-        cls.PV_INVERTER_REACTIVE_POWER = {key: [] for key in pv_set.keys()}
-        cls.PV_INVERTER_ACTIVE_POWER = {key: [] for key in pv_set.keys()}
-        cls.BATTERY_STORED_ENERGY = {key: [] for key in pv_set.keys() if "hybridpv_" in key}
-        cls.EV_INVERTER_REACTIVE_POWER = {key: [] for key in ev_set.keys()}
-        cls.EV_INVERTER_ACTIVE_POWER = {key: [] for key in ev_set.keys()}
-        cls.EV_STORED_ENERGY = {key: [] for key in ev_set.keys()}
+        self.ENERGY_FLOWS = {label: meters[label].initialise_energy_flow_results() for label in meters.keys()}
         # Metrics
-        cls.METRICS = {'Metric 1.a': [0], 'Metric 1.b': [0], 'Metric 2': [0], 'Metric 3': [0], 'Metric 4': [0], 'Metric 5.a': [0], 'Metric 5.b': [0]}
+        self.METRICS = {'Metric 1.a': [0], 'Metric 1.b': [0], 'Metric 2': [0], 'Metric 3': [0], 'Metric 4': [0], 'Metric 5.a': [0], 'Metric 5.b': [0]}
 
         # Initial voltages for OPF
-        cls.INITIAL_VOLTAGES = {'bus_i': [], 'phase_i': [], 'time': [], 'v_nom': [], 'v_pu': [], 'v_angle': []}
-
-        cls.STEP_SIZE = step_size
-
-    @classmethod
-    def update_buses_results(cls, bus_results: pd.DataFrame) -> None:
-        cls._update_bus_voltage_results(bus_results)
-        cls._update_voltage_unbalance_results(bus_results)
-
-    @classmethod
-    def update_initial_voltages_results(cls, bus_results: pd.DataFrame, time_stamp: float) -> None:
-        cls._update_initial_voltages_results(bus_results, time_stamp)
-
-    @classmethod
-    def update_lines_results(cls, line_results: pd.DataFrame) -> None:
-        cls._update_line_current_results(line_results)
-        # cls._update_losses_results(line_results)
-
-    @classmethod
-    def update_inverter_register_results(cls, ac_curtailment: dict, dc_curtailment: dict, dc_generation: dict, ac_potential_output: dict) -> None:
-        cls._update_ac_curtailment_results(ac_curtailment)
-        cls._update_dc_curtailment_results(dc_curtailment)
-        cls._update_dc_generation_results(dc_generation)
-        cls._update_ac_potential_output_results(ac_potential_output)
-
-    @classmethod
-    def update_battery_state_results(cls, battery_states: dict, ev_battery_state: dict):
-        cls._update_battery_state_results(battery_states)
-        cls._update_ev_battery_state_results(ev_battery_state)
-
-    @classmethod
-    def update_energy_flow_results(cls, energy_flow):
-        cls._update_energy_flow_results(energy_flow)
-
-    @classmethod
-    def _update_initial_voltages_results(cls, bus_results: pd.DataFrame, time_stamp: float) -> None:
+        self._initial_voltages = None
+        self._initial_voltages_nodes = None
+        self._initial_voltages_time = []
+
+        self.STEP_SIZE = step_size
+
+    @defaultmethod
+    def update_buses_results(self, bus_results: pd.DataFrame) -> None:
+        self._update_bus_voltage_results(bus_results)
+        self._update_voltage_unbalance_results(bus_results)
+
+    @defaultmethod
+    def update_initial_voltages_results(self, bus_results: pd.DataFrame, time_stamp: float) -> None:
+        self._update_initial_voltages_results(bus_results, time_stamp)
+
+    @defaultmethod
+    def update_lines_results(self, line_results: pd.DataFrame) -> None:
+        self._update_line_current_results(line_results)
+        # self._update_losses_results(line_results)
+
+    @defaultmethod
+    def update_inverter_register_results(self, ac_curtailment: dict, dc_curtailment: dict, dc_generation: dict, ac_potential_output: dict) -> None:
+        self._update_ac_curtailment_results(ac_curtailment)
+        self._update_dc_curtailment_results(dc_curtailment)
+        self._update_dc_generation_results(dc_generation)
+        self._update_ac_potential_output_results(ac_potential_output)
+
+    @defaultmethod
+    def update_battery_state_results(self, battery_states: dict, ev_battery_state: dict):
+        self._update_battery_state_results(battery_states)
+        self._update_ev_battery_state_results(ev_battery_state)
+
+    @defaultmethod
+    def update_energy_flow_results(self, energy_flow):
+        self._update_energy_flow_results(energy_flow)
+
+    @defaultmethod
+    def _update_initial_voltages_results(self, bus_results: pd.DataFrame, time_stamp: float) -> None:
         """Add voltage result to the appropriate history."""
-        bus_results_copy = bus_results.copy()
-        bus_results_copy = bus_results_copy.reset_index()
-        for bus_i, phase_i, v_nom, v_pu, v_angle in bus_results_copy[['bus_i', 'phase_i', 'v_base_ln', 'v_pu', 'angle']].values:
-            cls.INITIAL_VOLTAGES['bus_i'].append(bus_i)
-            cls.INITIAL_VOLTAGES['phase_i'].append(phase_i)
-            cls.INITIAL_VOLTAGES['v_nom'].append(v_nom)
-            cls.INITIAL_VOLTAGES['time'].append(time_stamp * cls.STEP_SIZE / 60)
-            cls.INITIAL_VOLTAGES['v_pu'].append(v_pu)
-            cls.INITIAL_VOLTAGES['v_angle'].append(radians(v_angle))
-
-    @classproperty
-    def initial_voltages(cls):
-        return pd.DataFrame(cls.INITIAL_VOLTAGES)
-
-    @classmethod
-    def update_simulation_time(cls, time_spent):
-        cls.SIMULATION_TIME.append(time_spent)
-
-    @classmethod
-    def _update_bus_voltage_results(cls, bus_results: pd.DataFrame) -> None:
+        if self._initial_voltages is None:
+            steps = len(self.TIME_SERIES)
+            self._initial_voltages_nodes = bus_results[['bus_i', 'phase_i', 'v_base_ln']].to_numpy()
+            self._initial_voltages = ColumnBuffer(range(len(bus_results)), steps), ColumnBuffer(range(len(bus_results)), steps)
+        v_pu, v_angle = self._initial_voltages
+        v_pu.append(bus_results['v_pu'].values)
+        v_angle.append(np.radians(bus_results['angle'].values))
+        self._initial_voltages_time.append(time_stamp * self.STEP_SIZE / 60)
+
+    @defaultproperty
+    def INITIAL_VOLTAGES(self):
+        """
+        :return: {column: values} of the initial voltages, one row per node and time step
+        """
+        if self._initial_voltages_time is None:
+            return None
+        columns = {'bus_i': [], 'phase_i': [], 'time': [], 'v_nom': [], 'v_pu': [], 'v_angle': []}
+        if self._initial_voltages is not None:
+            v_pu, v_angle = self._initial_voltages
+            steps = v_pu.steps
+            columns['bus_i'] = np.tile(self._initial_voltages_nodes[:, 0], steps)
+            columns['phase_i'] = np.tile(self._initial_voltages_nodes[:, 1], steps)
+            columns['time'] = np.repeat(self._initial_voltages_time, len(self._initial_voltages_nodes))
+            columns['v_nom'] = np.tile(self._initial_voltages_nodes[:, 2].astype(float), steps)
+            columns['v_pu'] = v_pu.rows.ravel()
+            columns['v_angle'] = v_angle.rows.ravel()
+        return columns
+
+    @defaultproperty
+    def initial_voltages(self):
+        return pd.DataFrame(self.INITIAL_VOLTAGES)
+
+    @defaultmethod
+    def update_simulation_time(self, time_spent):
+        self.SIMULATION_TIME.append(time_spent)
+
+    @defaultmethod
+    def update_setpoint_write_results(self, writes, time_spent):
+        self.SETPOINT_WRITES.append(writes)
+        self.SETPOINT_WRITE_TIME.append(time_spent)
+
+    @defaultmethod
+    def update_iteration_results(self, iterations, active_set_sizes=None, residuals=None, power_flow_solves=None):
+        self.ITERATIONS.append(iterations)
+        self.POWER_FLOW_SOLVES.append(power_flow_solves)
+        self.ACTIVE_SET_SIZES.append(active_set_sizes if active_set_sizes is not None else [])
+        self.RESIDUALS.append(residuals if residuals is not None else [])
+
+    def _element_positions(self, name: str, names, keys=None) -> np.ndarray:
+        """
+        :return: positions in `names` of the elements (or `keys`) of history `name`, looked up on the first write
+        """
+        if name not in self._positions:
+            keys = self._buffers[name].keys if keys is None else keys
+            positions = pd.Index(names).get_indexer(keys)
+            if (positions < 0).any():
+                raise KeyError([key for key, position in zip(keys, positions) if position < 0])
+            self._positions[name] = positions
+        return self._positions[name]
+
+    @staticmethod
+    def _names(results: pd.DataFrame):
+        return results.index if results.index.name == 'name' else results['name']
+
+    def _append(self, name: str, values: dict) -> None:
+        buffer = self._buffers[name]
+        buffer.append([values[key] for key in buffer.keys])
+
+    @defaultmethod
+    def _update_bus_voltage_results(self, bus_results: pd.DataFrame) -> None:
         """Add voltage result to the appropriate history."""
-        bus_results_copy = bus_results.copy()
-        bus_results_copy = bus_results_copy.reset_index()
-        bus_results_copy = bus_results_copy.set_index('name')
-        for bus in cls.VOLTAGE_HISTORY_A.keys():
-            cls.VOLTAGE_HISTORY_A[bus].append(bus_results_copy.loc[bus, 'v_pu'])
-        for bus in cls.VOLTAGE_HISTORY_B.keys():
-            cls.VOLTAGE_HISTORY_B[bus].append(bus_results_copy.loc[bus, 'v_pu'])
-        for bus in cls.VOLTAGE_HISTORY_C.keys():
-            cls.VOLTAGE_HISTORY_C[bus].append(bus_results_copy.loc[bus, 'v_pu'])
+        names = self._names(bus_results)
+        v_pu = bus_results['v_pu'].values
+        for name in ['VOLTAGE_HISTORY_A', 'VOLTAGE_HISTORY_B', 'VOLTAGE_HISTORY_C']:
+            self._buffers[name].append(v_pu[self._element_positions(name, names)])
 
-    @classmethod
-    def _update_voltage_unbalance_results(cls, bus_results: pd.DataFrame) -> None:
+    @defaultmethod
+    def _update_voltage_unbalance_results(self, bus_results: pd.DataFrame) -> None:
         """Add voltage result to the appropriate history."""
-        bus_results_copy = bus_results.copy()
-        bus_results_copy = bus_results_copy.reset_index()
-        # bus_results_copy = bus_results_copy.set_index('name')
-        for bus in cls.VOLTAGE_UNBALANCE_HISTORY.keys():
-            voltages = list((bus_results_copy[bus_results_copy['name'].str.split('.').str[0] == bus])['v_pu'].values)
-            angles = list((bus_results_copy[bus_results_copy['name'].str.split('.').str[0] == bus])['angle'].values)
-            _, V_1, V_2 = symmetrical_components(voltages, angles)
-            cls.VOLTAGE_UNBALANCE_HISTORY[bus].append(100 * (V_2 / V_1))
+        positions = self._element_positions('VOLTAGE_UNBALANCE_HISTORY', self._names(bus_results), self._vuf_nodes.ravel()).reshape(-1, 3)
+        _, _, _, vuf = batch_symmetrical_components(bus_results['v_pu'].values[positions], bus_results['angle'].values[positions])
+        self._buffers['VOLTAGE_UNBALANCE_HISTORY'].append(vuf)
 
-    @classmethod
-    def add_power_results(cls, bus, power):
+    @defaultmethod
+    def add_power_results(self, bus, power):
         """Add power result to the appropriate history."""
-        if bus in cls.POWER_HISTORY_A:
-            cls.POWER_HISTORY_A[bus].append(power)
-        elif bus in cls.POWER_HISTORY_B:
-            cls.POWER_HISTORY_B[bus].append(power)
-        elif bus in cls.POWER_HISTORY_C:
-            cls.POWER_HISTORY_C[bus].append(power)
-
-    @classmethod
-    def add_reactive_power_results(cls, bus, reactive_power):
+        if bus in self.POWER_HISTORY_A:
+            self.POWER_HISTORY_A[bus].append(power)
+        elif bus in self.POWER_HISTORY_B:
+            self.POWER_HISTORY_B[bus].append(power)
+        elif bus in self.POWER_HISTORY_C:
+            self.POWER_HISTORY_C[bus].append(power)
+
+    @defaultmethod
+    def add_reactive_power_results(self, bus, reactive_power):
         """Add reactive power result to the appropriate history."""
-        if bus in cls.RE_POWER_HISTORY_A:
-            cls.RE_POWER_HISTORY_A[bus].append(reactive_power)
-        elif bus in cls.RE_POWER_HISTORY_B:
-            cls.RE_POWER_HISTORY_B[bus].append(reactive_power)
-        elif bus in cls.RE_POWER_HISTORY_C:
-            cls.RE_POWER_HISTORY_C[bus].append(reactive_power)
-
-    @classmethod
-    def _update_line_current_results(cls, line_results: pd.DataFrame) -> None:
+        if bus in self.RE_POWER_HISTORY_A:
+            self.RE_POWER_HISTORY_A[bus].append(reactive_power)
+        elif bus in self.RE_POWER_HISTORY_B:
+            self.RE_POWER_HISTORY_B[bus].append(reactive_power)
+        elif bus in self.RE_POWER_HISTORY_C:
+            self.RE_POWER_HISTORY_C[bus].append(reactive_power)
+
+    @defaultmethod
+    def _update_line_current_results(self, line_results: pd.DataFrame) -> None:
         """Add line current result to the appropriate history."""
-        line_results_copy = line_results.copy()
-        line_results_copy = line_results_copy.reset_index()
-        lines = list(line_results_copy['name'].values)
-        line_results_copy = line_results_copy.set_index('name')
-        for line in lines:
-            cls.LINE_CURRENT_A[f"{line}.1"].append(100 * line_results_copy.loc[line, 'i_a'] / cls.LINE_RATINGS_A[f"{line}.1"])
-            cls.LINE_CURRENT_B[f"{line}.2"].append(100 * line_results_copy.loc[line, 'i_b'] / cls.LINE_RATINGS_B[f"{line}.2"])
-            cls.LINE_CURRENT_C[f"{line}.3"].append(100 * line_results_copy.loc[line, 'i_c'] / cls.LINE_RATINGS_C[f"{line}.3"])
-
-    # @classmethod
-    # def _update_losses_results(cls, line_results: pd.DataFrame) -> None:
+        positions = self._element_positions('LINE_CURRENT_A', self._names(line_results), list(self._line_ratings.keys()))
+        ratings = np.array(list(self._line_ratings.values()), dtype=float)
+        self._buffers['LINE_CURRENT_A'].append(100 * line_results['i_a'].values[positions] / ratings)
+        self._buffers['LINE_CURRENT_B'].append(100 * line_results['i_b'].values[positions] / ratings)
+        self._buffers['LINE_CURRENT_C'].append(100 * line_results['i_c'].values[positions] / ratings)
+
+    # @defaultmethod
+    # def _update_losses_results(self, line_results: pd.DataFrame) -> None:
     #     """Add line current result to the appropriate history."""
     #     line_results_copy = line_results.copy()
     #     line_results_copy = line_results_copy.reset_index()
     #     line_results_copy = line_results_copy.set_index('name')
-    #     cls.TOTAL_LOSSES['Active'] += line_results_copy['losses_active'].sum() * cls.STEP_SIZE / 60
-    #     cls.TOTAL_LOSSES['Reactive'] += line_results_copy['losses_reactive'].sum() * cls.STEP_SIZE / 60
+    #     self.TOTAL_LOSSES['Active'] += line_results_copy['losses_active'].sum() * self.STEP_SIZE / 60
+    #     self.TOTAL_LOSSES['Reactive'] += line_results_copy['losses_reactive'].sum() * self.STEP_SIZE / 60
 
-    @classmethod
-    def _update_ac_curtailment_results(cls, ac_curtailment: dict) -> None:
+    @defaultmethod
+    def _update_ac_curtailment_results(self, ac_curtailment: dict) -> None:
         """Add voltage result to the appropriate history."""
-        for pv in cls.AC_CURTAILMENT_A.keys():
-            cls.AC_CURTAILMENT_A[pv].append(ac_curtailment[pv])
-        for pv in cls.AC_CURTAILMENT_B.keys():
-            cls.AC_CURTAILMENT_B[pv].append(ac_curtailment[pv])
-        for pv in cls.AC_CURTAILMENT_C.keys():
-            cls.AC_CURTAILMENT_C[pv].append(ac_curtailment[pv])
+        self._append('AC_CURTAILMENT_A', ac_curtailment)
+        self._append('AC_CURTAILMENT_B', ac_curtailment)
+        self._append('AC_CURTAILMENT_C', ac_curtailment)
 
-    @classmethod
-    def _update_dc_curtailment_results(cls, dc_curtailment: dict) -> None:
+    @defaultmethod
+    def _update_dc_curtailment_results(self, dc_curtailment: dict) -> None:
         """Add voltage result to the appropriate history."""
-        for pv in cls.DC_CURTAILMENT_A.keys():
-            cls.DC_CURTAILMENT_A[pv].append(dc_curtailment[pv])
-        for pv in cls.DC_CURTAILMENT_B.keys():
-            cls.DC_CURTAILMENT_B[pv].append(dc_curtailment[pv])
-        for pv in cls.DC_CURTAILMENT_C.keys():
-            cls.DC_CURTAILMENT_C[pv].append(dc_curtailment[pv])
+        self._append('DC_CURTAILMENT_A', dc_curtailment)
+        self._append('DC_CURTAILMENT_B', dc_curtailment)
+        self._append('DC_CURTAILMENT_C', dc_curtailment)
 
-    @classmethod
-    def _update_dc_generation_results(cls, dc_generation: dict) -> None:
+    @defaultmethod
+    def _update_dc_generation_results(self, dc_generation: dict) -> None:
         """Add dc generation result to the appropriate history."""
-        for pv in cls.PV_DC_GENERATION.keys():
-            cls.PV_DC_GENERATION[pv].append(dc_generation[pv])
+        self._append('PV_DC_GENERATION', dc_generation)
 
-    @classmethod
-    def _update_ac_potential_output_results(cls, ac_potential_output):
+    @defaultmethod
+    def _update_ac_potential_output_results(self, ac_potential_output):
         """Add dc generation result to the appropriate history."""
-        for pv in cls.PV_INVERTER_POTENTIAL_OUTPUT.keys():
-            cls.PV_INVERTER_POTENTIAL_OUTPUT[pv].append(ac_potential_output[pv])
+        self._append('PV_INVERTER_POTENTIAL_OUTPUT', ac_potential_output)
 
-    @classmethod
-    def _update_battery_state_results(cls, battery_states: dict) -> None:
+    @defaultmethod
+    def _update_battery_state_results(self, battery_states: dict) -> None:
         """Add battery energy result to the appropriate history."""
-        for pv in cls.BATTERY_STORED_ENERGY.keys():
-            cls.BATTERY_STORED_ENERGY[pv].append(battery_states[pv])
+        self._append('BATTERY_STORED_ENERGY', battery_states)
 
-    @classmethod
-    def _update_ev_battery_state_results(cls, ev_battery_states: dict) -> None:
+    @defaultmethod
+    def _update_ev_battery_state_results(self, ev_battery_states: dict) -> None:
         """Add ev battery energy result to the appropriate history."""
-        for ev in cls.EV_STORED_ENERGY.keys():
-            cls.EV_STORED_ENERGY[ev].append(ev_battery_states[ev])
+        self._append('EV_STORED_ENERGY', ev_battery_states)
 
-    @classmethod
-    def _update_energy_flow_results(cls, energy_flow: dict) -> None:
+    @defaultmethod
+    def _update_energy_flow_results(self, energy_flow: dict) -> None:
         """Add energy flow result to the appropriate history."""
         for label in energy_flow.keys():
             for category in energy_flow[label]:
-                cls.ENERGY_FLOWS[label][category].append(energy_flow[label][category])
+                self.ENERGY_FLOWS[label][category].append(energy_flow[label][category])
 
-    @classmethod
-    def export_energy_flow_results(cls, path: str = os.path.dirname(__file__), file_name: str = "energy_flows") -> None:
+    @defaultmethod
+    def export_energy_flow_results(self, path: str = os.path.dirname(__file__), file_name: str = "energy_flows") -> None:
         """
         Export energy flow results to an Excel file, with each label in a separate sheet.
 
@@ -292,7 +466,7 @@ class Results:
             filename (str): Name of the output Excel file.
         """
         with pd.ExcelWriter(path + f'/{file_name}.xlsx', engine='openpyxl') as writer:
-            for label, data_dict in cls.ENERGY_FLOWS.items():
+            for label, data_dict in self.ENERGY_FLOWS.items():
                 # Convert the dictionary of lists to a DataFrame
                 df = pd.DataFrame(data_dict)
                 # Convert label to a string and truncate to 31 characters (Excel limit)
@@ -301,86 +475,93 @@ class Results:
                 # Write the DataFrame to a sheet named after the label
                 df.to_excel(writer, sheet_name=sheet_name, index=False)
 
-    @classmethod
-    def export_summary_results(cls, path: str = os.path.dirname(__file__), file_name: str = 'summary') -> None:
-        DC_CURTAILMENT = cls.DC_CURTAILMENT_A | cls.DC_CURTAILMENT_B | cls.DC_CURTAILMENT_C
-        AC_CURTAILMENT = cls.AC_CURTAILMENT_A | cls.AC_CURTAILMENT_B | cls.AC_CURTAILMENT_C
-        summary = {'PV dc-generation (kWh)': sum([sum(cls.PV_DC_GENERATION[key]) for key in cls.PV_DC_GENERATION.keys()]) * cls.STEP_SIZE / 60,
-                   'Battery stored energy (kWh)': sum([cls.BATTERY_STORED_ENERGY[key][-1] for key in cls.BATTERY_STORED_ENERGY.keys()]),
-                   'EV stored energy (kWh)': sum([cls.EV_STORED_ENERGY[key][-1] for key in cls.EV_STORED_ENERGY.keys()]),
-                   'Potential inverter ac output (kWh)': sum([sum(cls.PV_INVERTER_POTENTIAL_OUTPUT[key]) for key in cls.PV_INVERTER_POTENTIAL_OUTPUT.keys()]) * cls.STEP_SIZE / 60,
-                   'Actual inverter ac output (kWh)': sum([sum(cls.ENERGY_FLOWS[key].get('Inverter Power (kW)', [])) for key in cls.ENERGY_FLOWS.keys()]) * cls.STEP_SIZE / 60,
-                   'Total pv to battery (kWh)': sum([sum(cls.ENERGY_FLOWS[key].get('Inverter to Battery (kW)', [])) for key in cls.ENERGY_FLOWS.keys()]) * cls.STEP_SIZE / 60,
-                   'Total inverter to load (kWh)': sum([sum(cls.ENERGY_FLOWS[key].get('Inverter to Load (kW)', [])) for key in cls.ENERGY_FLOWS.keys()]) * cls.STEP_SIZE / 60,
-                   'Total inverter to ev (kWh)': sum([sum(cls.ENERGY_FLOWS[key].get('Inverter to EV (kW)', [])) for key in cls.ENERGY_FLOWS.keys()]) * cls.STEP_SIZE / 60,
-                   'Total inverter to grid (kWh)': sum([sum(cls.ENERGY_FLOWS[key].get('Inverter to Grid (kW)', [])) for key in cls.ENERGY_FLOWS.keys()]) * cls.STEP_SIZE / 60,
-                   'Total ev to load (kWh)': sum([sum(cls.ENERGY_FLOWS[key].get('EV to Load (kW)', [])) for key in cls.ENERGY_FLOWS.keys()]) * cls.STEP_SIZE / 60,
-                   'Total ev to grid (kWh)': sum([sum(cls.ENERGY_FLOWS[key].get('EV to Grid (kW)', [])) for key in cls.ENERGY_FLOWS.keys()]) * cls.STEP_SIZE / 60,
-                   'Total grid to load (kWh)': sum([sum(cls.ENERGY_FLOWS[key].get('Grid to Load (kW)', [])) for key in cls.ENERGY_FLOWS.keys()]) * cls.STEP_SIZE / 60,
-                   'Total grid to ev (kWh)': sum([sum(cls.ENERGY_FLOWS[key].get('Grid to EV (kW)', [])) for key in cls.ENERGY_FLOWS.keys()]) * cls.STEP_SIZE / 60,
-                   'Total dc curtailment (kWh)': sum([sum(DC_CURTAILMENT[key]) for key in DC_CURTAILMENT.keys()]) * cls.STEP_SIZE / 60,
-                   'Total ac curtailment (kWh)': sum([sum(AC_CURTAILMENT[key]) for key in AC_CURTAILMENT.keys()]) * cls.STEP_SIZE / 60,
+    @defaultmethod
+    def export_summary_results(self, path: str = os.path.dirname(__file__), file_name: str = 'summary') -> None:
+        summary = self.summary_results()
+        with open(path + f'/{file_name}.csv', mode="w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(summary.keys())  # Write the header row
+            writer.writerow(summary.values())
+
+    @defaultmethod
+    def summary_results(self) -> dict:
+        DC_CURTAILMENT = self.DC_CURTAILMENT_A | self.DC_CURTAILMENT_B | self.DC_CURTAILMENT_C
+        AC_CURTAILMENT = self.AC_CURTAILMENT_A | self.AC_CURTAILMENT_B | self.AC_CURTAILMENT_C
+        summary = {'PV dc-generation (kWh)': sum([sum(self.PV_DC_GENERATION[key]) for key in self.PV_DC_GENERATION.keys()]) * self.STEP_SIZE / 60,
+                   'Battery stored energy (kWh)': sum([self.BATTERY_STORED_ENERGY[key][-1] for key in self.BATTERY_STORED_ENERGY.keys()]),
+                   'EV stored energy (kWh)': sum([self.EV_STORED_ENERGY[key][-1] for key in self.EV_STORED_ENERGY.keys()]),
+                   'Potential inverter ac output (kWh)': sum([sum(self.PV_INVERTER_POTENTIAL_OUTPUT[key]) for key in self.PV_INVERTER_POTENTIAL_OUTPUT.keys()]) * self.STEP_SIZE / 60,
+                   'Actual inverter ac output (kWh)': sum([sum(self.ENERGY_FLOWS[key].get('Inverter Power (kW)', [])) for key in self.ENERGY_FLOWS.keys()]) * self.STEP_SIZE / 60,
+                   'Total pv to battery (kWh)': sum([sum(self.ENERGY_FLOWS[key].get('Inverter to Battery (kW)', [])) for key in self.ENERGY_FLOWS.keys()]) * self.STEP_SIZE / 60,
+                   'Total inverter to load (kWh)': sum([sum(self.ENERGY_FLOWS[key].get('Inverter to Load (kW)', [])) for key in self.ENERGY_FLOWS.keys()]) * self.STEP_SIZE / 60,
+                   'Total inverter to ev (kWh)': sum([sum(self.ENERGY_FLOWS[key].get('Inverter to EV (kW)', [])) for key in self.ENERGY_FLOWS.keys()]) * self.STEP_SIZE / 60,
+                   'Total inverter to grid (kWh)': sum([sum(self.ENERGY_FLOWS[key].get('Inverter to Grid (kW)', [])) for key in self.ENERGY_FLOWS.keys()]) * self.STEP_SIZE / 60,
+                   'Total ev to load (kWh)': sum([sum(self.ENERGY_FLOWS[key].get('EV to Load (kW)', [])) for key in self.ENERGY_FLOWS.keys()]) * self.STEP_SIZE / 60,
+                   'Total ev to grid (kWh)': sum([sum(self.ENERGY_FLOWS[key].get('EV to Grid (kW)', [])) for key in self.ENERGY_FLOWS.keys()]) * self.STEP_SIZE / 60,
+                   'Total grid to load (kWh)': sum([sum(self.ENERGY_FLOWS[key].get('Grid to Load (kW)', [])) for key in self.ENERGY_FLOWS.keys()]) * self.STEP_SIZE / 60,
+                   'Total grid to ev (kWh)': sum([sum(self.ENERGY_FLOWS[key].get('Grid to EV (kW)', [])) for key in self.ENERGY_FLOWS.keys()]) * self.STEP_SIZE / 60,
+                   'Total dc curtailment (kWh)': sum([sum(DC_CURTAILMENT[key]) for key in DC_CURTAILMENT.keys()]) * self.STEP_SIZE / 60,
+                   'Total ac curtailment (kWh)': sum([sum(AC_CURTAILMENT[key]) for key in AC_CURTAILMENT.keys()]) * self.STEP_SIZE / 60,
                    'Total curtailment (kWh)': 0,
                    'Total dc curtailment (%)': 0,
                    'Total ac curtailment (%)': 0,
                    'Total curtailment (%)': 0,
-                   'Fairness Index (%)': cls.system_fairness_index() * 100,
-                   'Active System Losses (kWh)': sum(cls.TOTAL_LOSSES['Active']) * cls.STEP_SIZE / 60,
-                   'Reactive System Losses (kVArh)': sum(cls.TOTAL_LOSSES['Reactive']) * cls.STEP_SIZE / 60,
-                   'Simulation Time (Sec)': sum(cls.SIMULATION_TIME) / len(cls.SIMULATION_TIME)}
+                   'Fairness Index (%)': self.system_fairness_index() * 100,
+                   'Active System Losses (kWh)': sum(self.TOTAL_LOSSES['Active']) * self.STEP_SIZE / 60,
+                   'Reactive System Losses (kVArh)': sum(self.TOTAL_LOSSES['Reactive']) * self.STEP_SIZE / 60,
+                   'Simulation Time (Sec)': sum(self.SIMULATION_TIME) / len(self.SIMULATION_TIME),
+                   'Setpoint Writes per Step': sum(self.SETPOINT_WRITES) / len(self.SETPOINT_WRITES) if self.SETPOINT_WRITES else 0,
+                   'Setpoint Write Time per Step (Sec)': sum(self.SETPOINT_WRITE_TIME) / len(self.SETPOINT_WRITE_TIME) if self.SETPOINT_WRITE_TIME else 0,
+                   'Iterations per Step': sum(self.ITERATIONS) / len(self.ITERATIONS) if self.ITERATIONS else 0,
+                   'Power Flow Solves per Step': sum(self.POWER_FLOW_SOLVES) / len(self.POWER_FLOW_SOLVES) if self.POWER_FLOW_SOLVES else 0,
+                   'Active CERs per Iteration': (sum(sum(sizes) for sizes in self.ACTIVE_SET_SIZES) / sum(len(sizes) for sizes in self.ACTIVE_SET_SIZES)
+                                                 if any(self.ACTIVE_SET_SIZES) else 0)}
         summary['Total curtailment (kWh)'] = summary['Total ac curtailment (kWh)'] + summary['Total dc curtailment (kWh)']
         summary['Total dc curtailment (%)'] = 100 * summary['Total dc curtailment (kWh)'] / summary['PV dc-generation (kWh)']
         summary['Total ac curtailment (%)'] = 100 * summary['Total ac curtailment (kWh)'] / summary['Potential inverter ac output (kWh)']
         summary['Total curtailment (%)'] = 100 * summary['Total curtailment (kWh)'] / summary['PV dc-generation (kWh)']
-        with open(path + f'/{file_name}.csv', mode="w", newline="") as file:
-            writer = csv.writer(file)
-            writer.writerow(summary.keys())  # Write the header row
-            writer.writerow(summary.values())
+        return summary
 
-    @classmethod
-    def system_fairness_index(cls):
+    @defaultmethod
+    def system_fairness_index(self):
         ratios = []
-        for key, potential in cls.PV_INVERTER_POTENTIAL_OUTPUT.items():
+        for key, potential in self.PV_INVERTER_POTENTIAL_OUTPUT.items():
             idx = int(key.split('_')[1])
-            flows = cls.ENERGY_FLOWS[idx].get("Inverter Power (kW)", [])
+            flows = self.ENERGY_FLOWS[idx].get("Inverter Power (kW)", [])
             total = sum(flows)
             ratio = total / sum(potential) if sum(potential) != 0 else np.nan
             ratios.append(ratio)
         return 1 - np.std(ratios) / 0.5
 
-    @classmethod
-    def _update_pv_reactive_power_results(cls, reactive_power: dict) -> None:
+    @defaultmethod
+    def _update_pv_reactive_power_results(self, reactive_power: dict) -> None:
         """Add dc generation result to the appropriate history."""
-        for pv in cls.PV_INVERTER_REACTIVE_POWER.keys():
-            cls.PV_INVERTER_REACTIVE_POWER[pv].append(reactive_power[pv])
+        self._append('PV_INVERTER_REACTIVE_POWER', reactive_power)
 
-    @classmethod
-    def _update_pv_active_power_results(cls, active_power: dict) -> None:
+    @defaultmethod
+    def _update_pv_active_power_results(self, active_power: dict) -> None:
         """Add dc generation result to the appropriate history."""
-        for pv in cls.PV_INVERTER_ACTIVE_POWER.keys():
-            cls.PV_INVERTER_ACTIVE_POWER[pv].append(active_power[pv])
+        self._append('PV_INVERTER_ACTIVE_POWER', active_power)
 
-    @classmethod
-    def _update_ev_reactive_power_results(cls, reactive_power: dict) -> None:
+    @defaultmethod
+    def _update_ev_reactive_power_results(self, reactive_power: dict) -> None:
         """Add dc generation result to the appropriate history."""
-        for ev in cls.EV_INVERTER_REACTIVE_POWER.keys():
-            cls.EV_INVERTER_REACTIVE_POWER[ev].append(reactive_power[ev])
+        self._append('EV_INVERTER_REACTIVE_POWER', reactive_power)
 
-    @classmethod
-    def _update_ev_active_power_results(cls, active_power: dict) -> None:
+    @defaultmethod
+    def _update_ev_active_power_results(self, active_power: dict) -> None:
         """Add dc generation result to the appropriate history."""
-        for ev in cls.EV_INVERTER_ACTIVE_POWER.keys():
-            cls.EV_INVERTER_ACTIVE_POWER[ev].append(active_power[ev])
+        self._append('EV_INVERTER_ACTIVE_POWER', active_power)
 
-    @classmethod
-    def export_reactive_power_results(cls, path: str = os.path.dirname(__file__), file_name: str = "reactive_power") -> None:
+    @defaultmethod
+    def export_reactive_power_results(self, path: str = os.path.dirname(__file__), file_name: str = "reactive_power") -> None:
         """
         Export energy flow results to an Excel file, with each label in a separate sheet.
 
         Args:
             filename (str): Name of the output Excel file.
         """
-        data = cls.PV_INVERTER_REACTIVE_POWER | cls.EV_INVERTER_REACTIVE_POWER
+        data = self.PV_INVERTER_REACTIVE_POWER | self.EV_INVERTER_REACTIVE_POWER
 
         with open(path + f"/{file_name}.csv", mode="w", newline="") as file:
             writer = csv.writer(file)
@@ -388,17 +569,17 @@ class Results:
             for row in zip(*data.values()):
                 writer.writerow(row)
 
-    @classmethod
-    def export_metrics(cls, path: str = os.path.dirname(__file__), file_name: str = "metrics") -> None:
+    @defaultmethod
+    def export_metrics(self, path: str = os.path.dirname(__file__), file_name: str = "metrics") -> None:
         """
         Export energy flow results to an Excel file, with each label in a separate sheet.
 
         Args:
             filename (str): Name of the output Excel file.
         """
-        # cls._update_metrics()
-        data = cls.METRICS
-        cls._update_metrics()
+        # self._update_metrics()
+        data = self.METRICS
+        self._update_metrics()
         print(data)
         header = list(data.keys())
         rows = list(zip(*data.values()))
@@ -408,79 +589,79 @@ class Results:
             writer.writerow(header)
             writer.writerows(rows)
 
-    @classmethod
-    def _update_metrics(cls):
-        Steps_No = 24 / (cls.STEP_SIZE / 60)
-        DC_CURTAILMENT = cls.DC_CURTAILMENT_A | cls.DC_CURTAILMENT_B | cls.DC_CURTAILMENT_C
-        AC_CURTAILMENT = cls.AC_CURTAILMENT_A | cls.AC_CURTAILMENT_B | cls.AC_CURTAILMENT_C
-        VOLTAGES = cls.VOLTAGE_HISTORY_A | cls.VOLTAGE_HISTORY_B | cls.VOLTAGE_HISTORY_C
+    @defaultmethod
+    def _update_metrics(self):
+        Steps_No = 24 / (self.STEP_SIZE / 60)
+        DC_CURTAILMENT = self.DC_CURTAILMENT_A | self.DC_CURTAILMENT_B | self.DC_CURTAILMENT_C
+        AC_CURTAILMENT = self.AC_CURTAILMENT_A | self.AC_CURTAILMENT_B | self.AC_CURTAILMENT_C
+        VOLTAGES = self.VOLTAGE_HISTORY_A | self.VOLTAGE_HISTORY_B | self.VOLTAGE_HISTORY_C
         Nodes_No = len(list(VOLTAGES.keys()))
-        CURRENTS = cls.LINE_CURRENT_A | cls.LINE_CURRENT_B | cls.LINE_CURRENT_C
+        CURRENTS = self.LINE_CURRENT_A | self.LINE_CURRENT_B | self.LINE_CURRENT_C
         Lines_No = len(list(CURRENTS.keys()))
-        Buses_No = len(list(cls.VOLTAGE_UNBALANCE_HISTORY.keys()))
+        Buses_No = len(list(self.VOLTAGE_UNBALANCE_HISTORY.keys()))
         try:
-            cls.METRICS['Metric 1.a'] = [
-                100 * sum([sum(DC_CURTAILMENT[key]) for key in DC_CURTAILMENT.keys()]) / sum([sum(cls.PV_DC_GENERATION[key]) for key in cls.PV_DC_GENERATION.keys()])]
-            cls.METRICS['Metric 1.b'] = [100 * sum([sum(AC_CURTAILMENT[key]) for key in AC_CURTAILMENT.keys()]) / sum(
-                [sum(cls.PV_INVERTER_POTENTIAL_OUTPUT[key]) for key in cls.PV_INVERTER_POTENTIAL_OUTPUT.keys()])]
+            self.METRICS['Metric 1.a'] = [
+                100 * sum([sum(DC_CURTAILMENT[key]) for key in DC_CURTAILMENT.keys()]) / sum([sum(self.PV_DC_GENERATION[key]) for key in self.PV_DC_GENERATION.keys()])]
+            self.METRICS['Metric 1.b'] = [100 * sum([sum(AC_CURTAILMENT[key]) for key in AC_CURTAILMENT.keys()]) / sum(
+                [sum(self.PV_INVERTER_POTENTIAL_OUTPUT[key]) for key in self.PV_INVERTER_POTENTIAL_OUTPUT.keys()])]
         except:
-            cls.METRICS['Metric 1.a'] = [0]
-            cls.METRICS['Metric 1.b'] = [0]
-        cls.METRICS['Metric 2'] = [100 * sum(sum(1 for v in VOLTAGES[key] if v > 1.1 or v < 0.9) for key in VOLTAGES.keys()) / (Steps_No * Nodes_No)]
-        cls.METRICS['Metric 3'] = [100 * sum(sum(1 for i in CURRENTS[key] if i > 100) for key in CURRENTS.keys()) / (Steps_No * Lines_No)]
-        cls.METRICS['Metric 4'] = [
-            100 * sum(sum(1 for vuf in cls.VOLTAGE_UNBALANCE_HISTORY[key] if vuf > 2) for key in cls.VOLTAGE_UNBALANCE_HISTORY.keys()) / (Steps_No * Buses_No)]
-        cls.METRICS['Metric 5.a'] = [100 * sum(cls.TOTAL_LOSSES['Active']) / sum(np.abs(np.array(cls.TOTAL_POWER['Active'])))]
-        cls.METRICS['Metric 5.b'] = [100 * sum(cls.TOTAL_LOSSES['Reactive']) / sum(np.abs(np.array(cls.TOTAL_POWER['Reactive'])))]
-
-    @classmethod
-    def export_voltages(cls, path: str = os.path.dirname(__file__), file_name: str = "voltages") -> None:
+            self.METRICS['Metric 1.a'] = [0]
+            self.METRICS['Metric 1.b'] = [0]
+        self.METRICS['Metric 2'] = [100 * sum(sum(1 for v in VOLTAGES[key] if v > 1.1 or v < 0.9) for key in VOLTAGES.keys()) / (Steps_No * Nodes_No)]
+        self.METRICS['Metric 3'] = [100 * sum(sum(1 for i in CURRENTS[key] if i > 100) for key in CURRENTS.keys()) / (Steps_No * Lines_No)]
+        self.METRICS['Metric 4'] = [
+            100 * sum(sum(1 for vuf in self.VOLTAGE_UNBALANCE_HISTORY[key] if vuf > 2) for key in self.VOLTAGE_UNBALANCE_HISTORY.keys()) / (Steps_No * Buses_No)]
+        self.METRICS['Metric 5.a'] = [100 * sum(self.TOTAL_LOSSES['Active']) / sum(np.abs(np.array(self.TOTAL_POWER['Active'])))]
+        self.METRICS['Metric 5.b'] = [100 * sum(self.TOTAL_LOSSES['Reactive']) / sum(np.abs(np.array(self.TOTAL_POWER['Reactive'])))]
+
+    @defaultmethod
+    def export_voltages(self, path: str = os.path.dirname(__file__), file_name: str = "voltages") -> None:
         """Export voltage histories for all phases and buses to CSV"""
-        combined_voltages = cls.VOLTAGE_HISTORY_A | cls.VOLTAGE_HISTORY_B | cls.VOLTAGE_HISTORY_C
+        combined_voltages = self.VOLTAGE_HISTORY_A | self.VOLTAGE_HISTORY_B | self.VOLTAGE_HISTORY_C
         df = pd.DataFrame(combined_voltages)
-        df.insert(0, "Time", cls.TIME_SERIES)
+        df.insert(0, "Time", self.TIME_SERIES)
         df.to_csv(os.path.join(path, f"{file_name}.csv"), index=False)
 
-    @classmethod
-    def export_line_currents(cls, path: str = os.path.dirname(__file__), file_name: str = "line_currents") -> None:
+    @defaultmethod
+    def export_line_currents(self, path: str = os.path.dirname(__file__), file_name: str = "line_currents") -> None:
         """Export line current histories for all phases to CSV"""
-        combined_currents = cls.LINE_CURRENT_A | cls.LINE_CURRENT_B | cls.LINE_CURRENT_C
+        combined_currents = self.LINE_CURRENT_A | self.LINE_CURRENT_B | self.LINE_CURRENT_C
         df = pd.DataFrame(combined_currents)
-        df.insert(0, "Time", cls.TIME_SERIES)
+        df.insert(0, "Time", self.TIME_SERIES)
         df.to_csv(os.path.join(path, f"{file_name}.csv"), index=False)
 
-    @classmethod
-    def export_voltage_unbalance(cls, path: str = os.path.dirname(__file__), file_name: str = "voltage_unbalance") -> None:
+    @defaultmethod
+    def export_voltage_unbalance(self, path: str = os.path.dirname(__file__), file_name: str = "voltage_unbalance") -> None:
         """Export voltage unbalance history to CSV"""
-        df = pd.DataFrame(cls.VOLTAGE_UNBALANCE_HISTORY)
-        df.insert(0, "Time", cls.TIME_SERIES)
+        df = pd.DataFrame(self.VOLTAGE_UNBALANCE_HISTORY)
+        df.insert(0, "Time", self.TIME_SERIES)
         df.to_csv(os.path.join(path, f"{file_name}.csv"), index=False)
 
-    @classmethod
-    def export_ac_curtailment(cls, path: str = os.path.dirname(__file__), file_name: str = "ac_curtailment") -> None:
+    @defaultmethod
+    def export_ac_curtailment(self, path: str = os.path.dirname(__file__), file_name: str = "ac_curtailment") -> None:
         """Export line current histories for all phases to CSV"""
-        ac_curtailment_a = {k + '.1': v for k, v in cls.AC_CURTAILMENT_A.items()}
-        ac_curtailment_b = {k + '.2': v for k, v in cls.AC_CURTAILMENT_B.items()}
-        ac_curtailment_c = {k + '.3': v for k, v in cls.AC_CURTAILMENT_C.items()}
+        ac_curtailment_a = {k + '.1': v for k, v in self.AC_CURTAILMENT_A.items()}
+        ac_curtailment_b = {k + '.2': v for k, v in self.AC_CURTAILMENT_B.items()}
+        ac_curtailment_c = {k + '.3': v for k, v in self.AC_CURTAILMENT_C.items()}
         combined_curtailment = ac_curtailment_a | ac_curtailment_b | ac_curtailment_c
         df = pd.DataFrame(combined_curtailment)
-        df.insert(0, "Time", cls.TIME_SERIES)
+        df.insert(0, "Time", self.TIME_SERIES)
         df.to_csv(os.path.join(path, f"{file_name}.csv"), index=False)
 
-    @classmethod
-    def export_dc_curtailment(cls, path: str = os.path.dirname(__file__), file_name: str = "dc_curtailment") -> None:
+    @defaultmethod
+    def export_dc_curtailment(self, path: str = os.path.dirname(__file__), file_name: str = "dc_curtailment") -> None:
         """Export line current histories for all phases to CSV"""
-        dc_curtailment_a = {k + '.1': v for k, v in cls.DC_CURTAILMENT_A.items()}
-        dc_curtailment_b = {k + '.2': v for k, v in cls.DC_CURTAILMENT_B.items()}
-        dc_curtailment_c = {k + '.3': v for k, v in cls.DC_CURTAILMENT_C.items()}
+        dc_curtailment_a = {k + '.1': v for k, v in self.DC_CURTAILMENT_A.items()}
+        dc_curtailment_b = {k + '.2': v for k, v in self.DC_CURTAILMENT_B.items()}
+        dc_curtailment_c = {k + '.3': v for k, v in self.DC_CURTAILMENT_C.items()}
         combined_curtailment = dc_curtailment_a | dc_curtailment_b | dc_curtailment_c
         df = pd.DataFrame(combined_curtailment)
-        df.insert(0, "Time", cls.TIME_SERIES)
+        df.insert(0, "Time", self.TIME_SERIES)
         df.to_csv(os.path.join(path, f"{file_name}.csv"), index=False)
 
-    @classmethod
-    def update_total_powers(cls, active_power, reactive_power, active_losses, reactive_losses):
-        cls.TOTAL_POWER['Active'].append(active_power)
-        cls.TOTAL_POWER['Reactive'].append(reactive_power)
-        cls.TOTAL_LOSSES['Active'].append(active_losses)
-        cls.TOTAL_LOSSES['Reactive'].append(reactive_losses)
+    @defaultmethod
+    def update_total_powers(self, active_power, reactive_power, active_losses, reactive_losses):
+        self.TOTAL_POWER['Active'].append(active_power)
+        self.TOTAL_POWER['Reactive'].append(reactive_power)
+        self.TOTAL_LOSSES['Active'].append(active_losses)
+        self.TOTAL_LOSSES['Reactive'].append(reactive_losses)
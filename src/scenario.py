@@ -0,0 +1,381 @@
+import os
+import csv
+import json
+import argparse
+import warnings
+import traceback
+import multiprocessing
+from multiprocessing.connection import wait
+from collections import deque
+from datetime import time, datetime, timedelta
+from functools import lru_cache
+from time import perf_counter
+import pandas as pd
+from src.external_input_data import ModelInputData
+from src.dataset import load_day
+from src.models.load import Load
+from src.models.inverter import Inverter, HybridInverter, EVInverter, InverterSettings, HybridInverterSettings, EVInverterSettings, VoltWatt, \
+    VoltVar, StaticExportLimit, ConstantPowerFactor, MaximiseSelfConsumptionSettings, TimeOfUseSettings, UnmanagedEVCharging, ManagedEVCharging, \
+    V2GEVCharging
+from src.models.pv_panel import PVPanels
+from src.models.pv_system import PVSystem, HybridPVSystem
+from src.models.ev import EVSystem
+from src.models.vehicle import Vehicle
+from src.models.meter import Meter
+from src.models.battery import Battery
+from src.results import Results
+from src.circuit_interface import CircuitInterface
+from src.compiler import Compiler
+from src.utils import remove_sublist
+
+#  Declarative scenarios. A scenario is a JSON file (see examples/scenarios) giving the circuit labels and the settings of
+#  each CER type, the convergence settings and the results to export. build_cers turns it into the CER objects, and
+#  run_benchmark runs a set of scenarios over the day types, loading the data of each day once and compiling one circuit
+#  per CER layout (reset between runs). run_batch runs each scenario/day in its own worker process instead (own engine and
+#  Results), with bounded concurrency, per-job timeout and retries, and consolidates the summaries of all the jobs.
+#
+#  {"name": "load_pv_battery_time_of_use_v2g_inv_con",
+#   "pvsystem": {"labels": "remaining", "inverter": {"volt_watt": true, "volt_var": true}},
+#   "hybridpvsystem": {"labels": [3, 8], "inverter": {"volt_watt": true, "charging_volt_watt": [[0.9, 0.94, 1.1], [0.2, 1, 1]],
+#                                                    "mode": "time_of_use"}},
+#   "evsystem": {"labels": [1, 2], "inverter": {"charging": "v2g"}, "battery": {"capacity": 62, "soc": 0.5, "min_soc": 0.2}},
+#   "delta_p_q_settings": [0.15, 0.05, 0.1, 0.05, 0.16, 0.05, 0.1, 0.05]}
+#
+#  Curves (volt_watt, volt_var, charging_volt_watt) are either true (default curve) or [[volt], [pu]]. "remaining" labels are
+#  the circuit labels without a hybrid PV system. delta_p_q_settings can also be a {day: settings} dictionary with a
+#  "default" entry.
+
+ROOT_PATH = os.path.dirname(os.path.dirname(__file__))
+DATA_PATH = ROOT_PATH + '/data'
+DAYS = ['summer-weekday', 'summer-weekend', 'winter-weekday', 'winter-weekend']
+CIRCUIT_LABELS = list(range(1, 166))
+
+# Results exports {name: (Results method, file name suffix)}, the file name is {scenario}_{suffix}_{day}
+EXPORTS = {'energy_flow': ('export_energy_flow_results', 'energy_flow'),
+           'reactive_powers': ('export_reactive_power_results', 'reactive_powers'),
+           'metrics': ('export_metrics', 'metrics'),
+           'voltages': ('export_voltages', 'voltages'),
+           'line_currents': ('export_line_currents', 'line_currents'),
+           'voltage_unbalance': ('export_voltage_unbalance', 'voltage_unbalance'),
+           'ac_curtailment': ('export_ac_curtailment', 'ac_curtailment'),
+           'dc_curtailment': ('export_dc_curtailment', 'dc_curtailment')}
+DEFAULT_EXPORTS = ['summary'] + list(EXPORTS)
+
+
+def load_scenario(path: str) -> dict:
+    with open(path, 'r') as file:
+        spec = json.load(file)
+    if 'name' not in spec:
+        spec['name'] = os.path.splitext(os.path.basename(path))[0]
+    return spec
+
+
+@lru_cache(maxsize=None)
+def load_model_data(day: str, step_size: int = 30) -> ModelInputData:
+    """
+    :return: the input data of a day type, loaded once from the dataset cache and shared by all the scenarios run on that day
+    """
+    data = load_day(day, DATA_PATH)
+    evs = data.evs
+    return ModelInputData(data.demand_power(CIRCUIT_LABELS), data.irradiance, data.temperature, step_size, [0, 24 - step_size / 60],
+                          evs.behaviours(CIRCUIT_LABELS), {label: evs.at_home_mask(label, step_size) for label in CIRCUIT_LABELS})
+
+
+@lru_cache(maxsize=None)
+def load_label_bus_dict() -> dict:
+    with open(DATA_PATH + '/network-model/label_bus_dict.csv', 'r') as csvfile:
+        reader = csv.reader(csvfile)
+        return {int(row[0]): row[1] for row in reader}
+
+
+def _curve(value):
+    return None if value is True else value
+
+
+def _inverter_settings(settings: dict, inverter_settings: InverterSettings, step_size: int) -> InverterSettings:
+    if settings.get('volt_watt'):
+        inverter_settings.enable_volt_watt(VoltWatt(_curve(settings['volt_watt'])))
+    if settings.get('volt_var'):
+        inverter_settings.enable_volt_var(VoltVar(_curve(settings['volt_var'])))
+    if settings.get('export_limit') is not None:
+        inverter_settings.enable_static_export_limit(StaticExportLimit(settings['export_limit']))
+    if settings.get('power_factor') is not None:
+        inverter_settings.enable_constant_power_factor(ConstantPowerFactor(settings['power_factor']))
+    if settings.get('output_priority') is not None:
+        inverter_settings.set_output_priority(settings['output_priority'])
+    if settings.get('charging_volt_watt'):
+        inverter_settings.enable_charging_volt_watt_settings(VoltWatt(_curve(settings['charging_volt_watt'])))
+    mode = settings.get('mode')
+    if mode == 'self_consumption':
+        inverter_settings.enable_maximise_self_consumption_settings(MaximiseSelfConsumptionSettings())
+    elif mode == 'time_of_use':
+        inverter_settings.enable_time_of_use_settings(TimeOfUseSettings(settings.get('charging_times'), settings.get('discharging_times'), step_size))
+    elif mode is not None:
+        raise ValueError(f"Invalid hybrid inverter mode {mode}. Expected 'self_consumption' or 'time_of_use'.")
+    charging = settings.get('charging')
+    if charging == 'unmanaged':
+        inverter_settings.enable_unmanaged_charging(UnmanagedEVCharging(step_size))
+    elif charging == 'managed':
+        inverter_settings.enable_managed_charging(ManagedEVCharging(settings.get('charging_times'), step_size))
+    elif charging == 'v2g':
+        inverter_settings.enable_v2g_charging(V2GEVCharging(settings.get('charging_times'), settings.get('discharging_times'), step_size))
+    elif charging is not None:
+        raise ValueError(f"Invalid EV charging {charging}. Expected 'unmanaged', 'managed' or 'v2g'.")
+    return inverter_settings
+
+
+def models_circuit_labels(spec: dict) -> dict[str: [int]]:
+    """
+    :return: the circuit labels of each CER type of the scenario, as expected by CircuitInterface
+    """
+    labels = {'load': CIRCUIT_LABELS}
+    hybrid_labels = spec.get('hybridpvsystem', {}).get('labels', [])
+    for key in ['pvsystem', 'hybridpvsystem', 'evsystem']:
+        if key in spec:
+            labels[key] = remove_sublist(CIRCUIT_LABELS, hybrid_labels) if spec[key]['labels'] == 'remaining' else spec[key]['labels']
+    return labels
+
+
+def build_cers(spec: dict, model_data: ModelInputData) -> ([object], {int: Meter}):
+    """
+    Create the CER objects of a scenario.
+    :return: the CERs (loads, pv systems, hybrid pv systems, ev systems) and the meters {circuit_label: Meter}
+    """
+    step_size = model_data.step_size
+    labels = models_circuit_labels(spec)
+    pv_labels = labels.get('pvsystem', [])
+    hybrid_labels = labels.get('hybridpvsystem', [])
+    ev_labels = labels.get('evsystem', [])
+    # Meters of the labels with a load only, if their energy flows are to be reported
+    meters = {}
+    if spec.get('load_meters'):
+        meters = {label: Meter(label) for label in remove_sublist(remove_sublist(CIRCUIT_LABELS, pv_labels), hybrid_labels)}
+    loads = {label: Load(label, meters.get(label)) for label in CIRCUIT_LABELS}
+    for label, meter in meters.items():
+        meter.add_load(loads[label])
+    pv_panels = {label: PVPanels(label) for label in pv_labels + hybrid_labels}
+
+    pv_systems = []
+    if pv_labels:
+        inverter_settings = _inverter_settings(spec['pvsystem'].get('inverter', {}), InverterSettings(), step_size)
+        for label in pv_labels:
+            inverter = Inverter(circuit_label=label, inverter_settings=inverter_settings)
+            meters[label] = Meter(label, loads=[loads[label]], inverters=[inverter])
+            pv_systems.append(PVSystem(label, pv_panels[label], inverter, meters[label]))
+
+    hybrid_pv_systems = []
+    if hybrid_labels:
+        hybrid_inverter_settings = _inverter_settings(spec['hybridpvsystem'].get('inverter', {}), HybridInverterSettings(), step_size)
+        battery = spec['hybridpvsystem'].get('battery', {})
+        for label in hybrid_labels:
+            inverter = HybridInverter(circuit_label=label, hybrid_inverter_settings=hybrid_inverter_settings)
+            meters[label] = Meter(label, loads=[loads[label]], inverters=[inverter])
+            hybrid_pv_systems.append(HybridPVSystem(label, pv_panels[label], Battery(label, **battery, step_size=step_size), inverter, meters[label]))
+
+    ev_systems = []
+    if ev_labels:
+        ev_inverter_settings = _inverter_settings(spec['evsystem'].get('inverter', {}), EVInverterSettings(), step_size)
+        battery = spec['evsystem'].get('battery', {})
+        vehicle = spec['evsystem'].get('vehicle', {})
+        for label in ev_labels:
+            at_home = model_data.ev_at_home.get(label) if model_data.ev_at_home is not None else None
+            car = Vehicle(label, model_data.ev_behaviour[label]['driving_distance'], model_data.ev_behaviour[label]['driving_intervals'],
+                          **vehicle, step_size=step_size, at_home=at_home)
+            ev_system = EVSystem(label, car, Battery(label, **battery, step_size=step_size),
+                                 EVInverter(circuit_label=label, ev_inverter_settings=ev_inverter_settings))
+            if label not in meters:
+                meters[label] = Meter(label, loads=[loads[label]])
+            meters[label].add_ev(ev_system)
+            ev_systems.append(ev_system)
+
+    return list(loads.values()) + pv_systems + hybrid_pv_systems + ev_systems, meters
+
+
+def _delta_p_q_settings(spec: dict, day: str):
+    settings = spec.get('delta_p_q_settings')
+    if isinstance(settings, dict):
+        settings = settings.get(day, settings.get('default'))
+    return settings
+
+
+def _time_settings(step_size: int) -> [time, time, int]:
+    end_time = (datetime.min + timedelta(minutes=24 * 60 - step_size)).time()
+    return [time(0, 0), end_time, step_size]
+
+
+def run_scenario(spec: dict, day: str, circuit: CircuitInterface, model_data: ModelInputData, results_path: str = None,
+                 plots_path: str = None, population_engine: bool = False, trace_path: str = None, profiler: str = None) -> Results:
+    """
+    Run one scenario over a day and write its exports (results_path) and plots (plots_path) if given.
+    :param trace_path: directory of the per time step trace ({scenario}_trace_{day}.csv, see src.profiling), no trace if None
+    :param profiler: 'cprofile' or 'pyinstrument' to also write the profile of the time steps to trace_path
+    :return: the results of the run
+    """
+    if profiler is not None and trace_path is None:
+        raise ValueError('The profile of the time steps is written to trace_path, expected a trace_path with profiler.')
+    step_size = model_data.step_size
+    cers, meters = build_cers(spec, model_data)
+    results = Results()
+    results.initialise(_time_settings(step_size), circuit.end_buses, circuit.lines_rating, circuit.pv_set, meters, circuit.ev_set,
+                       step_size=step_size)
+    solver = Compiler(circuit, cers, model_data, results)
+    delta_p_q_settings = _delta_p_q_settings(spec, day)
+    if delta_p_q_settings is not None:
+        solver.change_delta_p_q_settings(delta_p_q_settings)
+    if population_engine:
+        solver.enable_population_engine()
+    if trace_path is not None:
+        solver.enable_profiling(profiler)
+    t = perf_counter()
+    for step in range(0, 24 * 60 // step_size):
+        solver.cer_convergence_process(step)
+    results.update_simulation_time(perf_counter() - t)
+
+    name = spec['name']
+    if trace_path is not None:
+        os.makedirs(trace_path, exist_ok=True)
+        solver.profiler.export_trace(path=trace_path, file_name=f'{name}_trace_{day}')
+        if profiler is not None:
+            solver.profiler.export_profile(path=trace_path, file_name=f'{name}_profile_{day}')
+    if results_path is not None:
+        os.makedirs(results_path, exist_ok=True)
+        exports = spec.get('exports', DEFAULT_EXPORTS)
+        for export in exports:
+            if export == 'summary':
+                results.export_summary_results(path=results_path, file_name=f'{name}_{day}')
+            elif export == 'weather':
+                pd.DataFrame({'Time': results.TIME_SERIES, 'Irradiance (W/m2)': model_data.irradiance}).to_csv(results_path + f'/irradiance_{day}.csv')
+                pd.DataFrame({'Time': results.TIME_SERIES, 'Temperature (C)': model_data.temperature}).to_csv(results_path + f'/temperature_{day}.csv')
+            else:
+                method, suffix = EXPORTS[export]
+                getattr(results, method)(path=results_path, file_name=f'{name}_{suffix}_{day}')
+    if plots_path is not None and spec.get('plots', True):
+        from src.plots import Plots  # matplotlib is only needed when plotting
+        Results.set_default(results)  # Plots draws the class-level Results
+        Plots.plot_and_save_all(plots_path + f'/{name}/{day}/', extra_disc=f'_{name}_{day}')
+    return results
+
+
+def run_benchmark(scenario_paths: [str], days: [str] = None, engine: str = 'com', results_path: str = None, plots_path: str = None,
+                  population_engine: bool = False, trace_path: str = None, profiler: str = None) -> None:
+    """
+    Run every scenario on every day type. The data of each day is loaded once and scenarios with the same CER layout share
+    one compiled circuit, reset between runs.
+    """
+    specs = [load_scenario(path) for path in scenario_paths]
+    circuits = {}
+    for day in days or DAYS:
+        for spec in specs:
+            model_data = load_model_data(day, spec.get('step_size', 30))
+            layout = models_circuit_labels(spec)
+            key = tuple((cer_type, tuple(labels)) for cer_type, labels in layout.items())
+            if key in circuits:
+                circuits[key].reset()
+            else:
+                circuits[key] = CircuitInterface(os.path.abspath(DATA_PATH + '/network-model/model.dss'), load_label_bus_dict(), layout, engine=engine)
+            t = perf_counter()
+            run_scenario(spec, day, circuits[key], model_data, results_path, plots_path, population_engine, trace_path, profiler)
+            print(f"{spec['name']} {day}: {perf_counter() - t:.1f} s")
+
+
+def _run_job(scenario_path: str, day: str, engine: str, results_path: str, plots_path: str, population_engine: bool, trace_path: str,
+             profiler: str, connection) -> None:
+    """
+    Worker process of run_batch, sends {'status', 'summary' or 'error'} back through the connection.
+    """
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    warnings.filterwarnings("ignore", category=UserWarning)
+    try:
+        spec = load_scenario(scenario_path)
+        circuit = CircuitInterface(os.path.abspath(DATA_PATH + '/network-model/model.dss'), load_label_bus_dict(), models_circuit_labels(spec),
+                                   engine=engine)
+        results = run_scenario(spec, day, circuit, load_model_data(day, spec.get('step_size', 30)), results_path, plots_path, population_engine,
+                               trace_path, profiler)
+        summary = results.summary_results() if 'summary' in spec.get('exports', DEFAULT_EXPORTS) else {}
+        connection.send({'status': 'ok', 'summary': summary})
+    except Exception:
+        connection.send({'status': 'error', 'error': traceback.format_exc()})
+    finally:
+        connection.close()
+
+
+def run_batch(scenario_paths: [str], days: [str] = None, engine: str = 'com', results_path: str = None, plots_path: str = None,
+              population_engine: bool = False, workers: int = None, timeout: float = None, retries: int = 1, trace_path: str = None,
+              profiler: str = None) -> pd.DataFrame:
+    """
+    Run every scenario on every day type, each combination in its own worker process.
+    :param workers: maximum number of jobs running at the same time, the number of CPUs if None
+    :param timeout: time limit of a job in seconds, the job process is terminated past it
+    :param retries: number of times a failed or timed out job is run again
+    :param trace_path: directory of the per time step traces of the jobs, see run_scenario
+    :return: one row per job (scenario, day, status, attempts, time and the summary results), also written to
+    results_path/batch_summary.csv
+    """
+    workers = workers or os.cpu_count() or 1
+    context = multiprocessing.get_context('spawn')  # Fresh interpreter per job, nothing inherited from the parent engine
+    jobs = deque((path, day, 1) for day in days or DAYS for path in scenario_paths)
+    running = {}
+    rows = []
+    while jobs or running:
+        while jobs and len(running) < workers:
+            path, day, attempt = jobs.popleft()
+            receiver, sender = context.Pipe(duplex=False)
+            process = context.Process(target=_run_job, args=(path, day, engine, results_path, plots_path, population_engine, trace_path,
+                                                                     profiler, sender), daemon=True)
+            process.start()
+            sender.close()
+            running[process] = (path, day, attempt, receiver, perf_counter())
+        wait([process.sentinel for process in running] + [running[process][3] for process in running], timeout=1.0)
+        for process, (path, day, attempt, receiver, start) in list(running.items()):
+            result = receiver.recv() if receiver.poll() else None
+            elapsed = perf_counter() - start
+            if result is None and process.is_alive():
+                if timeout is None or elapsed < timeout:
+                    continue
+                process.terminate()
+                result = {'status': 'timeout', 'error': f'Job exceeded {timeout} s'}
+            process.join()
+            receiver.close()
+            del running[process]
+            if result is None:
+                result = {'status': 'error', 'error': f'Worker exited with code {process.exitcode}'}
+            name = load_scenario(path)['name']
+            if result['status'] != 'ok' and attempt <= retries:
+                print(f"{name} {day}: {result['status']}, retrying ({attempt}/{retries})")
+                jobs.append((path, day, attempt + 1))
+                continue
+            print(f"{name} {day}: {result['status']} in {elapsed:.1f} s")
+            rows.append({'Scenario': name, 'Day': day, 'Status': result['status'], 'Attempts': attempt, 'Job Time (Sec)': elapsed,
+                         'Error': result.get('error', '')} | result.get('summary', {}))
+    batch_summary = pd.DataFrame(rows)
+    if results_path is not None:
+        os.makedirs(results_path, exist_ok=True)
+        batch_summary.to_csv(results_path + '/batch_summary.csv', index=False)
+    return batch_summary
+
+
+if __name__ == '__main__':
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    warnings.filterwarnings("ignore", category=UserWarning)
+    parser = argparse.ArgumentParser(description='Run the benchmark scenarios over the day types.')
+    parser.add_argument('scenarios', nargs='+', help='scenario JSON files, e.g. examples/scenarios/*.json')
+    parser.add_argument('--days', nargs='+', default=DAYS, choices=DAYS)
+    parser.add_argument('--engine', default='com', choices=['com', 'native'])
+    parser.add_argument('--results', default=ROOT_PATH + '/examples/results', help='directory of the exported results')
+    parser.add_argument('--plots', default=ROOT_PATH + '/examples/plots', help='directory of the plots')
+    parser.add_argument('--no-plots', action='store_true')
+    parser.add_argument('--population-engine', action='store_true', help='run the convergence iterations on src.population')
+    parser.add_argument('--workers', type=int, help='run the scenario/day jobs in this many worker processes (run_batch)')
+    parser.add_argument('--timeout', type=float, help='time limit of a worker job in seconds')
+    parser.add_argument('--retries', type=int, default=1, help='number of retries of a failed worker job')
+    parser.add_argument('--trace', help='directory of the per time step timing traces (src.profiling)')
+    parser.add_argument('--profiler', choices=['cprofile', 'pyinstrument'], help='also profile the time steps, needs --trace')
+    args = parser.parse_args()
+    if args.profiler is not None and args.trace is None:
+        parser.error('--profiler needs --trace, the directory the profile is written to')
+    plots_path = None if args.no_plots else args.plots
+    if args.workers is None:
+        run_benchmark(args.scenarios, args.days, args.engine, args.results, plots_path, args.population_engine, args.trace, args.profiler)
+    else:
+        run_batch(args.scenarios, args.days, args.engine, args.results, plots_path, args.population_engine, args.workers, args.timeout, args.retries,
+                  args.trace, args.profiler)
@@ -0,0 +1,190 @@
+import os
+import sys
+import glob
+import json
+import argparse
+import platform
+import warnings
+import numpy as np
+from time import perf_counter
+from src.models.load import Load
+from src.models.pv_system import PVSystem, HybridPVSystem
+from src.models.ev import EVSystem
+from src.circuit_interface import CircuitInterface
+from src.scenario import ROOT_PATH, DATA_PATH, load_scenario, load_model_data, load_label_bus_dict, models_circuit_labels, build_cers, \
+    run_scenario
+
+#  Throughput benchmarks of the simulator, compared against a stored baseline to flag regressions.
+#  - Kernels: the CER model calls made in every convergence iteration, timed over every CER of the scenario and every time
+#    step of the day at a fixed sweep of terminal voltages, reported in calls per second (best of the repeats).
+#  - Scenarios: cer_convergence_process over the day of each scenario on the native engine, reported in time steps per
+#    second, convergence iterations and power flow solves per time step.
+#  The throughputs depend on the machine, the baseline is only meaningful on the machine it was recorded on (re-record it with
+#  --update-baseline). The iterations do not, a change of them means the convergence process changed.
+#
+#      python -m src.throughput                           # all the scenarios, compared with the baseline
+#      python -m src.throughput --kernels-only --update-baseline
+
+SCENARIOS_PATH = ROOT_PATH + '/examples/scenarios'
+BASELINE_PATH = ROOT_PATH + '/examples/benchmarks/throughput_baseline.json'
+KERNELS_SCENARIO = SCENARIOS_PATH + '/load_pv_battery_time_of_use_v2g_inv_con.json'
+KERNELS = ('Inverter.get_output_power', 'HybridPVSystem.get_output_power', 'EVSystem.get_output_power', 'Meter.get_energy_flow_results')
+#  Terminal voltages (pu) swept over the day by the kernels, across the volt-var and volt-watt curves
+KERNEL_VOLTAGES = (0.94, 1.12)
+
+
+def _kernel_pass(cers: [object], meters: list, model_data, voltages: np.ndarray) -> dict:
+    """
+    Run the CERs over the day, timing the kernel calls.
+    :return: {kernel: [calls, seconds]}
+    """
+    timings = {kernel: [0, 0.0] for kernel in KERNELS}
+    loads = [cer for cer in cers if isinstance(cer, Load)]
+    pv_systems = [cer for cer in cers if isinstance(cer, PVSystem) and not isinstance(cer, HybridPVSystem)]
+    hybrid_pv_systems = [cer for cer in cers if isinstance(cer, HybridPVSystem)]
+    ev_systems = [cer for cer in cers if isinstance(cer, EVSystem)]
+    for time_step, volt in enumerate(voltages):
+        irradiance, temperature = model_data.irradiance[time_step], model_data.temperature[time_step]
+        for load in loads:
+            load.update(model_data.demand_power[load.circuit_label][time_step], volt)
+            load.step()
+        for pv_system in pv_systems:
+            pv_system.update(irradiance, temperature, volt)
+            pv_system.step()
+        t = perf_counter()
+        for pv_system in pv_systems:
+            pv_system.inverter.get_output_power(pv_system.dc_generation, volt)
+        timings['Inverter.get_output_power'][1] += perf_counter() - t
+        timings['Inverter.get_output_power'][0] += len(pv_systems)
+        for ev_system in ev_systems:
+            ev_system.update(volt)
+        t = perf_counter()
+        for ev_system in ev_systems:
+            ev_system.get_output_power(time_step)
+        timings['EVSystem.get_output_power'][1] += perf_counter() - t
+        timings['EVSystem.get_output_power'][0] += len(ev_systems)
+        for hybrid_pv_system in hybrid_pv_systems:
+            hybrid_pv_system.update(irradiance, temperature, volt)
+        t = perf_counter()
+        for hybrid_pv_system in hybrid_pv_systems:
+            hybrid_pv_system.get_output_power(time_step)
+        timings['HybridPVSystem.get_output_power'][1] += perf_counter() - t
+        timings['HybridPVSystem.get_output_power'][0] += len(hybrid_pv_systems)
+        t = perf_counter()
+        for meter in meters:
+            meter.get_energy_flow_results()
+        timings['Meter.get_energy_flow_results'][1] += perf_counter() - t
+        timings['Meter.get_energy_flow_results'][0] += len(meters)
+    return timings
+
+
+def benchmark_kernels(day: str = 'summer-weekday', repeats: int = 5, scenario_path: str = KERNELS_SCENARIO) -> dict:
+    """
+    :return: {kernel: {'calls', 'calls_per_s'}}, best pass of the repeats, every pass starting from the same CER states
+    """
+    spec = load_scenario(scenario_path)
+    model_data = load_model_data(day, spec.get('step_size', 30))
+    cers, meters = build_cers(spec, model_data)
+    meters = list(meters.values())
+    voltages = np.linspace(*KERNEL_VOLTAGES, int(24 * 60 // model_data.step_size))
+    states = [cer.snapshot() for cer in cers]
+    best = {}
+    for _ in range(repeats):
+        for cer, state in zip(cers, states):
+            cer.restore(state)
+        for kernel, (calls, seconds) in _kernel_pass(cers, meters, model_data, voltages).items():
+            if kernel not in best or seconds < best[kernel][1]:
+                best[kernel] = (calls, seconds)
+    return {kernel: {'calls': calls, 'calls_per_s': calls / seconds if seconds > 0 else 0.0} for kernel, (calls, seconds) in best.items()}
+
+
+def benchmark_scenarios(scenario_paths: [str], day: str = 'summer-weekday') -> dict:
+    """
+    Run each scenario over the day on the native engine, scenarios with the same CER layout share one compiled circuit.
+    :return: {scenario: {'steps_per_s', 'iterations_per_step', 'power_flow_solves_per_step'}}
+    """
+    circuits = {}
+    report = {}
+    for path in scenario_paths:
+        spec = load_scenario(path)
+        layout = models_circuit_labels(spec)
+        key = tuple((cer_type, tuple(labels)) for cer_type, labels in layout.items())
+        if key in circuits:
+            circuits[key].reset()
+        else:
+            circuits[key] = CircuitInterface(os.path.abspath(DATA_PATH + '/network-model/model.dss'), load_label_bus_dict(), layout, engine='native')
+        results = run_scenario(spec, day, circuits[key], load_model_data(day, spec.get('step_size', 30)))
+        steps = len(results.ITERATIONS)
+        report[spec['name']] = {'steps_per_s': steps / sum(results.SIMULATION_TIME),
+                                'iterations_per_step': sum(results.ITERATIONS) / steps,
+                                'power_flow_solves_per_step': sum(results.POWER_FLOW_SOLVES) / steps}
+        print(f"{spec['name']}: {report[spec['name']]['steps_per_s']:.2f} steps/s, {report[spec['name']]['iterations_per_step']:.2f} iterations/step")
+    return report
+
+
+def compare_to_baseline(report: dict, baseline: dict, tolerance: float = 0.25) -> [str]:
+    """
+    :param tolerance: relative drop of throughput flagged as a regression
+    :return: the regressions, throughputs below (1 - tolerance) of the baseline and iterations per step that changed
+    """
+    regressions = []
+    for kernel, entry in report.get('kernels', {}).items():
+        reference = baseline.get('kernels', {}).get(kernel)
+        if reference is not None and entry['calls_per_s'] < (1 - tolerance) * reference['calls_per_s']:
+            regressions.append(f"{kernel}: {entry['calls_per_s']:.0f} calls/s, baseline {reference['calls_per_s']:.0f}")
+    for name, entry in report.get('scenarios', {}).items():
+        reference = baseline.get('scenarios', {}).get(name)
+        if reference is None:
+            continue
+        if entry['steps_per_s'] < (1 - tolerance) * reference['steps_per_s']:
+            regressions.append(f"{name}: {entry['steps_per_s']:.2f} steps/s, baseline {reference['steps_per_s']:.2f}")
+        if not np.isclose(entry['iterations_per_step'], reference['iterations_per_step']):
+            regressions.append(f"{name}: {entry['iterations_per_step']:.2f} iterations/step, baseline {reference['iterations_per_step']:.2f}")
+    return regressions
+
+
+def load_baseline(path: str = BASELINE_PATH) -> dict:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def save_baseline(report: dict, path: str = BASELINE_PATH) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(report, file, indent=1)
+
+
+if __name__ == '__main__':
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    warnings.filterwarnings("ignore", category=UserWarning)
+    parser = argparse.ArgumentParser(description='Throughput benchmarks of the CER kernels and of the scenarios, compared with a stored baseline.')
+    parser.add_argument('--scenarios', nargs='+', default=sorted(glob.glob(SCENARIOS_PATH + '/*.json')), help='scenario JSON files')
+    parser.add_argument('--day', default='summer-weekday')
+    parser.add_argument('--repeats', type=int, default=5, help='passes of the kernels, the best one is reported')
+    parser.add_argument('--kernels-only', action='store_true')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='relative drop of throughput flagged as a regression')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--update-baseline', action='store_true', help='store this run as the baseline instead of comparing with it')
+    args = parser.parse_args()
+
+    report = {'day': args.day, 'python': platform.python_version(), 'machine': platform.machine(), 'processor': platform.processor(),
+              'kernels': benchmark_kernels(args.day, args.repeats)}
+    for kernel, entry in report['kernels'].items():
+        print(f"{kernel}: {entry['calls_per_s']:.0f} calls/s ({entry['calls']} calls)")
+    if not args.kernels_only:
+        report['scenarios'] = benchmark_scenarios(args.scenarios, args.day)
+
+    if args.update_baseline:
+        if os.path.exists(args.baseline):
+            # Keep the scenarios of the baseline that were not run
+            report['scenarios'] = load_baseline(args.baseline).get('scenarios', {}) | report.get('scenarios', {})
+        save_baseline(report, args.baseline)
+        print(f'Baseline written to {args.baseline}')
+    elif not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}, run with --update-baseline to record one.')
+    else:
+        regressions = compare_to_baseline(report, load_baseline(args.baseline), args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        print(f'{len(regressions)} regression(s) against {args.baseline}')
+        sys.exit(1 if regressions else 0)
@@ -1,5 +1,6 @@
-import pandas as pd
-import ast
+import os
+from functools import lru_cache
+from src.dataset import EVBehaviourRepository
 
 
 def remove_sublist(main_list, sublist):
@@ -10,8 +11,17 @@ def intersection(main_list, sublist):
     return list(set(main_list) & set(sublist))
 
 
+@lru_cache(maxsize=None)
+def _ev_behaviour_repository(data_path, mtime_ns):
+    return EVBehaviourRepository.from_csv(data_path)
+
+
+def get_ev_behaviour_repository(data_path) -> EVBehaviourRepository:
+    """
+    :return: the EV behaviours of an evs_behaviour_<day>.csv, parsed once per file version
+    """
+    return _ev_behaviour_repository(data_path, os.stat(data_path).st_mtime_ns)
+
+
 def get_ev_behaviour(label, data_path):
-    ev_behaviour_data = pd.read_csv(data_path).set_index('Label')
-    driving_intervals = ast.literal_eval(ev_behaviour_data.loc[label].values[0])
-    driving_distance = int(ev_behaviour_data.loc[label].values[1])
-    return {'driving_distance': driving_distance, 'driving_intervals': driving_intervals}
+    return get_ev_behaviour_repository(data_path).behaviour(label)
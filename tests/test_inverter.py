@@ -0,0 +1,51 @@
+import numpy as np
+import pytest
+from scipy.optimize import root_scalar
+from src.models.inverter import Inverter, HybridInverter, EVInverter, PDC_UPPER_BOUND
+
+#  Closed form inverse of the efficiency against the root_scalar solver it replaced, over the brackets of that solver
+TOLERANCE = 1e-9
+INVERTERS = [Inverter(), Inverter(rated_kva=5.0, eff_curve=[[0.05, 0.3, 0.8], [0.8, 0.95, 0.96]]), HybridInverter(),
+             HybridInverter(rated_kva=4.6), EVInverter(), EVInverter(rated_kva=7.0)]
+
+
+def _root_scalar_inverse(inverter, y, upper_bound):
+    return root_scalar(lambda p: p * inverter.get_inverter_eff(p) - y, bracket=[0, upper_bound]).root
+
+
+def _outputs(inverter, upper_bound) -> np.ndarray:
+    """
+    :return: outputs over the bracket [0, upper_bound], endpoints and knots of the efficiency curve included
+    """
+    knots = [x * inverter.rated_kva for x in inverter._eff_curve[0] if x * inverter.rated_kva <= upper_bound]
+    p = np.unique(np.concatenate([np.linspace(0, upper_bound, 101), knots]))
+    return np.array([x * inverter.get_inverter_eff(x) for x in p])
+
+
+@pytest.mark.parametrize('inverter', INVERTERS)
+def test_pdc_from_efficiency_matches_root_scalar(inverter):
+    for p_ac in _outputs(inverter, PDC_UPPER_BOUND):
+        assert inverter.get_pdc_from_efficiency(p_ac) == pytest.approx(_root_scalar_inverse(inverter, p_ac, PDC_UPPER_BOUND),
+                                                                       abs=TOLERANCE)
+
+
+@pytest.mark.parametrize('inverter', [inverter for inverter in INVERTERS if type(inverter) is not Inverter])
+def test_ac_from_efficiency_for_charging_matches_root_scalar(inverter):
+    for p_dc in _outputs(inverter, inverter.rated_kva):
+        assert inverter.get_ac_from_efficiency_for_charging(p_dc) == pytest.approx(
+            _root_scalar_inverse(inverter, p_dc, inverter.rated_kva), abs=TOLERANCE)
+
+
+@pytest.mark.parametrize('inverter', INVERTERS)
+def test_outputs_out_of_the_brackets(inverter):
+    pdc_limit = PDC_UPPER_BOUND * inverter.get_inverter_eff(PDC_UPPER_BOUND)
+    for p_ac in [-1e-6, pdc_limit * (1 + 1e-9)]:
+        with pytest.raises(ValueError):
+            inverter.get_pdc_from_efficiency(p_ac)
+        with pytest.raises(ValueError):
+            _root_scalar_inverse(inverter, p_ac, PDC_UPPER_BOUND)
+    if type(inverter) is not Inverter:
+        charging_limit = inverter.rated_kva * inverter.get_inverter_eff(inverter.rated_kva)
+        for p_dc in [-1e-6, charging_limit * (1 + 1e-9)]:
+            with pytest.raises(ValueError):
+                inverter.get_ac_from_efficiency_for_charging(p_dc)
@@ -0,0 +1,49 @@
+import itertools
+import pytest
+from src.models.inverter import HybridInverter
+from src.models.meter import Meter, get_energy_flow_results
+
+FLOWS = ('inverter_to_load', 'inverter_to_ev', 'inverter_to_grid', 'ev_to_load', 'ev_to_inverter', 'ev_to_grid', 'grid_to_load',
+         'grid_to_ev', 'grid_to_inverter')
+#  Powers (kW) of the members, with their signs and zero
+POWERS = (-3.5, -1.0, 0.0, 1.0, 2.5)
+
+
+class _Member:
+    def __init__(self, power):
+        self.p_in = power
+        self.p_out = power
+
+
+class _HybridInverter(HybridInverter):
+    def __init__(self, power):
+        self._power = power
+        self._battery_power = power / 2
+
+    @property
+    def p_out(self):
+        return self._power
+
+
+def _meters() -> [Meter]:
+    meters = []
+    for load, ev, inverter in itertools.product((None,) + POWERS, repeat=3):
+        loads = [] if load is None else [_Member(load)]
+        evs = [] if ev is None else [_Member(ev), _Member(ev / 2)]
+        for inverter_type in (_Member, _HybridInverter):
+            meters.append(Meter('meter', loads, evs, [] if inverter is None else [inverter_type(inverter)]))
+    return meters
+
+
+def test_all_meters_match_each_meter():
+    meters = _meters()
+    for meter, results in zip(meters, get_energy_flow_results(meters)):
+        assert list(results) == list(meter.get_energy_flow_results())
+        assert results == pytest.approx(meter.get_energy_flow_results(), abs=1e-12)
+
+
+def test_flow_properties_match_results():
+    for meter in _meters():
+        flows = meter._energy_flows()
+        assert {flow: getattr(meter, flow) for flow in FLOWS} == {flow: flows[flow] for flow in FLOWS}
+        assert meter.get_grid_power() == pytest.approx(flows['grid'])
@@ -0,0 +1,6 @@
+from src.population import VALIDATION_TOLERANCE, validate_population, validation_fleet
+
+
+def test_population_matches_cer_objects():
+    cers, model_data = validation_fleet()
+    assert validate_population(cers, model_data, list(range(48))) < VALIDATION_TOLERANCE
@@ -0,0 +1,18 @@
+import csv
+import pytest
+from src.power_flow import VALIDATION_TOLERANCE, validate_native_engine, validation_case
+
+
+def test_native_engine_matches_opendss():
+    assert validate_native_engine(*validation_case()) < VALIDATION_TOLERANCE
+
+
+def test_unmatched_reference_nodes(tmp_path):
+    dss_path, _, label_bus_dict, demand_power = validation_case()
+    reference_path = tmp_path / 'reference.csv'
+    with open(reference_path, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(['step', 'node', 'v_pu', 'angle'])
+        writer.writerow([0, 'missing_bus.1', 1.0, 0.0])
+    with pytest.raises(ValueError):
+        validate_native_engine(dss_path, str(reference_path), label_bus_dict, demand_power)